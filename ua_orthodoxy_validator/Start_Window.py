@@ -2,7 +2,7 @@ from re import split
 import re
 from typing import Union, cast 
 from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem, QApplication, QVBoxLayout, QHBoxLayout, \
-    QWidget, QDialog, QTreeView, QPushButton, QFileDialog, QMenu, QFrame, QComboBox, QMessageBox
+    QWidget, QDialog, QTreeView, QPushButton, QFileDialog, QMenu, QFrame, QComboBox, QMessageBox, QCheckBox
 from PyQt5.QtCore import Qt, QMimeData, QSize
 from PyQt5.QtGui import QCursor
 from numpy import unicode_
@@ -16,6 +16,13 @@ from osgeo import ogr
 import json
 
 from .csv_to_json_structure_converter import Csv_to_json_structure_converter
+from .parallel_validation import get_workers_count, get_shard_size, get_structure_cache_folder, iter_layers_results, LAYER_JOB_FILE_ERROR, LAYER_JOB_LAYER_ERROR
+from .structure_registry import load_structure
+from .structure_catalogue import StructureCatalogue
+from .result_sinks import create_result_sink
+from .result_cache import create_result_cache
+from .global_id_index import create_global_id_index
+from .reference_integrity import create_reference_index
 
 from .benchmark import Benchmark
 
@@ -62,62 +69,45 @@ def get_real_layer_name(layer: QgsVectorLayer) -> str:
         
     return source_layer_name
 
-def run_validator(task:QgsTask = None, input_list:list = None):
-    def validate_file_format(path: str, reuired_format: str) -> bool:
-        """
-        Перевіряє, чи файл має заданий формат.
+def validate_file_format(path: str, reuired_format: str) -> bool:
+    """
+    Перевіряє, чи файл має заданий формат.
 
-        Args:
-            path (str): Шлях до фаєлу.
-            reuired_format (str): Формат, який потрібно перевірити.
+    Args:
+        path (str): Шлях до фаєлу.
+        reuired_format (str): Формат, який потрібно перевірити.
 
-        Returns:
-            bool: True, якщо фаєл має заданий формат, інакше False.
-        """
-        file_extension = os.path.splitext(path)[1]
-        return file_extension in reuired_format
+    Returns:
+        bool: True, якщо фаєл має заданий формат, інакше False.
     """
-    Запустити валідатор для шарів.
+    file_extension = os.path.splitext(path)[1]
+    return file_extension in reuired_format
 
-    Args:
-        task (QgsTask, optional): Об'єкт QgsTask для валідатора. Дефолтне значення None.
+def collect_validator_output(layers: dict, layers_results, result_sink, global_id_index = None, reference_index = None) -> list:
+    """
+    Збирає результати перевірки шарів в дерево файлів.
 
-        layers (dict): Словник шарів. Кожен шар - це словник з ключами:
-            - layer_crs (str): Система координат шару.
-            - layer_name (str): Ім'я шару.
-            - path (str): Шлях до шару.
-            - driver_name (str): Ім'я драйвера, який використовувався для відкриття шару.
-        structure_path (str): Шлях до файлу структури.
-        domains_path (str): Шлях до файлу доменів.
+    Args:
+        layers (dict): Словник шарів run_validator.
+        layers_results: Пари (ID шару, результат validate_layer) в порядку словника layers.
+        result_sink (ResultSink): Приймач результатів (result_sinks).
+        global_id_index (GlobalIdIndex, optional): Індекс ID між файлами. Часткові індекси шарів (зокрема з процесів-виконавців)
+            об'єднуються в ньому, а після всіх шарів додається вузол ID, що повторюються в різних файлах та шарах.
+        reference_index (ReferentialIntegrityIndex, optional): Перевірка посилань між шарами. Ключі та посилання шарів
+            збираються в ній, а після всіх шарів додається вузол посилань на відсутні значення.
 
     Returns:
-        dict: Словник з результатами валідатору.
-            - layers (dict): Словник результатів валідатору для кожного шару.
-            - exchange_format_error (list): Список шарів з помилками формату обміну.
-            - missing_layers (list): Список відсутніх шарів.
+        list: Список вузлів файлів для ResultWindow.
     """
-    layers = input_list[0]
-    structure_folder = input_list[1]
-    output = []
-    all_layers_check_result_dict = {}
-    all_layers_check_result_dict['layers'] = {}
-    all_layers_check_result_dict['exchange_format_error'] = []
-    all_layers_check_result_dict['missing_layers'] = []
-
     temp_files_dict = {}
-
-    global_guid_dict = {}
     damaged_files_list = []
 
-    print('start run_validator.................')
-    for id in layers:
+    for id, layer_result in layers_results:
         file_path = layers[id]['path']
         if file_path in damaged_files_list: #відпрацювання скіпу перевірки якшо файл вже перевірявся і він битий
             continue
-
-        dataSource = ogr.Open(layers[id]['path'], 0)
         
-        if dataSource is None: #відпрацювання скіпу перевірки якшо файл битий
+        if layer_result['status'] == LAYER_JOB_FILE_ERROR: #відпрацювання скіпу перевірки якшо файл битий
             temp_files_dict[file_path] = {
                 'type' : 'inspection',
                 'item_name' :  f"Помилка завантаження файлу «{os.path.basename(file_path)}»",
@@ -137,31 +127,17 @@ def run_validator(task:QgsTask = None, input_list:list = None):
                 'help_url' : "www.google.com",
                 'subitems' : []
             }
-        
-        if dataSource.GetDriver().GetName() in ['OpenFileGDB', 'GPKG']:
-            layer = dataSource.GetLayerByName(layers[id]['layer_name'])
-        else:
-            layer = dataSource.GetLayer()
-        
-        layer_real_name = layers[id]['layer_real_name']
-        
             
-        if layer is None:
-            temp_files_dict[file_path]['subitems'].append = {
+        if layer_result['status'] == LAYER_JOB_LAYER_ERROR:
+            temp_files_dict[file_path]['subitems'].append({
                 'type' : 'inspection',
                 'item_name' :  f"Помилка завантаження шару «{layers[id]['layer_name']}»",
                 'related_file_path' : file_path,
                 'item_tooltip' : file_path,
                 'criticity' : 2
-            }
+            })
             continue
-            raise AttributeError(f'Не вдалося відкрити шар {layers[id]["path"]}')
-
-        converter = Csv_to_json_structure_converter(structure_folder)
 
-        structure = converter.create_structure_json()
-        domains = converter.create_domain_json()
-        
         if not validate_file_format(layers[id]['path'], layers[id]['exchange_format']):            
             file_format = os.path.splitext(layers[id]['path'])[1]
             required_format = layers[id]['exchange_format']
@@ -187,32 +163,251 @@ def run_validator(task:QgsTask = None, input_list:list = None):
                 }
                 temp_files_dict[file_path]['subitems'].append(inspection)
         
-        validate_checker = EDRA_exchange_layer_checker(
-            layer = layer,
-            layer_exchange_name = layer_real_name,
-            structure_json = structure,
-            domains_json = domains,
-            layer_props = layers[id],
-            layer_id = id,
-            task = task,
-            driver_name = dataSource.GetDriver().GetName())
+        if global_id_index is not None and layer_result.get('id_index') is not None:
+            global_id_index.add_layer(id, layer_result['id_index'])
+        if reference_index is not None and layer_result.get('reference_index') is not None:
+            reference_index.add_layer(id, layer_result['reference_index'])
         
-        #print(f"Driver name: {dataSource.GetDriver().GetName()}")
-        
-        validate_result = validate_checker.run()
-        
-
-        temp_files_dict[layers[id]['path']]['subitems'].append(validate_result)
-        del validate_result
-        del validate_checker
-        del layer
+        result_sink.write_layer_features(layers[id], layer_result['result'])
+        temp_files_dict[layers[id]['path']]['subitems'].append(layer_result['result'])
+        del layer_result
     
     for k, v in temp_files_dict.items():
-        output.append(v)
+        result_sink.write_file(v)
     
+    if global_id_index is not None:
+        try:
+            container_global_id = global_id_index.write_result(layers)
+        finally:
+            global_id_index.close()
+        if container_global_id is not None:
+            result_sink.write_file(container_global_id)
     
+    if reference_index is not None:
+        container_references = reference_index.write_result(layers)
+        if container_references is not None:
+            result_sink.write_file(container_references)
+    
+    output = result_sink.close()
     return output
 
+def run_validator(task:QgsTask = None, input_list:list = None):
+    """
+    Запустити валідатор для шарів.
+
+    Args:
+        task (QgsTask, optional): Об'єкт QgsTask для валідатора. Дефолтне значення None.
+
+        layers (dict): Словник шарів. Кожен шар - це словник з ключами:
+            - layer_crs (str): Система координат шару.
+            - layer_name (str): Ім'я шару.
+            - path (str): Шлях до шару.
+            - driver_name (str): Ім'я драйвера, який використовувався для відкриття шару.
+        structure_path (str): Шлях до файлу структури.
+        domains_path (str): Шлях до файлу доменів.
+        options (dict, optional): Третій елемент input_list. Налаштування перевірки:
+            - workers (int): Кількість процесів для паралельної перевірки шарів. Дефолтне значення - кількість ядер процесора, 1 - послідовна перевірка.
+            - shard_size (int): Кількість об'єктів в діапазоні FID, на які діляться великі шари GPKG/OpenFileGDB при паралельній перевірці. 0 - не ділити шари.
+            - result_mode (str): 'full' - всі об'єкти з усіма перевірками (дефолтне значення), 'errors_only' - лише об'єкти з помилками та підсумок перевірок шару.
+            - error_cap (int): Максимальна кількість прикладів однієї помилки (перевірка, поле) в шарі, решта лише рахується в контейнері "Помилки понад ліміт прикладів". Дефолтне значення 1000, 0 - без обмеження.
+            - result_sink (str): 'dict' - результати вкладеним словником в пам'яті (дефолтне значення), 'ndjson' або 'sqlite' - результати перевірки об'єктів записуються потоком у файл result_path, а в словнику залишаються результати рівня файлів та шарів.
+            - result_path (str): Шлях до файлу NDJSON/SQLite для result_sink 'ndjson' та 'sqlite'.
+            - feature_cache (str): Шлях до файлу SQLite кешу відбитків об'єктів. При повторній перевірці атрибути незмінених об'єктів не перевіряються, а помилки беруться з кешу. Кеш має сенс для повторної перевірки зміненого шару: перша перевірка з кешем повільніша за перевірку без нього (відбитки та запис кешу). Дефолтне значення None - без кешу.
+            - id_memory_budget (int): Бюджет пам'яті пошуку дублікатів ID шару в МБ. Хеші ID додаються в індекс після кожного пакета об'єктів, і якщо вони не вміщаються в бюджет, сортуються на диску в тимчасовій папці. Бюджет не обмежує хеші ID, які зберігаються для перевірки між файлами (global_id_check, 16 байт на об'єкт) та передаються з процесів-виконавців (workers). Дефолтне значення 256.
+            - global_id_check (bool): Перевірити, чи не повторюються ID об'єктів (поле attribute_is_id структури) в різних файлах та шарах. Дефолтне значення True.
+            - reference_check (bool): Перевірити посилання полів на інші шари (колонка attribute_reference структури, наприклад buildings_polygon.str_id на streets.str_id). Дефолтне значення True.
+            - column_profile (bool): Профілювати під час перевірки об'єктів всі поля шару. Профіль (кількість NULL та порожніх значень, довжина, частка цілих чисел, наближена кількість унікальних значень) показується в результатах шару. Дефолтне значення False - профілюються лише поля, які перевірка читає і без профілю (поля структури та поля для перевірки типів полів GeoJSON); True - читаються та профілюються також решта полів шару, що повільніше.
+            - structure_cache (str): Папка кешу скомпільованих структур. Структура читається з pickle, поки не змінились її CSV. Дефолтне значення None - структура компілюється з CSV один раз в процесі.
+            - result_cache (str): Шлях до файлу SQLite кешу результатів шарів. Незмінені з попереднього запуску файли (шлях, розмір, час зміни) не відкриваються і не перевіряються. Дефолтне значення None - без кешу.
+            - result_cache_size (int): Розмір кешу результатів в МБ, при перевищенні видаляються найдавніше використані результати. Дефолтне значення 256.
+            - result_cache_bypass (bool): Перевірити шари заново, не беручи результати з кешу (кеш оновлюється). Дефолтне значення False.
+
+    Returns:
+        dict: Словник з результатами валідатору.
+            - layers (dict): Словник результатів валідатору для кожного шару.
+            - exchange_format_error (list): Список шарів з помилками формату обміну.
+            - missing_layers (list): Список відсутніх шарів.
+    """
+    layers = input_list[0]
+    structure_folder = input_list[1]
+    options = input_list[2] if len(input_list) > 2 else {}
+    result_sink = create_result_sink(options)
+    result_cache = create_result_cache(options, structure_folder)
+    all_layers_check_result_dict = {}
+    all_layers_check_result_dict['layers'] = {}
+    all_layers_check_result_dict['exchange_format_error'] = []
+    all_layers_check_result_dict['missing_layers'] = []
+
+    # ID, що повторюються в різних файлах та шарах поставки
+    global_id_index = create_global_id_index(options)
+    # посилання полів на ключі інших шарів (attribute_reference структури)
+    reference_index = create_reference_index(options)
+
+    workers = get_workers_count(options)
+
+    # структура і домени однакові для всіх шарів перевірки, тому читаємо і компілюємо їх один раз
+    # (при паралельній перевірці - один раз в кожному процесі-виконавці, structure_registry)
+    structure = None
+    if workers <= 1:
+        structure = load_structure(structure_folder, get_structure_cache_folder(options))
+
+    print('start run_validator.................')
+    # кожен шар перевіряється з власним ogr.Open (якщо його результату немає в кеші), результати повертаються в порядку словника layers
+    layers_results = iter_layers_results(layers, structure_folder, workers = workers, task = task, structure = structure, shard_size = get_shard_size(options), options = options, result_sink = result_sink, result_cache = result_cache)
+    return collect_validator_output(layers, layers_results, result_sink, global_id_index, reference_index)
+
+class LayerValidationTask(QgsTask):
+    '''
+    Підзадача перевірки одного шару в менеджері задач QGIS (послідовна перевірка, options['workers'] 1).
+
+    Прогрес - частка перевірених об'єктів шару (EDRA_exchange_layer_checker.advance_progress).
+    При скасуванні в layer_result залишається результат вже перевірених об'єктів шару.
+    '''
+    def __init__(self, layer_id: str, layer_props: dict, parent_task: 'ValidatorTask'):
+        super().__init__(f"Перевірка шару «{layer_props['layer_name']}»", QgsTask.CanCancel)
+        self.layer_id = layer_id
+        self.layer_props = layer_props
+        self.parent_task = parent_task
+        self.layer_result = None
+        self.exception = None
+
+    def run(self):
+        options = self.parent_task.options
+        try:
+            for layer_id, layer_result in iter_layers_results(
+                    {self.layer_id: self.layer_props},
+                    self.parent_task.structure_folder,
+                    workers = 1,
+                    task = self,
+                    structure = self.parent_task.get_structure(),
+                    shard_size = get_shard_size(options),
+                    options = options,
+                    result_cache = self.parent_task.result_cache):
+                self.layer_result = layer_result
+        except Exception as e:
+            self.exception = e
+            return False
+        return not self.isCanceled()
+
+
+def get_plugin_cache_folder() -> str:
+    '''Папка кешів плагіна в профілі користувача QGIS.'''
+    return os.path.join(QgsApplication.qgisSettingsDirPath(), 'ua_orthodoxy_validator')
+
+
+class ValidatorTask(QgsTask):
+    '''
+    Перевірка шарів у фоні.
+
+    Якщо options['workers'] більше 1 (за замовчуванням - кількість ядер процесора), задача сама перевіряє всі шари
+    в одному пулі процесів (iter_layers_results): шари та діапазони FID великих шарів ділять між собою options['workers'] процесів,
+    прогрес задачі - частка вже перевірених об'єктів всіх шарів, а скасування зупиняє процеси після поточного пакета об'єктів.
+    Інакше шари перевіряються підзадачами LayerValidationTask, по одній на шар,
+    і основна задача починається після всіх підзадач (ParentDependsOnSubTask).
+
+    Результати збираються в collect_validator_output у фоні (в run, а якщо задачу скасовано разом з підзадачею і run
+    не виконувався - в CollectOutputTask) і в головному потоці передаються в
+    on_finished(результат, чи завершено повністю, список помилок перевірки шарів).
+    Якщо перевірку скасовано, on_finished отримує результати вже перевірених шарів та об'єктів.
+    '''
+    def __init__(self, input_list: list, on_finished):
+        super().__init__('Перевірка шарів', QgsTask.CanCancel)
+        self.layers = input_list[0]
+        self.structure_folder = input_list[1]
+        self.options = input_list[2] if len(input_list) > 2 else {}
+        self.on_finished = on_finished
+        self.result_cache = create_result_cache(self.options, self.structure_folder)
+        self.workers = get_workers_count(self.options)
+        self.output = None
+        # тексти помилок перевірки шарів для on_finished
+        self.errors = []
+        # результати шарів, перевірених в пулі процесів (self.workers > 1)
+        self.layers_results = []
+        # задача збору результатів після скасування (finished)
+        self.collect_task = None
+        
+        # посилання на підзадачі зберігаються, щоб python-об'єкти жили до завершення задачі
+        self.layer_tasks = []
+        if self.workers > 1:
+            # кожна підзадача з власним пулом процесів перевантажила б процесор (шари x ядра)
+            return
+        for layer_id, layer_props in self.layers.items():
+            layer_task = LayerValidationTask(layer_id, layer_props, self)
+            self.layer_tasks.append(layer_task)
+            self.addSubTask(layer_task, [], QgsTask.ParentDependsOnSubTask)
+
+    def get_structure(self) -> dict:
+        '''Структура компілюється один раз в процесі (structure_registry), інші підзадачі чекають на неї.'''
+        return load_structure(self.structure_folder, get_structure_cache_folder(self.options))
+
+    def collect_output(self, completed: bool) -> list:
+        '''Дерево результатів перевірених шарів (collect_validator_output); completed - чи перевірено всі шари.'''
+        layers_results = list(self.layers_results)
+        for layer_task in self.layer_tasks:
+            if layer_task.exception is not None:
+                self.errors.append(f"Помилка перевірки шару «{layer_task.layer_props['layer_name']}»: {layer_task.exception}")
+            if layer_task.layer_result is not None:
+                layers_results.append((layer_task.layer_id, layer_task.layer_result))
+        # після скасування ключі частини шарів невідомі, тому посилання не перевіряються
+        reference_index = create_reference_index(self.options) if completed else None
+        return collect_validator_output(self.layers, layers_results, create_result_sink(self.options), create_global_id_index(self.options), reference_index)
+
+    def run(self):
+        completed = True
+        if self.workers > 1:
+            try:
+                for layer_id, layer_result in iter_layers_results(
+                        self.layers,
+                        self.structure_folder,
+                        workers = self.workers,
+                        task = self,
+                        shard_size = get_shard_size(self.options),
+                        options = self.options,
+                        result_cache = self.result_cache):
+                    self.layers_results.append((layer_id, layer_result))
+            except Exception as e:
+                self.errors.append(f"Помилка перевірки шарів: {e}")
+                completed = False
+        completed = completed and not self.isCanceled()
+        # результати вже перевірених шарів збираються і після скасування або помилки, у фоні, а не в головному потоці (finished)
+        self.output = collect_task_output(self, completed)
+        return completed
+
+    def finished(self, result):
+        if self.output is None:
+            # задачу скасовано разом з підзадачею LayerValidationTask до run - результати збирає окрема фонова задача
+            self.collect_task = CollectOutputTask(self)
+            QgsApplication.taskManager().addTask(self.collect_task)
+            return
+        self.on_finished(self.output, result, self.errors)
+
+
+def collect_task_output(validator_task: ValidatorTask, completed: bool) -> list:
+    '''ValidatorTask.collect_output з помилкою збору в validator_task.errors (тоді результат - порожній список).'''
+    try:
+        return validator_task.collect_output(completed)
+    except Exception as e:
+        validator_task.errors.append(f"Помилка збору результатів перевірки: {e}")
+        return []
+
+
+class CollectOutputTask(QgsTask):
+    '''
+    Збір результатів скасованої ValidatorTask, run якої не виконувався (ValidatorTask.finished).
+    Дерево результатів, індекс ID між файлами та читання об'єктів з повторюваними ID займають час,
+    тому виконуються у фоні, а в головному потоці викликається лише on_finished.
+    '''
+    def __init__(self, validator_task: ValidatorTask):
+        super().__init__('Збір результатів перевірки')
+        self.validator_task = validator_task
+
+    def run(self):
+        self.validator_task.output = collect_task_output(self.validator_task, False)
+        return True
+
+    def finished(self, result):
+        self.validator_task.on_finished(self.validator_task.output, False, self.validator_task.errors)
+
 class customlayerListWidget(QTreeWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -368,33 +563,9 @@ class layerSelectionDialog(QDialog):
         return result
 
 class MainWindow(QDialog):
-    def parse_structures(self, directory:str) -> dict:
-            temp_strcut = {}
-            for root, struct_dirs, _ in os.walk(directory):
-                for struct_dir in struct_dirs:
-                    structure_path = os.path.join(root, struct_dir)
-                    for _, version_dirs, _ in os.walk(structure_path):
-                        for sub_dir in version_dirs:
-                            version_path = os.path.join(structure_path, sub_dir)
-                            
-                            converter = Csv_to_json_structure_converter(version_path)
-                            temp_metadata = converter.create_metadata_json()
-                            temp_csr = converter.create_crs_json()
-                            temp_branch = {
-                                'path': version_path, #треба буде доробити в плагіні
-                                'structure_name': temp_metadata["structure_name"],
-                                'structure_date': temp_metadata["structure_date"],
-                                'author': temp_metadata["author"],
-                                'description': temp_metadata["description"],
-                                'format': temp_metadata["format"],
-                                'crs': temp_csr
-                            }
-                            
-                            if temp_metadata["short_structure_name"] not in temp_strcut:
-                                temp_strcut[temp_metadata["short_structure_name"]] = {}
-                            temp_strcut[temp_metadata["short_structure_name"]][temp_metadata["structure_version"]] = temp_branch
-                    
-            return temp_strcut
+    def get_selected_structure(self) -> dict:
+        '''Повні метадані обраної версії структури (StructureCatalogue.get_details).'''
+        return self.structure_catalogue.get_details(self.BGD_type_combo_box.currentText(), self.BGD_version_combo_box.currentText())
 
     def __init__(self, parent=None):
         self.bench = Benchmark("Головне вікно")
@@ -416,7 +587,8 @@ class MainWindow(QDialog):
         def update_crs_combo_box():
             if self.BGD_version_combo_box.currentText() != '' and self.BGD_type_combo_box.currentText() != '':
                 self.crs_combo_box.clear()
-                self.crs_combo_box.addItems([key for key in self.strutures[self.BGD_type_combo_box.currentText()][self.BGD_version_combo_box.currentText()]['crs'].keys()])
+                # системи координат читаються лише для обраної версії структури
+                self.crs_combo_box.addItems([key for key in self.get_selected_structure()['crs'].keys()])
                 if self.crs_combo_box.count() == 1:
                     self.crs_combo_box.hide()
                 else:
@@ -483,7 +655,9 @@ class MainWindow(QDialog):
         layerslayout.addWidget(self.layer_list_widget)
         self.plugin_dir = os.path.dirname(__file__)
         self.path_to_structures = os.path.join(self.plugin_dir, 'stuctures')
-        self.strutures = self.parse_structures(self.path_to_structures)
+        # легкий індекс структур з маніфесту, без читання CSV всіх версій
+        self.structure_catalogue = StructureCatalogue(self.path_to_structures, os.path.join(get_plugin_cache_folder(), 'structures_manifest.json'))
+        self.strutures = self.structure_catalogue.versions
         
         self.BGD_type_combo_box = QComboBox()
         self.BGD_type_combo_box.addItems(self.strutures.keys())
@@ -503,6 +677,10 @@ class MainWindow(QDialog):
         layerslayout.addWidget(self.BGD_type_combo_box)
         layerslayout.addWidget(self.BGD_version_combo_box)
         layerslayout.addWidget(self.crs_combo_box)
+        # результати незмінених файлів беруться з кешу, прапорець дозволяє перевірити їх заново (кеш оновлюється)
+        self.bypass_cache_check_box = QCheckBox("Перевірити заново, без кешу результатів")
+        self.bypass_cache_check_box.setToolTip("Всі шари перевіряються, навіть якщо їх файли не змінились з попередньої перевірки")
+        layerslayout.addWidget(self.bypass_cache_check_box)
         self.runButton = QPushButton("Запустити перевірку")
         self.runButton.clicked.connect(self.run)
         layerslayout.addWidget(self.runButton)
@@ -510,33 +688,18 @@ class MainWindow(QDialog):
         self.bench.stop()
     
     def run(self):
-        def обробник(помилка, результат = None):
-            print('обробник')
-            if помилка is None:
-                print('помилка is None')
-                if результат is None:
-                    print('результат is None')
-                    pass
-                else:
-                    #self.validator_result = результат
-                    print('Запускаю вікно результату')
-                    window = ResultWindow(результат, parent=self)
-                    print("Вікно результату запущено")
-                    window.show()
-            else:
-                print(помилка)
-                raise помилка
         layers_dict = {}
-        structure_folder = self.strutures[self.BGD_type_combo_box.currentText()][self.BGD_version_combo_box.currentText()]['path']
+        selected_structure = self.get_selected_structure()
+        structure_folder = selected_structure['path']
         #print(json.dumps(self.strutures, indent=4, ensure_ascii=False))
         self.bench.start('run')
         
         for i in range(self.layer_list_widget.topLevelItemCount()):
             layer = self.layer_list_widget.topLevelItem(i)
             layer = cast(layerItem, layer)
-            crs_text = self.strutures[self.BGD_type_combo_box.currentText()][self.BGD_version_combo_box.currentText()]['crs'][self.crs_combo_box.currentText()]
+            crs_text = selected_structure['crs'][self.crs_combo_box.currentText()]
             crs_list = crs_text.replace(' ', '').replace('\r', '').replace('\n', '').replace('\t', '').replace(';', ',').split(',')
-            required_file_format = self.strutures[self.BGD_type_combo_box.currentText()][self.BGD_version_combo_box.currentText()]['format']
+            required_file_format = selected_structure['format']
             #print(required_file_format)
 
             layers_dict[layer.getID()] = {
@@ -547,9 +710,25 @@ class MainWindow(QDialog):
                 'exchange_format': required_file_format
                 }
             
-        input = [layers_dict, structure_folder]
+        options = {
+            'result_cache': os.path.join(get_plugin_cache_folder(), 'result_cache.sqlite'),
+            'result_cache_bypass': self.bypass_cache_check_box.isChecked(),
+            'structure_cache': os.path.join(get_plugin_cache_folder(), 'structures')
+        }
+        input = [layers_dict, structure_folder, options]
         self.bench.start('run_validator')
-        result_list = run_validator(task = None, input_list = input)
+        # перевірка виконується у фоні, QGIS не блокується; результат показує show_validator_result
+        self.runButton.setEnabled(False)
+        self.validator_task = ValidatorTask(input, self.show_validator_result)
+        QgsApplication.taskManager().addTask(self.validator_task)
+
+    def show_validator_result(self, result_list: list, completed: bool, errors: list):
+        self.runButton.setEnabled(True)
+        self.validator_task = None
+        for error in errors:
+            iface.messageBar().pushCritical("Помилка перевірки", error)
+        if not completed:
+            iface.messageBar().pushWarning("Перевірку не завершено", "Показано результати вже перевірених шарів")
         self.bench.start('result_window')
         window = ResultWindow(result_list, parent=self)        
         self.bench.start('show_window')
@@ -557,17 +736,6 @@ class MainWindow(QDialog):
         self.bench.stop()
         self.bench.print_report()
 
-        # self.validator_task = QgsTask.fromFunction('Валідую валідую, та не вивалідую', run_validator, on_finished = обробник, input_list = input)
-        # tm = QgsApplication.taskManager()
-        # tm.addTask(self.validator_task)
-        
-        # result_structure = run_validator(
-        #     layers = layers_dict,
-        #     structure_folder = self.strutures[self.BGD_type_combo_box.currentText()][self.BGD_version_combo_box.currentText()]['path'])
-        
-        # window = ResultWindow(result_structure, parent=self)#iface.mainWindow())
-        # window.show()
-
     def openFiles(self, addLayers:bool = False):
         def random_id(layerName):
             randomid = ''.join(random.choice(string.ascii_lowercase + string.digits) for _ in range(36))
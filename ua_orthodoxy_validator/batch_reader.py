@@ -0,0 +1,240 @@
+from osgeo import ogr
+
+import numpy as np
+
+# Кількість об'єктів в одному пакеті (record batch)
+DEFAULT_BATCH_SIZE = 65536
+
+
+def arrow_stream_supported(layer: ogr.Layer) -> bool:
+    '''
+    Перевіряє, чи можна читати шар через ogr.Layer.GetArrowStreamAsNumPy (GDAL 3.6+ з numpy біндінгами).
+    '''
+    if not hasattr(layer, 'GetArrowStreamAsNumPy'):
+        return False
+    try:
+        from osgeo import gdal_array
+    except ImportError:
+        return False
+    return True
+
+
+def fid_range_filter(layer: ogr.Layer, fid_range, driver_name: str = None) -> str:
+    '''
+    Атрибутивний фільтр для діапазону FID [перший FID, FID після останнього).
+    Для GPKG фільтр виконує SQLite, тому використовується реальна назва колонки FID. Інші драйвери
+    (OpenFileGDB, Shapefile) виконують фільтр через OGR SQL, де колонка FID (OBJECTID) не є полем шару,
+    тому використовується спеціальне поле FID.
+    '''
+    fid_column = (layer.GetFIDColumn() if driver_name == 'GPKG' else None) or 'FID'
+    return f'"{fid_column}" >= {int(fid_range[0])} AND "{fid_column}" < {int(fid_range[1])}'
+
+
+def set_fid_range_filter(layer: ogr.Layer, fid_range, driver_name: str = None) -> bool:
+    '''
+    Встановлює фільтр діапазону FID (fid_range_filter).
+
+    :return: False, якщо драйвер не прийняв фільтр: шар тоді не відфільтрований і діапазон читати не можна
+    '''
+    try:
+        error_code = layer.SetAttributeFilter(fid_range_filter(layer, fid_range, driver_name))
+    except Exception:
+        error_code = -1
+    if error_code != 0:
+        layer.SetAttributeFilter(None)
+        return False
+    return True
+
+
+def get_fid_ranges(layer: ogr.Layer, features_per_range: int) -> list:
+    '''
+    Ділить шар на діапазони FID приблизно по features_per_range об'єктів.
+    Межі беруться з першого та останнього об'єкта через SetNextByIndex, тому поділ
+    можливий лише для драйверів зі швидким довільним доступом (GPKG, OpenFileGDB).
+
+    :return: список пар (перший FID, FID після останнього), впорядкований за FID, або None, якщо шар не потрібно ділити
+    '''
+    if not layer.TestCapability(ogr.OLCFastSetNextByIndex):
+        return None
+    feature_count = layer.GetFeatureCount()
+    if feature_count <= features_per_range:
+        return None
+
+    layer.SetNextByIndex(0)
+    first_feature = layer.GetNextFeature()
+    layer.SetNextByIndex(feature_count - 1)
+    last_feature = layer.GetNextFeature()
+    layer.ResetReading()
+    if first_feature is None or last_feature is None:
+        return None
+
+    first_fid = first_feature.GetFID()
+    end_fid = last_feature.GetFID() + 1
+    if end_fid <= first_fid:
+        return None
+
+    ranges_count = -(-feature_count // features_per_range)
+    range_width = -(-(end_fid - first_fid) // ranges_count)
+    fid_ranges = []
+    for range_start in range(first_fid, end_fid, range_width):
+        fid_ranges.append((range_start, min(range_start + range_width, end_fid)))
+    # крайні діапазони відкриті, щоб не втратити об'єкти, якщо порядок FID не строго зростаючий
+    fid_ranges[0] = (-2**63, fid_ranges[0][1])
+    fid_ranges[-1] = (fid_ranges[-1][0], 2**63 - 1)
+    return fid_ranges
+
+
+def normalize_arrow_column(values):
+    '''
+    Приводить колонку з GetArrowStreamAsNumPy до вигляду, який повертає ogr.Feature.GetField:
+    текстові значення з bytes декодуються в str, NULL залишаються None (або замаскованими).
+    '''
+    if values.dtype != object:
+        return values
+
+    data = np.ma.getdata(values)
+    decoded = np.empty(len(data), dtype=object)
+    for i, value in enumerate(data):
+        if isinstance(value, bytes):
+            decoded[i] = value.decode('utf-8', errors='replace')
+        else:
+            decoded[i] = value
+    if isinstance(values, np.ma.MaskedArray):
+        decoded[np.ma.getmaskarray(values)] = None
+    return decoded
+
+
+class ColumnBatch:
+    '''
+    Пакет об'єктів шару у вигляді колонок.
+
+    Має такі властивості:
+        - fids - FID об'єктів пакета,
+        - columns - список колонок (numpy.ndarray або list) в порядку індексів полів, переданих в FeatureBatchReader.
+    '''
+    __slots__ = ('fids', 'columns')
+
+    def __init__(self, fids, columns):
+        self.fids = fids
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.fids)
+
+    def rows(self):
+        '''
+        Ітерує пакет по рядках.
+
+        :return: генератор пар (FID, кортеж значень полів) з python-типами значень (як в ogr.Feature.GetField)
+        '''
+        fids = self.fids.tolist() if hasattr(self.fids, 'tolist') else self.fids
+        if len(self.columns) == 0:
+            return ((fid, ()) for fid in fids)
+        columns = [column.tolist() if hasattr(column, 'tolist') else column for column in self.columns]
+        return zip(fids, zip(*columns))
+
+
+def get_unused_fields(layer: ogr.Layer, field_indexes: list) -> list:
+    '''
+    Назви полів шару, яких немає в field_indexes, для ogr.Layer.SetIgnoredFields.
+    Геометрія (OGR_GEOMETRY) та стиль (OGR_STYLE) при перевірці атрибутів теж не потрібні.
+    '''
+    layer_definition = layer.GetLayerDefn()
+    used_indexes = set(field_indexes)
+    unused_fields = [layer_definition.GetFieldDefn(i).GetName() for i in range(layer_definition.GetFieldCount()) if i not in used_indexes]
+    return unused_fields + ['OGR_GEOMETRY', 'OGR_STYLE']
+
+
+class FeatureBatchReader:
+    '''
+    Читає атрибути шару пакетами колонок без створення ogr.Feature на кожен об'єкт.
+
+    Якщо версія GDAL або драйвер не підтримують Arrow, використовується звичайний
+    ітератор по об'єктах, який збирає ті ж пакети.
+    Поля, яких немає в field_indexes, та геометрія на час читання ігноруються (SetIgnoredFields),
+    після читання всі поля шару знову читаються.
+    '''
+    def __init__(self, layer: ogr.Layer, field_indexes: list, batch_size: int = DEFAULT_BATCH_SIZE, use_arrow: bool = True, ignore_unused: bool = True):
+        '''
+        :param layer: шар, що читається
+        :param field_indexes: індекси полів ogr.FeatureDefn, які потрібно прочитати
+        :param batch_size: кількість об'єктів в пакеті
+        :param use_arrow: дозволити читання через Arrow
+        :param ignore_unused: не читати інші поля та геометрію
+        '''
+        self.layer = layer
+        self.field_indexes = list(field_indexes)
+        layer_definition = layer.GetLayerDefn()
+        self.field_names = [layer_definition.GetFieldDefn(i).GetName() for i in self.field_indexes]
+        self.batch_size = batch_size
+        self.use_arrow = use_arrow and arrow_stream_supported(layer)
+        self.used_arrow = False
+        self.ignored_fields = get_unused_fields(layer, self.field_indexes) if ignore_unused else []
+        # примітки про невдалий пропуск полів та читання через Arrow (для звіту Benchmark), замість друку під час читання
+        self.notes = []
+
+    def __iter__(self):
+        self.set_ignored_fields(self.ignored_fields)
+        try:
+            if self.use_arrow:
+                stream = self.open_arrow_stream()
+                if stream is not None:
+                    self.used_arrow = True
+                    yield from self.iter_arrow_batches(stream)
+                    return
+            yield from self.iter_row_batches()
+        finally:
+            self.set_ignored_fields([])
+
+    def set_ignored_fields(self, fields_names: list):
+        if len(fields_names) == 0 and len(self.ignored_fields) == 0:
+            return
+        try:
+            error_code = self.layer.SetIgnoredFields(fields_names)
+        except Exception:
+            error_code = -1
+        if error_code != 0:
+            self.notes.append(f'Не вдалося пропустити поля шару {self.layer.GetName()} при читанні: {fields_names}')
+            self.ignored_fields = []
+
+    def get_ignored_report(self) -> str:
+        '''Текстовий звіт про поля, пропущені при читанні.'''
+        ignored_attributes = [name for name in self.ignored_fields if not name.startswith('OGR_')]
+        report = f"Прочитано {len(self.field_indexes)} з {len(self.field_indexes) + len(ignored_attributes)} полів шару {self.layer.GetName()}"
+        if 'OGR_GEOMETRY' in self.ignored_fields:
+            report += ', геометрія не читалась'
+        if ignored_attributes:
+            report += f'. Пропущені поля: {", ".join(ignored_attributes)}'
+        return report
+
+    def open_arrow_stream(self):
+        try:
+            return self.layer.GetArrowStreamAsNumPy(options = [f'MAX_FEATURES_IN_BATCH={self.batch_size}', 'INCLUDE_FID=YES'])
+        except Exception as e:
+            self.notes.append(f'Arrow не підтримується для шару {self.layer.GetName()}: "{e}", використовується читання по об\'єктах')
+            return None
+
+    def iter_arrow_batches(self, stream):
+        fid_column = self.layer.GetFIDColumn() or 'OGC_FID'
+        try:
+            for batch in stream:
+                columns = [normalize_arrow_column(batch[name]) for name in self.field_names]
+                yield ColumnBatch(batch[fid_column], columns)
+        finally:
+            del stream
+            self.layer.ResetReading()
+
+    def iter_row_batches(self):
+        field_indexes = self.field_indexes
+        fids = []
+        columns = [[] for _ in field_indexes]
+        for feature in self.layer:
+            fids.append(feature.GetFID())
+            for column, field_index in zip(columns, field_indexes):
+                column.append(feature.GetField(field_index))
+            if len(fids) >= self.batch_size:
+                yield ColumnBatch(fids, columns)
+                fids = []
+                columns = [[] for _ in field_indexes]
+        if len(fids) > 0:
+            yield ColumnBatch(fids, columns)
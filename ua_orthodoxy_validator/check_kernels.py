@@ -0,0 +1,274 @@
+import numpy as np
+
+from .domain_lookup import DomainLookup, is_integer_text
+
+# Векторні перевірки атрибутів для пакетів колонок (ColumnBatch з batch_reader).
+# Кожна перевірка повертає маску помилок для всього пакета, індекси помилкових рядків дає error_indexes.
+# Семантика і критичність збігаються з EDRA_validator.check_attr_value_in_domain та
+# check_feature_attribute_length_exceed, але без виклику python-функцій на кожен рядок.
+
+# Коди приміток до помилок домену
+DOMAIN_NOTE_NONE = 0
+DOMAIN_NOTE_TYPE_MISMATCH = 1
+DOMAIN_NOTE_SPACES = 2
+DOMAIN_NOTE_NOT_IN_DOMAIN = 3
+
+DOMAIN_NOTES = {
+    DOMAIN_NOTE_NONE: '',
+    DOMAIN_NOTE_TYPE_MISMATCH: 'Фактичне значення відповідає домену, але ймовірно тип атрибуту не відповідає структурі',
+    DOMAIN_NOTE_SPACES: 'Фактичне значення відповідає домену, але в значенні міститься пробіл та тип атрибуту не відповідає структурі',
+    DOMAIN_NOTE_NOT_IN_DOMAIN: 'Значення не відповідає домену',
+}
+
+# Текстові колонки з довшими значеннями не перетворюються в numpy рядки фіксованої довжини,
+# щоб одне довге значення не роздувало пам'ять всього пакета
+MAX_VECTOR_TEXT_LEN = 256
+
+
+def as_array(column) -> np.ndarray:
+    '''Перетворює колонку (list з рядкового читання або numpy масив) в numpy масив.'''
+    if isinstance(column, np.ndarray):
+        return column
+    array = np.empty(len(column), dtype=object)
+    for i, value in enumerate(column):
+        array[i] = value
+    return array
+
+
+def python_value(column, index):
+    '''Повертає значення колонки з python-типом, як його повернув би ogr.Feature.GetField.'''
+    value = column[index]
+    if value is np.ma.masked:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def error_indexes(mask: np.ndarray) -> np.ndarray:
+    '''Індекси рядків пакета, для яких маска помилок істинна.'''
+    return np.flatnonzero(mask)
+
+
+def null_mask(values: np.ndarray) -> np.ndarray:
+    '''Маска NULL значень колонки.'''
+    if isinstance(values, np.ma.MaskedArray):
+        mask = np.ma.getmaskarray(values).copy()
+        if values.dtype == object:
+            mask |= np.equal(np.ma.getdata(values), None)
+        return mask
+    if values.dtype == object:
+        return np.equal(values, None)
+    return np.zeros(len(values), dtype=bool)
+
+
+def column_kind(values: np.ndarray, nulls: np.ndarray) -> str:
+    '''
+    Визначає тип значень колонки: 'int', 'float', 'str', 'other' (інші або змішані типи) або 'null' (всі значення NULL).
+    '''
+    if values.dtype != object:
+        if values.dtype.kind in 'biu':
+            return 'int'
+        if values.dtype.kind == 'f':
+            return 'float'
+        if values.dtype.kind == 'U':
+            return 'str'
+        return 'other'
+
+    value_types = set(map(type, np.ma.getdata(values)[~nulls]))
+    if len(value_types) == 0:
+        return 'null'
+    if len(value_types) > 1:
+        # змішані типи значень (можливо в GeoJSON) перевіряються поелементно
+        return 'other'
+    value_type = value_types.pop()
+    if issubclass(value_type, str):
+        return 'str'
+    if issubclass(value_type, (bool, int)):
+        return 'int'
+    if issubclass(value_type, float):
+        return 'float'
+    return 'other'
+
+
+def numeric_values(values: np.ndarray, nulls: np.ndarray) -> np.ndarray:
+    '''Числові значення колонки, NULL замінюються нулем (їх відкидає маска nulls).'''
+    data = np.ma.getdata(values)
+    if data.dtype == object:
+        data = np.where(nulls, 0, data)
+        if column_kind(values, nulls) == 'int':
+            return data.astype(np.int64)
+        return data.astype(np.float64)
+    return data
+
+
+def text_lengths(values: np.ndarray, nulls: np.ndarray, kind: str = 'str') -> np.ndarray:
+    '''Довжини текстових значень колонки (0 для NULL, -1 для не текстових значень колонки змішаних типів).'''
+    filled = np.where(nulls, '', np.ma.getdata(values))
+    if kind == 'str':
+        return np.fromiter(map(len, filled), dtype=np.int64, count=len(filled))
+    return np.fromiter((len(value) if isinstance(value, str) else -1 for value in filled), dtype=np.int64, count=len(filled))
+
+
+def text_values(values: np.ndarray, nulls: np.ndarray, lengths: np.ndarray):
+    '''
+    Текстові значення колонки як numpy масив рядків ('' для NULL).
+    Повертає None, якщо значення задовгі для векторної обробки (MAX_VECTOR_TEXT_LEN).
+    '''
+    if len(lengths) > 0 and lengths.max() > MAX_VECTOR_TEXT_LEN:
+        return None
+    return np.where(nulls, '', np.ma.getdata(values)).astype(str)
+
+
+def integer_text_mask(strings: np.ndarray) -> np.ndarray:
+    '''
+    Маска рядків, що виглядають як ціле число (з можливим мінусом на початку), як EDRA_validator.is_integer.
+    '''
+    if len(strings) == 0:
+        return np.zeros(0, dtype=bool)
+    negative = np.char.startswith(strings, '-')
+    body = np.where(negative, np.char.replace(strings, '-', '', count=1), strings)
+    return np.char.isdigit(body)
+
+
+def integer_text_in_codes(strings: np.ndarray, int_codes_array: np.ndarray) -> np.ndarray:
+    '''
+    Маска рядків-цілих чисел (див. integer_text_mask), значення яких після приведення до цілого є в int_codes_array.
+    '''
+    try:
+        return np.isin(strings.astype(np.int64), int_codes_array)
+    except (ValueError, OverflowError):
+        int_codes = set(int_codes_array.tolist())
+        result = np.zeros(len(strings), dtype=bool)
+        for i, value in enumerate(strings.tolist()):
+            try:
+                result[i] = int(value) in int_codes
+            except ValueError:
+                result[i] = False
+        return result
+
+
+def required_not_null(column) -> np.ndarray:
+    '''Маска помилок "обов'язковий атрибут не заповнений (is null)".'''
+    return null_mask(as_array(column))
+
+
+def required_not_empty(column) -> np.ndarray:
+    '''Маска помилок "обов'язковий атрибут не заповнений (is empty)".'''
+    values = as_array(column)
+    nulls = null_mask(values)
+    kind = column_kind(values, nulls)
+    if kind not in ('str', 'other'):
+        return np.zeros(len(values), dtype=bool)
+    return ~nulls & (text_lengths(values, nulls, kind) == 0)
+
+
+def text_length_exceeded(column, max_len: int):
+    '''
+    Перевірка довжини текстових значень.
+
+    :return: (маска помилок, масив довжин значень)
+    '''
+    values = as_array(column)
+    nulls = null_mask(values)
+    kind = column_kind(values, nulls)
+    if kind not in ('str', 'other'):
+        return np.zeros(len(values), dtype=bool), np.zeros(len(values), dtype=np.int64)
+    lengths = text_lengths(values, nulls, kind)
+    return ~nulls & (lengths > max_len), lengths
+
+
+def domain_criticity(column, domain: DomainLookup, attribute_type: str):
+    '''
+    Перевірка відповідності значень домену.
+
+    :return: (масив критичності 0/1/2, масив кодів приміток DOMAIN_NOTE_*); NULL значення мають критичність 0
+    '''
+    values = as_array(column)
+    nulls = null_mask(values)
+    present = ~nulls
+    size = len(values)
+    criticity = np.zeros(size, dtype=np.int8)
+    notes = np.zeros(size, dtype=np.int8)
+
+    if attribute_type == 'text':
+        criticity[present] = 2
+        notes[present] = DOMAIN_NOTE_NOT_IN_DOMAIN
+        return criticity, notes
+
+    kind = column_kind(values, nulls)
+
+    if kind in ('int', 'float'):
+        in_domain = np.isin(numeric_values(values, nulls), domain.int_codes_array)
+        wrong = present & ~in_domain
+        criticity[wrong] = 2
+        notes[wrong] = DOMAIN_NOTE_NOT_IN_DOMAIN
+        return criticity, notes
+
+    strings = None
+    if kind == 'str':
+        strings = text_values(values, nulls, text_lengths(values, nulls))
+
+    if strings is None:
+        if kind != 'null':
+            domain_criticity_by_values(values, nulls, domain, criticity, notes)
+        return criticity, notes
+
+    # значення-ціле число записане текстом: відповідає домену лише після приведення до цілого
+    integer_like = present & integer_text_mask(strings)
+    integer_like_in_domain = np.zeros(size, dtype=bool)
+    integer_like_in_domain[integer_like] = integer_text_in_codes(strings[integer_like], domain.int_codes_array)
+
+    other = present & ~integer_like
+    in_domain = np.zeros(size, dtype=bool)
+    in_domain[other] = np.isin(strings[other], domain.str_codes_array)
+
+    # значення з пробілами, яке без пробілів є кодом домену
+    with_spaces = other & ~in_domain & (np.char.find(strings, ' ') >= 0)
+    spaces_in_domain = np.zeros(size, dtype=bool)
+    if with_spaces.any():
+        stripped = np.char.replace(strings[with_spaces], ' ', '')
+        stripped_integer_like = integer_text_mask(stripped)
+        stripped_in_domain = np.zeros(len(stripped), dtype=bool)
+        stripped_in_domain[stripped_integer_like] = integer_text_in_codes(stripped[stripped_integer_like], domain.int_codes_array)
+        spaces_in_domain[with_spaces] = stripped_in_domain
+
+    type_mismatch = integer_like & integer_like_in_domain
+    criticity[type_mismatch] = 1
+    notes[type_mismatch] = DOMAIN_NOTE_TYPE_MISMATCH
+
+    criticity[spaces_in_domain] = 1
+    notes[spaces_in_domain] = DOMAIN_NOTE_SPACES
+
+    wrong = (integer_like & ~integer_like_in_domain) | (other & ~in_domain & ~spaces_in_domain)
+    criticity[wrong] = 2
+    notes[wrong] = DOMAIN_NOTE_NOT_IN_DOMAIN
+
+    return criticity, notes
+
+
+def domain_criticity_by_values(values, nulls, domain: DomainLookup, criticity, notes):
+    '''Поелементна перевірка домену для колонок, які не можна обробити векторно (довгі тексти, інші типи).'''
+    for i in np.flatnonzero(~nulls):
+        value = python_value(values, i)
+        if isinstance(value, bool) or isinstance(value, int):
+            integer_like = value != 0
+        else:
+            integer_like = is_integer_text(value)
+
+        if integer_like:
+            if value in domain.codes:
+                continue
+            if domain.match_as_int(value):
+                criticity[i] = 1
+                notes[i] = DOMAIN_NOTE_TYPE_MISMATCH
+                continue
+        elif value in domain.codes:
+            continue
+        elif isinstance(value, str) and ' ' in value and domain.match_ignoring_spaces(value):
+            criticity[i] = 1
+            notes[i] = DOMAIN_NOTE_SPACES
+            continue
+
+        criticity[i] = 2
+        notes[i] = DOMAIN_NOTE_NOT_IN_DOMAIN
@@ -2,17 +2,110 @@ from osgeo import ogr
 from qgis.core import QgsTask
 
 import json
+from array import array
+
+import numpy as np
 
 from .benchmark import Benchmark
+from .domain_lookup import compile_domain_lookups
+from .batch_reader import FeatureBatchReader, DEFAULT_BATCH_SIZE, set_fid_range_filter
+from . import check_kernels
+from .sql_pushdown import SqlPushdown
+from .result_sinks import FEATURES_CONTAINER_NAME
+from .feature_cache import FeatureFingerprintCache, get_plan_context
+from .name_index import NameIndex
+from .id_uniqueness import IdUniquenessIndex, hash_id_values, DEFAULT_ID_MEMORY_BUDGET
+from .column_profile import LayerProfile
+from .inspection_records import (
+    InspectionRecord, DuplicateGroup, DUPLICATE_SAMPLE_SIZE, INSPECTION_TEMPLATES, INSPECTION_REQUIRED_EMPTY, INSPECTION_REQUIRED_NULL, INSPECTION_REQUIRED_OK,
+    INSPECTION_DOMAIN_ERROR, INSPECTION_DOMAIN_OK, INSPECTION_LENGTH_ERROR, INSPECTION_LENGTH_OK,
+    INSPECTION_ID_DUPLICATED, INSPECTION_ID_DUPLICATED_MANY, INSPECTION_ID_UNIQUE)
+
+# Режими результату перевірки об'єктів: всі об'єкти з усіма перевірками або лише об'єкти з помилками та підсумок
+RESULT_MODE_FULL = 'full'
+RESULT_MODE_ERRORS_ONLY = 'errors_only'
+
+# Максимальна кількість прикладів однієї помилки (перевірка, поле) в шарі, решта лише рахується.
+# 0 - без обмеження
+DEFAULT_ERROR_CAP = 1000
+
+
+def format_count(count):
+    '''Число з пробілами між розрядами: 1 000 000.'''
+    return f'{count:,}'.replace(',', ' ')
 
 # Можливі помилки
 # Об'єкт з id "0" має помилку: "segments 142 and 229 of line 0 intersect at 33.5424, 48.2325"
 # value is not unique'
 
 
+def get_layer_references(structure_json: dict, layer_exchange_name: str) -> tuple:
+    '''
+    Посилання між шарами структури (колонка attribute_reference structure.csv у форматі "шар.поле").
+
+    :return: (словник {поле шару: (шар, поле), на яке воно посилається}, множина полів шару, на які посилаються інші шари)
+    '''
+    reference_fields = {}
+    referenced_fields = set()
+    for layer_name, layer_structure in structure_json.items():
+        for field_name, field_structure in layer_structure['attributes'].items():
+            reference = field_structure.get('attribute_reference') or ''
+            if '.' not in reference:
+                continue
+            target = tuple(reference.split('.', 1))
+            if layer_name == layer_exchange_name:
+                reference_fields[field_name] = target
+            if target[0] == layer_exchange_name:
+                referenced_fields.add(target[1])
+    return reference_fields, referenced_fields
+
+
+def get_reference_texts(values) -> tuple:
+    '''
+    Тексти значень полів-посилань та полів, на які посилаються, для порівняння між шарами.
+    NULL та порожні значення (текстовий NULL шейп-файлів та GDB часто читається як '') посиланнями не є і пропускаються,
+    а дійсні числа з цілим значенням записуються як цілі, щоб 5.0 одного шару збігалось з 5 іншого.
+
+    :param values: значення колонки пакета (python значення, як після tolist())
+    :return: (індекси значень, що порівнюються, їх тексти)
+    '''
+    positions = []
+    texts = []
+    for position, value in enumerate(values):
+        if value is None or value == '':
+            continue
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        positions.append(position)
+        texts.append(str(value))
+    return positions, texts
+
+
+class FieldRule:
+    '''
+    Скомпільоване правило перевірки одного поля шару.
+
+    Створюється один раз на шар в EDRA_validator.compile_fields_plan, щоб в циклі по об'єктах
+    не звертатись до fields_structure_json і не порівнювати рядки 'True' для кожного об'єкта.
+    '''
+    __slots__ = ('index', 'name', 'attribute_type', 'required', 'max_len', 'domain', 'is_id')
+
+    def __init__(self, index, name, attribute_type, required, max_len, domain, is_id):
+        self.index = index                  # індекс поля в ogr.FeatureDefn
+        self.name = name                    # назва поля
+        self.attribute_type = attribute_type
+        self.required = required            # bool, поле обов'язкове
+        self.max_len = max_len              # int або None, максимальна довжина текстового значення
+        self.domain = domain                # DomainLookup або None
+        self.is_id = is_id                  # bool, поле є ідентифікатором об'єкта
+
+    def __repr__(self):
+        return f"FieldRule({self.index}, '{self.name}', required={self.required}, max_len={self.max_len}, domain={self.domain.name if self.domain is not None else None}, is_id={self.is_id})"
+
+
 class EDRA_validator:
     
-    def __init__(self, layer, layer_exchange_name, structure_json, domains_json, driver_name):
+    def __init__(self, layer, layer_exchange_name, structure_json, domains_json, driver_name, domain_lookups = None):
 
         """
         Конструктор класу EDRA_validator.
@@ -25,6 +118,8 @@ class EDRA_validator:
         :type structure_json: dict
         :param domains_json: дані про домені значень полів шарів
         :type domains_json: dict
+        :param domain_lookups: скомпільовані домени (compile_domain_lookups), якщо не передано - компілюються тут
+        :type domain_lookups: dict
         """
 
 
@@ -44,6 +139,9 @@ class EDRA_validator:
         self.layer_exchange_name = layer_exchange_name
         self.structure_json = structure_json
         self.domains_json = domains_json
+        if domain_lookups is None:
+            domain_lookups = compile_domain_lookups(domains_json)
+        self.domain_lookups = domain_lookups
         self.driver_name = driver_name
         if layer_exchange_name in structure_json.keys():
             self.structure_field_names = structure_json[layer_exchange_name]['attributes'].keys()
@@ -73,12 +171,15 @@ class EDRA_validator:
                 'RealList': {'ogr_codes': [3], 'qt_codes': [None]},        # OFTRealList
                 'StringList': {'ogr_codes': [5], 'qt_codes': [0]}          # OFTStringList
             }
+            self.id_field = None
             for x in structure_json[layer_exchange_name]['attributes']:
-                
+
                 if structure_json[layer_exchange_name]['attributes'][x]['attribute_is_id'] == 'True':
                     self.id_field = x
                 else: pass
-                
+
+            self.reference_fields, self.referenced_fields = get_layer_references(structure_json, layer_exchange_name)
+
             self.nameError = False
         else:
             self.structure_field_names = None
@@ -86,119 +187,47 @@ class EDRA_validator:
             self.required_geometry_type = None
             self.structure_field_meta_types = None
             self.id_field = None
+            self.reference_fields = {}
+            self.referenced_fields = set()
             self.nameError = True
 
-    def str_contains_cyrillic(self, text):
-        cyrillic_to_latin_map = {
-            'А': 'A', 'В': 'B', 'С': 'C', 'Е': 'E', 'Н': 'H', 'І': 'I', 'Ј': 'J', 'К': 'K',
-            'М': 'M', 'О': 'O', 'Р': 'P', 'Ѕ': 'S', 'Т': 'T', 'Х': 'X', 'У': 'Y', 'а': 'a',
-            'с': 'c', 'е': 'e', 'і': 'i', 'ј': 'j', 'о': 'o', 'р': 'p', 'ѕ': 's', 'х': 'x',
-            'у': 'y'
-        }
-        return any(char in cyrillic_to_latin_map.keys() for char in text)
-    
-    def convert_cyrillic_to_latin_text(self, text):
-        cyrillic_to_latin_map = {
-            'А': 'A', 'В': 'B', 'С': 'C', 'Е': 'E', 'Н': 'H', 'І': 'I', 'Ј': 'J', 'К': 'K',
-            'М': 'M', 'О': 'O', 'Р': 'P', 'Ѕ': 'S', 'Т': 'T', 'Х': 'X', 'У': 'Y', 'а': 'a',
-            'с': 'c', 'е': 'e', 'і': 'i', 'ј': 'j', 'о': 'o', 'р': 'p', 'ѕ': 's', 'х': 'x',
-            'у': 'y'
-        }
-        
-        return ''.join(cyrillic_to_latin_map.get(char, char) for char in text)
+        self.name_indexes = {}
+        self.fields_plan = []
+        self.fields_plan_indexes = ()
+        self.id_field_index = None
+        self.id_plan_position = None
+        if self.layer is not None and not self.nameError:
+            self.compile_fields_plan()
 
-    def str_contains_uppercase(self, text):
-        return any(char.isupper() for char in text)
-    
-    def str_contains_spaces(self, text):
-        return ' ' in text
-    
     def is_integer(self, string):
     # Перевіряємо, чи є рядок мінусовим числом
         if string:
             if isinstance(string, int):
                 return True
+            if not isinstance(string, str):
+                return False
             if string.startswith('-'):
                 return string[1:].isdigit() and len(string) > 1
             return string.isdigit()
         else: return False
     
-    def check_object_name(self, current_text, required_text, alias):
-        
-        error_dict = {}
-        if type(current_text) == str and type(required_text) == str and type(alias) == str:
+    def get_name_index(self, type) -> NameIndex:
+        '''Індекс назв шарів структури (type = layer) або полів шару (type = field), будується один раз.'''
+        if type not in self.name_indexes:
+            if type == 'layer':
+                self.name_indexes[type] = NameIndex(self.structure_json, 'layer_name_ua')
+            if type == 'field':
+                self.name_indexes[type] = NameIndex(self.fields_structure_json, 'attribute_name_ua')
+        return self.name_indexes[type]
+
+    def suggest_object_names(self, current_text, type) -> list:
+        '''Схожі назви шарів (type = layer) або полів (type = field) структури для назви, якої в ній немає.'''
+        return self.get_name_index(type).suggest(current_text)
 
-            if len(error_dict.keys()) == 0 and not self.str_contains_uppercase(required_text) and not self.str_contains_cyrillic(required_text) and not self.str_contains_spaces(required_text):
-                current_text_not_changed = None
-                
-                current_text_not_changed = current_text
-                current_text = current_text.lower()
-                # print(current_text == required_text)
-                current_text = self.convert_cyrillic_to_latin_text(current_text)
-                # print(current_text == required_text)
-                current_text = current_text.replace(' ', '')
-                # print(f'current_text {current_text}')
-                
-                if current_text == required_text:
-                    # print(f'current_text == required_text is TRUE')
-                    if self.str_contains_uppercase(current_text_not_changed):
-                        # print('capit')
-                        error_dict['capital_leters'] = True
-                    if self.str_contains_cyrillic(current_text_not_changed):
-                        # print('cyr')
-                        error_dict['used_cyrillic'] = True
-                    if self.str_contains_spaces(current_text_not_changed):
-                        # print('space')
-                        error_dict['spaces_used'] = True
-                elif current_text == alias:
-                    error_dict['used_alias'] = required_text
-                
-        else:
-            raise TypeError
-        
-        return error_dict
-    
-    
     def check_text_in_objects_list(self, current_text, type):
         #type = layer OR field
-        
-        if type == 'layer': 
-            object_alias_key = 'layer_name_ua'
-            object_json = self.structure_json
-            
-        if type == 'field':    
-            object_alias_key = 'attribute_name_ua'
-            object_json = self.fields_structure_json
-            
-        all_errors_dict = {}
-        
-        for required_text in object_json.keys():
-            if current_text == required_text:
-                return {'any_similar_name': True, "result_dict": {}}
-            alias = object_json[required_text][object_alias_key]
-            
-            error_dict = self.check_object_name(current_text, required_text, alias)
-            # print(f'Errors:\r\n{error_dict}')
-            if len(error_dict.keys()) == 0:
-                all_errors_dict[required_text] = {"general": True}
-            else:    
-                error_dict['valid_name'] = required_text
-                # print(error_dict)
-                all_errors_dict[required_text] = error_dict
-        
-        
-        for x in all_errors_dict:
-            if any(elem in all_errors_dict[x].keys() for elem in ['used_alias', 'used_cyrillic', 'spaces_used', 'capital_leters']):
-                return {'any_similar_name': True, "result_dict": all_errors_dict[x]}
-            else:
-                continue    
-        
-        # print(f'ПЕРЕВІРКА НАШОГО ТЕКСТУ {current_text} {all_errors_dict}')
-        if type == 'layer':     
-            return {'any_similar_name': False, "result_dict": {"general": True}}
-        if type == 'field':
-            return {'any_similar_name': False, "result_dict": {"general": True}}
-            
+        # пошук за нормалізованою назвою (name_index.normalize_name) в індексі назв та псевдонімів структури
+        return self.get_name_index(type).lookup(current_text)
 
     def get_required_fields_names(self):
         required_field_names_list = []
@@ -454,14 +483,11 @@ class EDRA_validator:
     
     def check_attr_value_in_domain(self, feature, field_name):        
         
-        domain_dict = self.domains_json[self.fields_structure_json[field_name]['domain']]['codes']
-        domain_codes = []
-        for x in domain_dict.keys():
-            if self.is_integer(x.replace(' ', '')) and self.fields_structure_json[field_name]['attribute_type'] != 'text':
-                domain_codes.append(int(x.replace(' ', '')))
-            else: 
-                domain_codes.append(x)
-        # print(f'DOMAIN {domain_codes} {type()}')
+        domain_lookup = self.domain_lookups[self.fields_structure_json[field_name]['domain']]
+        if self.fields_structure_json[field_name]['attribute_type'] != 'text':
+            domain_codes = domain_lookup.codes
+        else:
+            domain_codes = domain_lookup.text_codes
         
         check_result = None
         criticity = None
@@ -477,7 +503,7 @@ class EDRA_validator:
                 criticity = 0
                 note = ''
                 
-            elif int(feature[field_name])  in domain_codes:
+            elif domain_lookup.match_as_int(feature[field_name]):
                 check_result = False
                 criticity = 1
                 note = 'Фактичне значення відповідає домену, але ймовірно тип атрибуту не відповідає структурі'
@@ -497,7 +523,7 @@ class EDRA_validator:
             
                 
                 
-            elif ' ' in feature[field_name] and int(feature[field_name].replace(' ', '')) in domain_codes:
+            elif isinstance(feature[field_name], str) and ' ' in feature[field_name] and domain_lookup.match_ignoring_spaces(feature[field_name]):
                 check_result = False
                 criticity = 1
                 note = 'Фактичне значення відповідає домену, але в значенні міститься пробіл та тип атрибуту не відповідає структурі'
@@ -516,7 +542,165 @@ class EDRA_validator:
             # return {'check_result': feature[field_name] in domain_codes, "criticity": 2}
             
         return {'check_result': check_result, "criticity": criticity, "note": note}
-    
+
+    def compile_fields_plan(self):
+        '''
+        Компілює план перевірки полів шару: для кожного поля, яке є і в шарі, і в структурі,
+        створюється FieldRule з індексом поля OGR. Поля без жодної активної перевірки в план не потрапляють.
+
+        :return: список FieldRule, впорядкований за індексом поля
+        :rtype: list[FieldRule]
+        '''
+        self.fields_plan = []
+        self.id_field_index = None
+        self.id_plan_position = None
+        # позиції в плані полів-посилань ({назва поля: позиція}) та полів, на які посилаються інші шари
+        self.reference_plan_positions = {}
+        self.referenced_plan_positions = {}
+
+        for i in range(self.layerDefinition.GetFieldCount()):
+            field_name = self.layerDefinition.GetFieldDefn(i).GetName()
+            if field_name not in self.fields_structure_json:
+                continue
+
+            field_structure = self.fields_structure_json[field_name]
+            attribute_type = field_structure['attribute_type']
+
+            max_len = None
+            if attribute_type == 'text':
+                attribute_len = field_structure['attribute_len'].replace(' ', '')
+                if self.is_integer(attribute_len) and int(attribute_len) > 0:
+                    max_len = int(attribute_len)
+
+            domain = None
+            if field_structure['domain'] != '' and field_structure['domain'] is not None:
+                domain = self.domain_lookups[field_structure['domain']]
+
+            rule = FieldRule(
+                index = i,
+                name = field_name,
+                attribute_type = attribute_type,
+                required = field_structure['attribute_required'] == 'True',
+                max_len = max_len,
+                domain = domain,
+                is_id = field_name == self.id_field)
+
+            if rule.is_id:
+                self.id_field_index = i
+                self.id_plan_position = len(self.fields_plan)
+
+            # значення полів-посилань та ключів читаються в тому ж проході для перевірки посилань між шарами
+            is_reference = field_name in self.reference_fields or field_name in self.referenced_fields
+            if field_name in self.reference_fields:
+                self.reference_plan_positions[field_name] = len(self.fields_plan)
+            if field_name in self.referenced_fields:
+                self.referenced_plan_positions[field_name] = len(self.fields_plan)
+
+            if rule.required or rule.max_len is not None or rule.domain is not None or rule.is_id or is_reference:
+                self.fields_plan.append(rule)
+
+        self.fields_plan_indexes = tuple(rule.index for rule in self.fields_plan)
+        return self.fields_plan
+
+    def get_feature_values(self, feature):
+        '''Повертає кортеж значень полів об'єкта в порядку self.fields_plan.'''
+        return tuple(map(feature.GetField, self.fields_plan_indexes))
+
+    def check_value_in_domain(self, rule, value):
+        '''
+        Перевіряє значення на відповідність домену за скомпільованим правилом.
+        Логіка та критичність збігаються з check_attr_value_in_domain.
+
+        :return: None, якщо значення відповідає домену, інакше [criticity, note]
+        '''
+        if rule.attribute_type == 'text':
+            return [2, 'Значення не відповідає домену']
+
+        if self.is_integer(value):
+            if value in rule.domain.codes:
+                return None
+            if rule.domain.match_as_int(value):
+                return [1, 'Фактичне значення відповідає домену, але ймовірно тип атрибуту не відповідає структурі']
+            return [2, 'Значення не відповідає домену']
+
+        if value in rule.domain.codes:
+            return None
+        if isinstance(value, str) and ' ' in value and rule.domain.match_ignoring_spaces(value):
+            return [1, 'Фактичне значення відповідає домену, але в значенні міститься пробіл та тип атрибуту не відповідає структурі']
+        return [2, 'Значення не відповідає домену']
+
+    def check_feature_values(self, values):
+        '''
+        Виконує перевірки атрибутів одного об'єкта за планом self.fields_plan.
+
+        :param values: кортеж значень, отриманий з get_feature_values
+        :return: (список порожніх обов'язкових полів, список NULL обов'язкових полів,
+                  словник помилок домену, словник перевищення довжини)
+        '''
+        empty_fields = []
+        null_fields = []
+        domain_errors = {}
+        length_exceed = {}
+
+        for rule, value in zip(self.fields_plan, values):
+            if value is None:
+                if rule.required:
+                    null_fields.append(rule.name)
+                continue
+
+            if rule.required and value == '':
+                empty_fields.append(rule.name)
+
+            if rule.domain is not None:
+                domain_error = self.check_value_in_domain(rule, value)
+                if domain_error is not None:
+                    domain_errors[rule.name] = {"value": value, "link": 'Посилання до домену', "criticity": domain_error[0], 'note': domain_error[1]}
+
+            if rule.max_len is not None and isinstance(value, str) and len(value) > rule.max_len:
+                length_exceed[rule.name] = [len(value), rule.max_len]
+
+        return empty_fields, null_fields, domain_errors, length_exceed
+
+    def check_batch_values(self, columns):
+        '''
+        Векторна версія check_feature_values для пакета колонок (ColumnBatch.columns).
+        Перевірки виконуються модулем check_kernels над цілою колонкою, python-код виконується лише для рядків з помилками.
+
+        :param columns: колонки пакета в порядку self.fields_plan
+        :return: словник {індекс рядка в пакеті: результат як у check_feature_values} лише для рядків з помилками
+        '''
+        batch_errors = {}
+
+        def row_errors(row_index):
+            if row_index not in batch_errors:
+                batch_errors[row_index] = ([], [], {}, {})
+            return batch_errors[row_index]
+
+        for rule, column in zip(self.fields_plan, columns):
+            values = check_kernels.as_array(column)
+
+            if rule.required:
+                for row_index in check_kernels.error_indexes(check_kernels.required_not_null(values)).tolist():
+                    row_errors(row_index)[1].append(rule.name)
+                for row_index in check_kernels.error_indexes(check_kernels.required_not_empty(values)).tolist():
+                    row_errors(row_index)[0].append(rule.name)
+
+            if rule.domain is not None:
+                criticity, notes = check_kernels.domain_criticity(values, rule.domain, rule.attribute_type)
+                for row_index in check_kernels.error_indexes(criticity).tolist():
+                    row_errors(row_index)[2][rule.name] = {
+                        "value": check_kernels.python_value(values, row_index),
+                        "link": 'Посилання до домену',
+                        "criticity": int(criticity[row_index]),
+                        'note': check_kernels.DOMAIN_NOTES[int(notes[row_index])]}
+
+            if rule.max_len is not None:
+                exceeded, lengths = check_kernels.text_length_exceeded(values, rule.max_len)
+                for row_index in check_kernels.error_indexes(exceeded).tolist():
+                    row_errors(row_index)[3][rule.name] = [int(lengths[row_index]), rule.max_len]
+
+        return batch_errors
+
     def get_layer_crs(self):
         
         srs = self.layer.GetSpatialRef()
@@ -549,14 +733,19 @@ class EDRA_validator:
 
 
 class EDRA_exchange_layer_checker:
-    def __init__(self, layer:ogr.Layer, layer_exchange_name:str, structure_json:dict, domains_json:dict, layer_props: dict, layer_id: str, driver_name: str, task: QgsTask = None):
+    def __init__(self, layer:ogr.Layer, layer_exchange_name:str, structure_json:dict, domains_json:dict, layer_props: dict, layer_id: str, driver_name: str, task: QgsTask = None, domain_lookups: dict = None, data_source = None, options: dict = None, result_sink = None):
+
+        if domain_lookups is None:
+            domain_lookups = compile_domain_lookups(domains_json)
+        self.domain_lookups = domain_lookups
 
         self.layer_EDRA_valid_class = EDRA_validator(
             layer = layer,
             layer_exchange_name = layer_exchange_name,
             structure_json = structure_json,
             domains_json = domains_json,
-            driver_name = driver_name)
+            driver_name = driver_name,
+            domain_lookups = domain_lookups)
         self.layer_props = layer_props
         self.check_result_dict = {}
         self.check_result_legacy = {}
@@ -564,10 +753,49 @@ class EDRA_exchange_layer_checker:
         self.layer_props['related_layer_id'] = layer_id
         self.Task = task
         self.driver_name = driver_name
+        self.null_probe_fields = {}
+        # профіль колонок шару, зібраний під час перевірки об'єктів (column_profile), None - прохід ще не виконано
+        self.column_profile = None
+        self.batch_size = DEFAULT_BATCH_SIZE
+        self.feature_shards = None
+        # частковий індекс ID шару для перевірки унікальності ID між файлами (global_id_index)
+        self.layer_id_index = None
+        # ключі та посилання шару для перевірки посилань між шарами (reference_integrity)
+        self.layer_reference_index = None
+        if options is None:
+            options = {}
+        self.result_mode = options.get('result_mode', RESULT_MODE_FULL)
+        self.error_cap = options.get('error_cap', DEFAULT_ERROR_CAP)
+        # файл кешу відбитків об'єктів для повторних перевірок (feature_cache), None - без кешу
+        self.feature_cache_path = options.get('feature_cache')
+        # бюджет пам'яті індексу ID (IdUniquenessIndex), байт
+        self.id_memory_budget = int(options.get('id_memory_budget', DEFAULT_ID_MEMORY_BUDGET) * 1024 * 1024)
+        # хеші ID шару зберігаються для індексу ID між файлами (global_id_index) лише якщо ця перевірка увімкнена
+        self.global_id_check = options.get('global_id_check', True)
+        # профіль всіх полів шару; якщо False, профілюються лише поля плану перевірки та self.null_probe_fields,
+        # бо решта полів інакше не читається (SetIgnoredFields)
+        self.profile_all_fields = options.get('column_profile', False)
+        # {(код перевірки, назва поля): [кількість помилок, кількість записаних прикладів, максимальна критичність]}
+        self.error_counts = {}
+        # потоковий приймач (result_sinks) отримує вузли об'єктів одразу, без накопичення в контейнері шару
+        self.result_sink = result_sink
+        self.streaming_sink = result_sink is not None and result_sink.streaming
+        # агрегатні перевірки через SQL запити до джерела даних (див. sql_pushdown)
+        self.pushdown = None
+        if data_source is not None and layer is not None:
+            self.pushdown = SqlPushdown(data_source, layer, driver_name)
+        
+        # назви полів для записів перевірок об'єктів (InspectionRecord зберігає лише індекс назви)
+        self.inspection_field_names = []
+        self.inspection_field_indexes = {}
+        
+        # прогрес задачі: перевірено об'єктів з features_total (advance_progress)
+        self.features_processed = 0
+        self.features_total = None
         
         self.parse_bench = Benchmark()
         if self.Task is not None:        
-            self.Task.setProgress(3)
+            self.Task.setProgress(0)
 
     def create_inspection_dict(self, inspection_type_name=None, item_name=None, item_tool_tip=None, criticity=None, help_url=None):
         inspection_dict = {
@@ -584,6 +812,119 @@ class EDRA_exchange_layer_checker:
 
         return inspection_dict
 
+    def add_name_suggestions(self, inspection_dict: dict, correction_type: str, current_value: str, suggestions: list):
+        '''
+        Додає до перевірки назви підказки схожих назв структури: в текст перевірки та
+        в список 'corrections' (InspectionItem.addCorrection).
+        '''
+        if not suggestions:
+            return
+        suggestions_text = ', '.join(f'«{suggestion}»' for suggestion in suggestions)
+        inspection_dict['item_name'] = f"{inspection_dict['item_name']}. Можливо, мається на увазі {suggestions_text}"
+        inspection_dict['corrections'] = [
+            {'correction_type': correction_type, 'current_value': current_value, 'correct_value': suggestion}
+            for suggestion in suggestions]
+
+    def create_inspection_record(self, code, criticity, fid, field_name = None, params = ()):
+        '''
+        Створює компактний запис перевірки об'єкта (inspection_records) замість словника create_inspection_dict.
+        Текст перевірки формується з шаблону лише при відображенні.
+        '''
+        field_index = None
+        if field_name is not None:
+            field_index = self.inspection_field_indexes.get(field_name)
+            if field_index is None:
+                field_index = len(self.inspection_field_names)
+                self.inspection_field_names.append(field_name)
+                self.inspection_field_indexes[field_name] = field_index
+        return InspectionRecord(code, criticity, fid, field_index, params, self.inspection_field_names)
+
+    def get_error_key(self, code, field_name = None):
+        '''Ключ лічильника помилок: обидва варіанти тексту про дублікати ID рахуються як одна помилка.'''
+        if code == INSPECTION_ID_DUPLICATED_MANY:
+            code = INSPECTION_ID_DUPLICATED
+        return (code, field_name)
+
+    def take_error_example(self, error_key, criticity):
+        '''
+        Чи записувати помилку прикладом: не більше self.error_cap прикладів на ключ (get_error_key).
+
+        :return: True, якщо ліміт прикладів не вичерпано
+        '''
+        counts = self.error_counts.get(error_key)
+        if counts is None:
+            counts = self.error_counts[error_key] = [0, 0, criticity]
+        counts[2] = max(counts[2], criticity)
+        if self.error_cap and counts[1] >= self.error_cap:
+            return False
+        counts[1] += 1
+        return True
+
+    def count_error(self, code, criticity, field_name = None):
+        '''Рахує помилку об'єкта. Повертає True, якщо її треба записати прикладом (take_error_example).'''
+        error_key = self.get_error_key(code, field_name)
+        take_example = self.take_error_example(error_key, criticity)
+        self.error_counts[error_key][0] += 1
+        return take_example
+
+    def cap_container_examples(self, container):
+        '''
+        Відкидає з контейнера результатів об'єкта (рекурсивно) помилки понад ліміт прикладів.
+        Використовується при об'єднанні діапазонів FID: кожен процес обмежував лише свої приклади.
+        Порожні вкладені контейнери видаляються.
+
+        :return: True, якщо в контейнері залишились перевірки
+        '''
+        subitems = []
+        for item in container['subitems']:
+            if isinstance(item, InspectionRecord):
+                if item.criticity == 0 or self.take_error_example(self.get_error_key(item.code, item.field_name), item.criticity):
+                    subitems.append(item)
+            elif self.cap_container_examples(item):
+                subitems.append(item)
+        container['subitems'] = subitems
+        return len(subitems) > 0
+
+    def merge_error_counts(self, shards):
+        '''Сумарна кількість помилок з діапазонів FID; приклади перераховуються в cap_container_examples.'''
+        self.error_counts = {}
+        totals = {}
+        for shard_result in shards:
+            for error_key, (errors_count, examples_count, criticity) in shard_result['error_counts'].items():
+                totals[error_key] = totals.get(error_key, 0) + errors_count
+                counts = self.error_counts.setdefault(error_key, [0, 0, criticity])
+                counts[2] = max(counts[2], criticity)
+        for error_key, errors_count in totals.items():
+            self.error_counts[error_key][0] = errors_count
+
+    def write_error_overflow_result(self):
+        '''
+        Контейнер з кількістю помилок, що не записані прикладами через ліміт self.error_cap.
+
+        :return: контейнер або None, якщо ліміт не перевищено
+        '''
+        container_error_overflow = {}
+        container_error_overflow['type'] = 'container'
+        container_error_overflow['item_name'] = "Помилки понад ліміт прикладів"
+        container_error_overflow['subitems'] = []
+        
+        for (code, field_name), (errors_count, examples_count, criticity) in self.error_counts.items():
+            if errors_count <= examples_count:
+                continue
+            inspection_type_name = INSPECTION_TEMPLATES[code].inspection_type_name
+            field_title = f" «{field_name}»" if field_name is not None else ""
+            container_error_overflow['subitems'].append(self.create_inspection_dict(
+                inspection_type_name = inspection_type_name,
+                item_name = f"{inspection_type_name}{field_title}: ще {format_count(errors_count - examples_count)} об'єктів з цією помилкою (всього {format_count(errors_count)})",
+                item_tool_tip = f"Показано лише перші {format_count(examples_count)} об'єктів з цією помилкою",
+                criticity = criticity,
+                help_url = None
+            ))
+        
+        if len(container_error_overflow['subitems']) == 0:
+            return None
+        return container_error_overflow
+
     def check_crs_is_equal_required(self):
         layer_crs = self.layer_EDRA_valid_class.get_layer_crs()
         if self.layer_EDRA_valid_class.compare_crs(self.layer_props['required_crs_list'], layer_crs):
@@ -627,7 +968,7 @@ class EDRA_exchange_layer_checker:
         for x in self.fields_check_results_list:
             
             if x['check_field_type_result'] == False and x['check_field_name_result'] == True:
-                if self.driver_name == "GeoJSON" and x['current_field_type'] in [ogr.GetFieldTypeName(ogr_index) for ogr_index in self.layer_EDRA_valid_class.qt_and_ogr_data_types['text']['ogr_codes']] and x['current_field_name'] not in self.layer_EDRA_valid_class.get_required_fields_names() and self.layer_EDRA_valid_class.check_null_attribute(x['current_field_name']):
+                if self.driver_name == "GeoJSON" and x['current_field_type'] in [ogr.GetFieldTypeName(ogr_index) for ogr_index in self.layer_EDRA_valid_class.qt_and_ogr_data_types['text']['ogr_codes']] and x['current_field_name'] not in self.layer_EDRA_valid_class.get_required_fields_names() and self.check_null_attribute(x['current_field_name']):
                     pass
                 else:
                     errors_field_type_dict[x['current_field_name']] = [x['current_field_type'], x['required_field_type']]
@@ -637,6 +978,49 @@ class EDRA_exchange_layer_checker:
                 # self.check_result_dict['wrong feild type'] = {}
                 # self.check_result_dict['wrong feild type'][x['current_field_name']] = [ x['current_field_type'], x['required_field_type'] ]
             
+    def get_null_probe_fields(self):
+        '''
+        Повертає поля, для яких check_wrong_fields_types має знати, чи всі значення шару NULL
+        (текстові поля GeoJSON з типом, що не відповідає структурі).
+
+        :return: словник {індекс поля: назва поля}
+        '''
+        null_probe_fields = {}
+        if self.driver_name != "GeoJSON":
+            return null_probe_fields
+        
+        text_type_names = [ogr.GetFieldTypeName(ogr_index) for ogr_index in self.layer_EDRA_valid_class.qt_and_ogr_data_types['text']['ogr_codes']]
+        required_fields_names = self.layer_EDRA_valid_class.get_required_fields_names()
+        for field_index, x in enumerate(self.fields_check_results_list):
+            if x['check_field_type_result'] == False and x['check_field_name_result'] == True and x['current_field_type'] in text_type_names and x['current_field_name'] not in required_fields_names:
+                null_probe_fields[field_index] = x['current_field_name']
+        return null_probe_fields
+    
+    def get_profile_fields(self):
+        '''
+        Поля шару, для яких під час перевірки об'єктів збирається профіль колонок (LayerProfile).
+
+        :return: словник {індекс поля: назва поля}
+        '''
+        layer_field_names = self.layer_EDRA_valid_class.layer_field_names
+        if self.profile_all_fields:
+            return {field_index: field_name for field_index, field_name in enumerate(layer_field_names)}
+        profile_fields = {field_index: layer_field_names[field_index] for field_index in self.layer_EDRA_valid_class.fields_plan_indexes}
+        profile_fields.update(self.null_probe_fields)
+        return profile_fields
+    
+    def check_null_attribute(self, attribute_name):
+        '''Чи всі значення атрибуту NULL. Використовує профіль колонок з проходу write_features_check_result, якщо він був.'''
+        if self.column_profile is not None:
+            is_all_null = self.column_profile.is_all_null(attribute_name)
+            if is_all_null is not None:
+                return is_all_null
+        if self.pushdown is not None:
+            has_not_null_values = self.pushdown.has_not_null_values(attribute_name)
+            if has_not_null_values is not None:
+                return not has_not_null_values
+        return self.layer_EDRA_valid_class.check_null_attribute(attribute_name)
+    
     def check_required_fields_is_empty_or_null(self, feature, type):
         check_required_fields_is_empty_or_null_result = self.layer_EDRA_valid_class.check_feature_req_attrs_is_empty_or_null(feature, type)
         empty_required_fields_list = []
@@ -675,331 +1059,713 @@ class EDRA_exchange_layer_checker:
                 
         return result_dict
     
-    def write_features_check_result(self):
-        # features_dict_legacy = {}
-        self.main_features_check_bench = Benchmark()
-
-        self.main_features_check_bench.start("Збір дублікатів FID")
-        features_fids = {}
-        max_len_list_number = 5
-        if self.layer_EDRA_valid_class.id_field in self.layer_EDRA_valid_class.layer_field_names:
-            for feature in self.layer_EDRA_valid_class.layer:
-                if feature[self.layer_EDRA_valid_class.id_field] not in features_fids.keys():
-                    features_fids[feature[self.layer_EDRA_valid_class.id_field]] = [feature.GetFID()]
-                elif len(features_fids[feature[self.layer_EDRA_valid_class.id_field]]) <= max_len_list_number+1:
-                    features_fids[feature[self.layer_EDRA_valid_class.id_field]].append(feature.GetFID())
-        
-        self.main_features_check_bench.stop()
+    def write_feature_result(self, fid, required_fields_is_empty_list, required_fields_is_null_list, attribute_values_unclassified_dict, attributes_length_exceed_dict, errors_only = False):
+        '''
+        Створює вузол результату перевірки одного об'єкта.
 
+        Контейнер перевірки унікальності ID додається пізніше в write_duplicated_id_results,
+        коли відомі всі ID шару.
+        З errors_only в вузол не додаються перевірки без помилок (criticity 0) та порожні контейнери.
+        Помилки понад ліміт прикладів (count_error) лише рахуються і в вузол не додаються.
 
+        :return: (вузол об'єкта, контейнер помилок атрибутів об'єкта)
+        '''
+        feature_dict_result = {
+            'type' : 'feature',
+            'item_name' : f"Об'єкт '{fid}'",
+            'related_feature_id' : fid,
+            'subitems' : []
+        }
         
-
-        container_features = None
-        container_features = {}
-        container_features['type'] = 'container'
-        container_features['item_name'] = "Об'єкти шару"
-        container_features['subitems'] = []
+        container_features_attribute_errors = {}
+        container_features_attribute_errors['type'] = 'container'
+        container_features_attribute_errors['item_name'] = "Перевірка на наявність помилок в атрибутах об'єктів (features) об'єкту"
+        container_features_attribute_errors['subitems'] = []
         
-        self.main_features_check_bench.start("start_check_all_objects")
+        container_required_fields_is_empty_or_null = {}
+        container_required_fields_is_empty_or_null['type'] = 'container'
+        container_required_fields_is_empty_or_null['item_name'] = "Перевірка на заповненість обов'язкових (атрибутів) об'єкту"
+        container_required_fields_is_empty_or_null['subitems'] = []
         
-        self.check_feature_bench = Benchmark()
+        for empty_field in required_fields_is_empty_list:
+            if self.count_error(INSPECTION_REQUIRED_EMPTY, 2, empty_field):
+                container_required_fields_is_empty_or_null['subitems'].append(self.create_inspection_record(INSPECTION_REQUIRED_EMPTY, 2, fid, empty_field))
         
-        for feature in self.layer_EDRA_valid_class.layer:
-            
-            if self.Task is not None:
-                if self.Task.isCanceled(): return 
-                progress = self.Task.progress()
-                if progress < 95:
-                    self.Task.setProgress(progress + 0.01)
-                else:
-                    self.Task.setProgress(3)
-            feature_dict_result = None
+        for null_field in required_fields_is_null_list:
+            if self.count_error(INSPECTION_REQUIRED_NULL, 2, null_field):
+                container_required_fields_is_empty_or_null['subitems'].append(self.create_inspection_record(INSPECTION_REQUIRED_NULL, 2, fid, null_field))
+        
+        if len(required_fields_is_empty_list) == 0 and len(required_fields_is_null_list) == 0 and not errors_only:
+            container_required_fields_is_empty_or_null['subitems'].append(self.create_inspection_record(INSPECTION_REQUIRED_OK, 0, fid))
+        
+        if len(container_required_fields_is_empty_or_null['subitems']) > 0:
+            container_features_attribute_errors['subitems'].append(container_required_fields_is_empty_or_null)
+        
+        container_attributes_values_unclassified = {}
+        container_attributes_values_unclassified['type'] = 'container'
+        container_attributes_values_unclassified['item_name'] = "Перевірка на відповідність значень полів (атрибутів) об'єкту доменам"
+        container_attributes_values_unclassified['subitems'] = []
+        
+        if len(attribute_values_unclassified_dict.keys()) > 0:
+            for field_name in attribute_values_unclassified_dict:
+                if not self.count_error(INSPECTION_DOMAIN_ERROR, attribute_values_unclassified_dict[field_name]['criticity'], field_name):
+                    continue
+                container_attributes_values_unclassified['subitems'].append(self.create_inspection_record(
+                    INSPECTION_DOMAIN_ERROR,
+                    attribute_values_unclassified_dict[field_name]['criticity'],
+                    fid,
+                    field_name,
+                    (attribute_values_unclassified_dict[field_name]['value'], attribute_values_unclassified_dict[field_name]['note'])))
+        elif not errors_only:
+            container_attributes_values_unclassified['subitems'].append(self.create_inspection_record(INSPECTION_DOMAIN_OK, 0, fid))
+        
+        if len(container_attributes_values_unclassified['subitems']) > 0:
+            container_features_attribute_errors['subitems'].append(container_attributes_values_unclassified)
+        
+        container_attributes_values_length = {}
+        container_attributes_values_length['type'] = 'container'
+        container_attributes_values_length['item_name'] = "Перевірка на відповідність довжини значення полів (атрибутів) об'єкту"
+        container_attributes_values_length['subitems'] = []
+        
+        if len(attributes_length_exceed_dict.keys()) > 0:
+            for field_name in attributes_length_exceed_dict:
+                if not self.count_error(INSPECTION_LENGTH_ERROR, 2, field_name):
+                    continue
+                container_attributes_values_length['subitems'].append(self.create_inspection_record(
+                    INSPECTION_LENGTH_ERROR, 2, fid, field_name, tuple(attributes_length_exceed_dict[field_name][:2])))
+        elif not errors_only:
+            container_attributes_values_length['subitems'].append(self.create_inspection_record(INSPECTION_LENGTH_OK, 0, fid))
             
-            feature_dict_result = {
-                'type' : 'feature',
-                'item_name' : f"Об'єкт '{feature.GetFID()}'",
-                'related_feature_id' : feature.GetFID(),
-                'subitems' : []
+        if len(container_attributes_values_length['subitems']) > 0:
+            container_features_attribute_errors['subitems'].append(container_attributes_values_length)
+        
+        feature_dict_result['subitems'].append(container_features_attribute_errors)
+        
+        return feature_dict_result, container_features_attribute_errors
+    
+    def write_duplicated_id_result(self, fid, duplicate_group):
+        '''
+        Створює контейнер перевірки унікальності ID для одного об'єкта.
+
+        :param duplicate_group: група дублікатів ID об'єкта (DuplicateGroup) або None, якщо ID унікальний
+        :return: контейнер або None, якщо дублікат понад ліміт прикладів (count_error)
+        '''
+        if duplicate_group is not None and not self.count_error(INSPECTION_ID_DUPLICATED, 2):
+            return None
+        
+        container_duplicated_guid = {}
+        container_duplicated_guid['type'] = 'container'
+        container_duplicated_guid['item_name'] = "Перевірка на унікальність ID"
+        container_duplicated_guid['subitems'] = []
+        
+        # запис посилається на спільну для всіх об'єктів групу, текст з FID інших об'єктів формується при показі
+        if duplicate_group is not None and duplicate_group.duplicates_count > DUPLICATE_SAMPLE_SIZE:
+            insception_feature_id_is_unique = self.create_inspection_record(INSPECTION_ID_DUPLICATED_MANY, 2, fid, params = duplicate_group)
+        elif duplicate_group is not None:
+            insception_feature_id_is_unique = self.create_inspection_record(INSPECTION_ID_DUPLICATED, 2, fid, params = duplicate_group)
+        else:
+            insception_feature_id_is_unique = self.create_inspection_record(INSPECTION_ID_UNIQUE, 0, fid)
+        container_duplicated_guid['subitems'].append(insception_feature_id_is_unique)
+        
+        return container_duplicated_guid
+    
+    def get_duplicate_groups(self, id_index) -> dict:
+        '''
+        Групи дублікатів ID шару: одна DuplicateGroup на кожне значення ID, що повторюється.
+
+        Об'єкти з однаковим ID беруться з SQL запиту (get_duplicated_id_rows_pushdown) або шукаються за хешами ID
+        в IdUniquenessIndex (в межах self.id_memory_budget). Хеші можуть збігтися і для різних значень,
+        тому значення ID кандидатів читаються з шару повторно (read_id_values) і групуються за справжнім значенням.
+
+        :param id_index: IdUniquenessIndex з хешами ID всіх перевірених об'єктів шару
+        :return: словник {FID: DuplicateGroup}, FID, яких немає в словнику, мають унікальний ID
+        '''
+        duplicated_rows = self.get_duplicated_id_rows_pushdown()
+        if duplicated_rows is None:
+            duplicated_rows = self.read_id_values(id_index.find_candidate_fids().tolist())
+        
+        duplicate_groups = {}
+        # FID першого об'єкта для ID, що поки зустрілись один раз
+        first_fids = {}
+        for fid, feature_id_value in duplicated_rows:
+            duplicate_group = duplicate_groups.get(feature_id_value)
+            if duplicate_group is None:
+                if feature_id_value not in first_fids:
+                    first_fids[feature_id_value] = fid
+                    continue
+                duplicate_group = DuplicateGroup(feature_id_value)
+                duplicate_group.add(first_fids.pop(feature_id_value))
+                duplicate_groups[feature_id_value] = duplicate_group
+            duplicate_group.add(fid)
+        
+        fid_groups = {}
+        for fid, feature_id_value in duplicated_rows:
+            duplicate_group = duplicate_groups.get(feature_id_value)
+            if duplicate_group is not None:
+                fid_groups[fid] = duplicate_group
+        return fid_groups
+    
+    def get_layer_id_index(self, shards) -> dict:
+        '''
+        Частковий індекс ID шару для GlobalIdIndex (хеші значень ID та FID всіх об'єктів шару).
+
+        :param shards: результати check_features_shard, впорядковані за FID
+        :return: словник з ключами id_field, fids (array 'q'), id_hashes (array 'Q')
+        '''
+        if len(shards) == 1:
+            return {'id_field': self.layer_EDRA_valid_class.id_field, 'fids': shards[0]['fids'], 'id_hashes': shards[0]['id_hashes']}
+        fids = array('q')
+        id_hashes = array('Q')
+        for shard_result in shards:
+            fids.extend(shard_result['fids'])
+            id_hashes.extend(shard_result['id_hashes'])
+            # хеші діапазону скопійовано, окремо вони більше не потрібні
+            shard_result['id_hashes'] = array('Q')
+        return {'id_field': self.layer_EDRA_valid_class.id_field, 'fids': fids, 'id_hashes': id_hashes}
+    
+    def get_layer_reference_index(self, shards) -> dict:
+        '''
+        Ключі та посилання шару для ReferentialIntegrityIndex з результатів check_features_shard.
+
+        :return: словник з ключами layer (назва шару структури), keys ({поле: унікальні хеші значень, array 'Q'}),
+            references ({поле: {'target': (шар, поле), 'fids': array 'q', 'hashes': array 'Q'}})
+        '''
+        layer_reference_index = {'layer': self.layer_EDRA_valid_class.layer_exchange_name, 'keys': {}, 'references': {}}
+        for field_name in self.layer_EDRA_valid_class.referenced_plan_positions:
+            key_hashes = np.unique(np.concatenate([np.frombuffer(shard_result['reference_keys'][field_name], dtype = np.uint64) for shard_result in shards]))
+            layer_reference_index['keys'][field_name] = array('Q', key_hashes.tobytes())
+        for field_name in self.layer_EDRA_valid_class.reference_plan_positions:
+            fids = array('q')
+            hashes = array('Q')
+            for shard_result in shards:
+                fids.extend(shard_result['reference_values'][field_name][0])
+                hashes.extend(shard_result['reference_values'][field_name][1])
+            layer_reference_index['references'][field_name] = {
+                'target': self.layer_EDRA_valid_class.reference_fields[field_name],
+                'fids': fids,
+                'hashes': hashes
             }
-            
-            container_features_attribute_errors = None
-            container_features_attribute_errors = {}
-            container_features_attribute_errors['type'] = 'container'
-            container_features_attribute_errors['item_name'] = "Перевірка на наявність помилок в атрибутах об'єктів (features) об'єкту"
-            container_features_attribute_errors['subitems'] = []
+        return layer_reference_index
+    
+    def read_id_values(self, fids) -> list:
+        '''
+        Значення ID вибраних об'єктів (другий, точковий прохід для кандидатів з IdUniquenessIndex).
 
-            
-            self.check_feature_bench.start('check_required_fields_is_empty')
-            
-            required_fields_is_empty_list = self.check_required_fields_is_empty_or_null(feature, 'empty')
-            
-            self.check_feature_bench.stop()
-            
-            self.check_feature_bench.start('check_required_fields_is_null')
-            
-            required_fields_is_null_list = self.check_required_fields_is_empty_or_null(feature, 'null')
-            
-            self.check_feature_bench.stop()
-            
-            container_required_fields_is_empty_or_null = None
-            container_required_fields_is_empty_or_null = {}
-            container_required_fields_is_empty_or_null['type'] = 'container'
-            container_required_fields_is_empty_or_null['item_name'] = "Перевірка на заповненість обов'язкових (атрибутів) об'єкту"
-            container_required_fields_is_empty_or_null['subitems'] = []
-            
-            self.check_feature_bench.start('write_dict_check_required_fields')
-            
-            if len(required_fields_is_empty_list) > 0:
-                #ДОПИСАТИ ЕЛЕМЕНТ ПЕРЕВІРКИ І ПЕРЕРОБИТИ ЛОГІКУ ВИВОДУ В КОНТЕЙНЕРИ ІНШИХ ПОМИЛОК АТРИБУТІВ, щоб там кожен
-                for empty_field in required_fields_is_empty_list:
-                    insception_empty_field_error = None
-                    insception_empty_field_error = self.create_inspection_dict(
-                        inspection_type_name = "Перевірка на заповненість полів (атрибутів) об'єкту", #Підтягувати перевірку з файлу структури з помилками
-                        item_name = f"Обов'язковий атрибут «{empty_field}» не заповнений (is empty)", 
-                        item_tool_tip = f"Обов'язковий атрибут «{empty_field}» не заповнений (is empty)", 
-                        criticity = 2, 
-                        help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                    )
-                    
-                    container_required_fields_is_empty_or_null['subitems'].append(insception_empty_field_error)
-                    del insception_empty_field_error
-                    
-                    
-            if len(required_fields_is_null_list) > 0:
-                #ДОПИСАТИ ЕЛЕМЕНТ ПЕРЕВІРКИ І ПЕРЕРОБИТИ ЛОГІКУ ВИВОДУ В КОНТЕЙНЕРИ ІНШИХ ПОМИЛОК АТРИБУТІВ, щоб там кожен
-                for null_field in required_fields_is_null_list:
-                    insception_null_field_error = None
-                    insception_null_field_error = self.create_inspection_dict(
-                        inspection_type_name = "Перевірка на заповненість полів (атрибутів) об'єкту", #Підтягувати перевірку з файлу структури з помилками
-                        item_name = f"Обов'язковий атрибут «{null_field}» не заповнений (is null)", 
-                        item_tool_tip = f"Обов'язковий атрибут «{null_field}» не заповнений (is null)", 
-                        criticity = 2, 
-                        help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                    )
-                    container_required_fields_is_empty_or_null['subitems'].append(insception_null_field_error)
-                    del insception_null_field_error
-                    
-            if len(required_fields_is_empty_list) == 0 and len(required_fields_is_null_list) == 0:
-                insception_dict_field_not_emprty_or_null = None
-                insception_dict_field_not_emprty_or_null = self.create_inspection_dict(                    
-                    inspection_type_name = "Перевірка на заповненість обов'язкових полів (атрибутів) об'єкту", #Підтягувати перевірку з файлу структури з помилками
-                    item_name = f"Всі обов'язкові поля (атрибути) класу заповнені", 
-                    item_tool_tip = f"Всі обов'язкові поля (атрибути) класу заповнені", 
-                    criticity = 0, 
-                    help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                )
-                container_required_fields_is_empty_or_null['subitems'].append(insception_dict_field_not_emprty_or_null)
-                del insception_dict_field_not_emprty_or_null
+        :param fids: впорядкований список FID
+        :return: список (FID, значення ID)
+        '''
+        layer = self.layer_EDRA_valid_class.layer
+        id_field_index = self.layer_EDRA_valid_class.id_field_index
+        id_rows = []
+        for fid in fids:
+            feature = layer.GetFeature(fid)
+            id_rows.append((fid, feature.GetField(id_field_index) if feature is not None else None))
+        return id_rows
+    
+    def write_duplicated_id_results(self, pending_id_checks, duplicate_groups):
+        '''
+        Фіналізація перевірки унікальності ID після проходу по шару.
+
+        :param pending_id_checks: список (контейнер помилок атрибутів об'єкта, FID)
+        :param duplicate_groups: групи дублікатів ID за FID (get_duplicate_groups)
+        '''
+        for container_features_attribute_errors, fid in pending_id_checks:
+            container_duplicated_guid = self.write_duplicated_id_result(fid, duplicate_groups.get(fid))
+            if container_duplicated_guid is not None:
+                container_features_attribute_errors['subitems'].append(container_duplicated_guid)
+    
+    def open_feature_cache(self):
+        '''
+        Відкриває кеш відбитків об'єктів шару (FeatureFingerprintCache), якщо задано options['feature_cache'].
+
+        :return: кеш або None
+        '''
+        if self.feature_cache_path is None:
+            return None
+        layer_key = f"{self.layer_props['path']}|{self.layer_props['layer_name']}"
+        context = get_plan_context(self.layer_EDRA_valid_class.layer_exchange_name, self.layer_EDRA_valid_class.fields_plan)
+        try:
+            return FeatureFingerprintCache(self.feature_cache_path, layer_key, context)
+        except Exception as e:
+            print(f'Кеш відбитків об\'єктів недоступний: "{e}"')
+            return None
+    
+    def advance_progress(self, features_count):
+        '''Прогрес задачі - частка перевірених об'єктів шару (self.features_processed з self.features_total).'''
+        self.features_processed += features_count
+        if self.features_total:
+            self.Task.setProgress(min(100.0, 100.0 * self.features_processed / self.features_total))
+    
+    def check_features_shard(self, fid_range = None, id_index = None):
+        '''
+        Перевіряє об'єкти шару (або діапазону FID шару) за один прохід.
+
+        Атрибути читаються пакетами колонок через FeatureBatchReader (Arrow, якщо підтримується)
+        і перевіряються векторно (check_batch_values), вузли результату створюються для кожного об'єкта.
+        Під час проходу одночасно збираються хеші значень ID (для перевірки унікальності) та
+        профіль колонок полів get_profile_fields (для check_null_attribute, перевірки наявності об'єктів та вікна результату).
+
+        :param fid_range: (перший FID, FID після останнього) або None для всього шару
+        :param id_index: IdUniquenessIndex, в який хеші ID додаються після кожного пакета, або None.
+            З індексом хеші ID зберігаються в результаті лише для індексу ID між файлами (self.global_id_check)
+        :return: словник з ключами:
+            - features - вузли результатів об'єктів без перевірки унікальності ID
+              (в режимі RESULT_MODE_ERRORS_ONLY лише для об'єктів з помилками; з потоковим приймачем вузли записуються в нього і список порожній),
+            - fids - FID всіх перевірених об'єктів (array 'q'),
+            - id_hashes - хеші значень ID об'єктів в тому ж порядку (array 'Q', hash_id_values; порожній, якщо в шарі немає поля ID
+              або хеші додані в id_index і перевірка ID між файлами вимкнена),
+            - reference_keys - хеші не NULL значень полів, на які посилаються інші шари: {поле: array 'Q'},
+            - reference_values - FID та хеші не NULL значень полів-посилань: {поле: (array 'q', array 'Q')},
+            - failed_counts - кількість об'єктів з помилками для перевірок 'required', 'domain' та 'length',
+            - profile - профіль колонок (LayerProfile) перевірених об'єктів,
+            - error_counts - лічильники помилок та прикладів (count_error),
+            - canceled - True, якщо задачу скасовано і перевірено лише частину об'єктів (решта пакетів не читається),
+            - bench - Benchmark проходу
+            або None, якщо драйвер не прийняв фільтр діапазону FID
+        '''
+        shard_result = {
+            'features': [],
+            'fids': array('q'),
+            'id_hashes': array('Q'),
+            'reference_keys': {},
+            'reference_values': {},
+            'failed_counts': {'required': 0, 'domain': 0, 'length': 0},
+            'profile': None,
+            'error_counts': {},
+            'canceled': False,
+            'bench': Benchmark()
+        }
+        self.error_counts = shard_result['error_counts']
+        check_feature_bench = shard_result['bench']
+        features = shard_result['features']
+        shard_fids = shard_result['fids']
+        id_hashes = shard_result['id_hashes']
+        failed_counts = shard_result['failed_counts']
+        errors_only = self.result_mode == RESULT_MODE_ERRORS_ONLY
+
+        id_field_index = self.layer_EDRA_valid_class.id_field_index
+        keep_id_hashes = id_index is None or self.global_id_check
+        id_plan_position = self.layer_EDRA_valid_class.id_plan_position
+        reference_plan_positions = self.layer_EDRA_valid_class.reference_plan_positions
+        referenced_plan_positions = self.layer_EDRA_valid_class.referenced_plan_positions
+        reference_keys = shard_result['reference_keys']
+        reference_values = shard_result['reference_values']
+        for field_name in referenced_plan_positions:
+            reference_keys[field_name] = array('Q')
+        for field_name in reference_plan_positions:
+            reference_values[field_name] = (array('q'), array('Q'))
+        
+        layer = self.layer_EDRA_valid_class.layer
+        if fid_range is not None and not set_fid_range_filter(layer, fid_range, self.driver_name):
+            # без фільтра діапазон прочитав би весь шар, тому шар перевіряється цілим (parallel_validation)
+            return None
+        if self.Task is not None:
+            self.features_total = layer.GetFeatureCount()
+        
+        # поля профілю, що є в плані перевірки, беруться з колонок плану, решта дочитуються після них
+        fields_plan_indexes = self.layer_EDRA_valid_class.fields_plan_indexes
+        plan_size = len(fields_plan_indexes)
+        profile_fields = self.get_profile_fields()
+        profile_plan_positions = [(position, profile_fields[field_index]) for position, field_index in enumerate(fields_plan_indexes) if field_index in profile_fields]
+        profile_extra_indexes = [field_index for field_index in profile_fields if field_index not in fields_plan_indexes]
+        profile = LayerProfile([profile_fields[field_index] for field_index in sorted(profile_fields)])
+        shard_result['profile'] = profile
+        reader = FeatureBatchReader(
+            layer = layer,
+            field_indexes = list(fields_plan_indexes) + profile_extra_indexes,
+            batch_size = self.batch_size)
+        
+        no_errors = ([], [], {}, {})
+        feature_cache = self.open_feature_cache()
+        
+        try:
+            for batch in reader:
                 
-            container_features_attribute_errors['subitems'].append(container_required_fields_is_empty_or_null)
-            
-            self.check_feature_bench.stop()
-            
-            self.check_feature_bench.start('delete_objects_after_created_dict_check_required_fields')
-            
-            del container_required_fields_is_empty_or_null
-            
-            del required_fields_is_empty_list
-            del required_fields_is_null_list
-            
-            self.check_feature_bench.stop()
-            
-            self.check_feature_bench.start('check_attr_value_in_domain')
-            
-            attribute_values_unclassified_dict = self.check_attr_value_in_domain(feature)
-            
-            self.check_feature_bench.stop()
-            
-            container_attributes_values_unclassified = None
-            container_attributes_values_unclassified = {}
-            container_attributes_values_unclassified['type'] = 'container'
-            container_attributes_values_unclassified['item_name'] = "Перевірка на відповідність значень полів (атрибутів) об'єкту доменам"
-            container_attributes_values_unclassified['subitems'] = []
-            
-            self.check_feature_bench.start('wtite_unclassified_dict')
-            
-            if len(attribute_values_unclassified_dict.keys()) > 0:
-                #ДОПИСАТИ ЕЛЕМЕНТ ПЕРЕВІРКИ І ПЕРЕРОБИТИ ЛОГІКУ ВИВОДУ В КОНТЕЙНЕРИ ІНШИХ ПОМИЛОК АТРИБУТІВ, щоб там кожен
+                if self.Task is not None and self.Task.isCanceled():
+                    shard_result['canceled'] = True
+                    break
                 
-                for field_name in attribute_values_unclassified_dict:
-                    
-                    # if self.layer_EDRA_valid_class.fields_structure_json[field_name]['attribute_required'] == True or attribute_values_unclassified_dict[field_name][0] != None:
-                        
-                    insception_unclassified_value_error = None
-                    insception_unclassified_value_error = self.create_inspection_dict(
-                        inspection_type_name = "Перевірка на відповідність значень полів (атрибутів) об'єкту доменам", #Підтягувати перевірку з файлу структури з помилками
-                        item_name = f"Атрибут: '{field_name}' має значення '{attribute_values_unclassified_dict[field_name]['value']}', що не відповідає домену (див. опис поля). {attribute_values_unclassified_dict[field_name]['note']}", 
-                        item_tool_tip = f"Значення атрибуту '{field_name}' не відповідає домену. {attribute_values_unclassified_dict[field_name]['note']}", 
-                        criticity = attribute_values_unclassified_dict[field_name]['criticity'], 
-                        help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                    )
-                    container_attributes_values_unclassified['subitems'].append(insception_unclassified_value_error)
-                    del insception_unclassified_value_error
-                    
-            elif len(attribute_values_unclassified_dict.keys()) == 0 :
-                insception_classified_value = None
-                insception_classified_value = self.create_inspection_dict(                    
-                    inspection_type_name = "Перевірка на відповідність значень полів (атрибутів) об'єкту доменам", #Підтягувати перевірку з файлу структури з помилками
-                    item_name = f"Всі значення полів відповідають доменам", 
-                    item_tool_tip = f"Всі значення полів відповідають доменам", 
-                    criticity = 0, 
-                    help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                )
-                container_attributes_values_unclassified['subitems'].append(insception_classified_value)
-                del insception_classified_value
-            
-            self.check_feature_bench.stop()
-            
-            self.check_feature_bench.start('delete_objects_after_created_unclassified_dict')
-            
-            container_features_attribute_errors['subitems'].append(container_attributes_values_unclassified)
-            del container_attributes_values_unclassified
-            del attribute_values_unclassified_dict
-            
-            self.check_feature_bench.stop()
-            
-            self.check_feature_bench.start('check_attributes_length_exceed')
-            
-            attributes_length_exceed_dict = self.layer_EDRA_valid_class.check_feature_attribute_length_exceed(feature)
-            
-            self.check_feature_bench.stop()
-            
-            self.check_feature_bench.start('wtite_attributes_length_exceed_dict')
-            
-            container_attributes_values_length = None
-            container_attributes_values_length = {}
-            container_attributes_values_length['type'] = 'container'
-            container_attributes_values_length['item_name'] = "Перевірка на відповідність довжини значення полів (атрибутів) об'єкту"
-            container_attributes_values_length['subitems'] = []
-            
-            if len(attributes_length_exceed_dict.keys()) > 0:
-                #ДОПИСАТИ ЕЛЕМЕНТ ПЕРЕВІРКИ І ПЕРЕРОБИТИ ЛОГІКУ ВИВОДУ В КОНТЕЙНЕРИ ІНШИХ ПОМИЛОК АТРИБУТІВ, щоб там кожен
-                for field_name in attributes_length_exceed_dict:
-                    insception_attributes_length_value_exceed = None
-                    insception_attributes_length_value_exceed = self.create_inspection_dict(
-                        inspection_type_name = 'Перевірка на відповідність довжини значення атрибуту', #Підтягувати перевірку з файлу структури з помилками
-                        item_name = f"Атрибут: '{field_name}' має довжину {attributes_length_exceed_dict[field_name][0]}, а треба не більше {attributes_length_exceed_dict[field_name][1]}", 
-                        item_tool_tip = f"Атрибут: '{field_name}' має довжину більше дозволеної структурою", 
-                        criticity = 2, 
-                        help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                    )
-                    container_attributes_values_length['subitems'].append(insception_attributes_length_value_exceed)
-                    del insception_attributes_length_value_exceed
-                    
-            elif len(attributes_length_exceed_dict.keys()) == 0 :
-                insception_attributes_length_value = None
-                insception_attributes_length_value = self.create_inspection_dict(                    
-                    inspection_type_name = "Перевірка на відповідність довжини значення атрибуту", #Підтягувати перевірку з файлу структури з помилками
-                    item_name = f"Всі значення атрибутів не перевищують допустиму довжину", 
-                    item_tool_tip = f"Всі значення атрибутів не перевищують допустиму довжину", 
-                    criticity = 0, 
-                    help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                )
-                container_attributes_values_length['subitems'].append(insception_attributes_length_value)
-                del insception_attributes_length_value
+                check_feature_bench.start('check_batch_values')
                 
-            container_features_attribute_errors['subitems'].append(container_attributes_values_length)
-            
-            self.check_feature_bench.stop()
-            
-            self.check_feature_bench.start('delete_objects_after_attributes_length_exceed_dict')
-            
-            del attributes_length_exceed_dict
-            del container_attributes_values_length
-            
-            self.check_feature_bench.start('Перевірка GUID на унікальність')
-            
-            #max_len_list_number = 5
-            duplicated_feature_id_list = features_fids[feature[self.layer_EDRA_valid_class.id_field]][:] #self.layer_EDRA_valid_class.get_list_duplicated_fid(feature, self.layer_props['related_layer_id'], features_fids, max_len_list_number)
-            #print(f"{feature[self.layer_EDRA_valid_class.id_field]} - {feature.GetFID()} - {duplicated_feature_id_list}({features_fids[feature[self.layer_EDRA_valid_class.id_field]]})")
-
-            if feature.GetFID() in duplicated_feature_id_list:
-                duplicated_feature_id_list.remove(feature.GetFID())
-            
-            # Розкоментувати код і дописати контейнер для дуплікейтед гуід
-            container_duplicated_guid = None
-            container_duplicated_guid = {}
-            container_duplicated_guid['type'] = 'container'
-            container_duplicated_guid['item_name'] = "Перевірка на унікальність ID"
-            container_duplicated_guid['subitems'] = []
-            
-            insception_feature_id_is_unique = None
-            
-            if len(duplicated_feature_id_list) > 0:
-                #ДОПИСАТИ ЕЛЕМЕНТ ПЕРЕВІРКИ І ПЕРЕРОБИТИ ЛОГІКУ ВИВОДУ В КОНТЕЙНЕРИ ІНШИХ ПОМИЛОК АТРИБУТІВ, щоб там кожен
-                # for duplicate_item in duplicated_guid_list:
-                    
-                if len(duplicated_feature_id_list) > max_len_list_number:
-                    insception_feature_id_is_unique = self.create_inspection_dict(
-                        inspection_type_name = 'Перевірка на унікальність ID', #Підтягувати перевірку з файлу структури з помилками
-                        item_name = f"Об'єкт ({feature.GetFID()}) має більше {len(duplicated_feature_id_list)} дублюючих елементів, ID: {[duplicated_feature_id_list[:5]]}, інші.", 
-                        item_tool_tip = f"Об'єкт має не унікальний ідентифікатор", 
-                        criticity = 2, 
-                        help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                    )
+                plan_columns = batch.columns[:plan_size]
+                fids = batch.fids.tolist() if hasattr(batch.fids, 'tolist') else batch.fids
+                if feature_cache is not None:
+                    # незмінені з попереднього запуску об'єкти не перевіряються, помилки беруться з кешу
+                    batch_errors = feature_cache.check_batch_values(self.layer_EDRA_valid_class, plan_columns, fids)
                 else:
-                    insception_feature_id_is_unique = self.create_inspection_dict(
-                        inspection_type_name = 'Перевірка на унікальність ID', #Підтягувати перевірку з файлу структури з помилками
-                        item_name = f"Об'єкт ({feature.GetFID()}) має {len(duplicated_feature_id_list)} дублюючих елементів, ID: {[duplicated_feature_id_list]}.", 
-                        item_tool_tip = f"Об'єкт має не унікальний ідентифікатор", 
-                        criticity = 2, 
-                        help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                    )
-                    
-                    
-            elif len(duplicated_feature_id_list) == 0 :
-                # insception_feature_id_is_unique = None
-                insception_feature_id_is_unique = self.create_inspection_dict(                    
-                    inspection_type_name = "Перевірка на унікальність ID", #Підтягувати перевірку з файлу структури з помилками
-                    item_name = f"Ідентифікатор об'єкта унікальний", 
-                    item_tool_tip = f"Ідентифікатор об'єкта унікальний", 
-                    criticity = 0, 
-                    help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll)
-                )
-                # container_duplicated_guid['subitems'].append(insception_feature_id_is_unique)
-            container_duplicated_guid['subitems'].append(insception_feature_id_is_unique)
-            
-            container_features_attribute_errors['subitems'].append(container_duplicated_guid)
-            
-            self.check_feature_bench.start('wtite_container_features_attribute_errors_dict')
-            
-            feature_dict_result['subitems'].append(container_features_attribute_errors)
-            del container_features_attribute_errors
-            
-            self.check_feature_bench.stop()
-            
-            self.check_feature_bench.start('wtite_general_feature_dict')
-            
-            container_features['subitems'].append(feature_dict_result)
-            del feature_dict_result
-            
-            self.check_feature_bench.stop()
-            
-            # features_dict_legacy[feature.GetFID()] = {
-            #     "required_attribute_empty": required_fields_is_empty_list,
-            #     "required_attribute_empty": required_fields_is_null_list,
-            #     "attribute_value_unclassifyed": attribute_values_unclassified_dict,
-            #     # "duplicated_GUID": duplicated_guid_list,
-            #     "attribute_length_exceed": attributes_length_exceed_dict,
+                    batch_errors = self.layer_EDRA_valid_class.check_batch_values(plan_columns)
                 
-            #     }
-            
-            # if self.layer_EDRA_valid_class.required_geometry_type != None:
-            #     features_dict_legacy[feature.GetFID()]['geometry_errors'] = {
-            #         "empty" : self.layer_EDRA_valid_class.check_feature_geometry_is_empty(feature),
-            #         "null" : self.layer_EDRA_valid_class.check_feature_geometry_is_null(feature),
-            #         "geometry_type_wrong" : self.check_wrong_object_geometry_type(feature)
-            #         }
-            
+                shard_fids.extend(fids)
+                if id_field_index is not None:
+                    id_column = plan_columns[id_plan_position]
+                    batch_id_hashes = hash_id_values(id_column.tolist() if hasattr(id_column, 'tolist') else id_column)
+                    if id_index is not None:
+                        id_index.add(np.asarray(fids, dtype = np.int64), batch_id_hashes)
+                    if keep_id_hashes:
+                        id_hashes.frombytes(batch_id_hashes.tobytes())
+                
+                # значення посилань порівнюються як текст, бо поля різних шарів можуть мати різний тип (get_reference_texts)
+                for field_name, position in referenced_plan_positions.items():
+                    column = plan_columns[position]
+                    reference_positions, reference_texts = get_reference_texts(column.tolist() if hasattr(column, 'tolist') else column)
+                    reference_keys[field_name].frombytes(hash_id_values(reference_texts).tobytes())
+                for field_name, position in reference_plan_positions.items():
+                    column = plan_columns[position]
+                    reference_positions, reference_texts = get_reference_texts(column.tolist() if hasattr(column, 'tolist') else column)
+                    reference_fids, reference_hashes = reference_values[field_name]
+                    reference_fids.extend(fids[reference_position] for reference_position in reference_positions)
+                    reference_hashes.frombytes(hash_id_values(reference_texts).tobytes())
+                
+                for empty_fields, null_fields, domain_errors, length_exceed in batch_errors.values():
+                    if empty_fields or null_fields:
+                        failed_counts['required'] += 1
+                    if domain_errors:
+                        failed_counts['domain'] += 1
+                    if length_exceed:
+                        failed_counts['length'] += 1
+                
+                check_feature_bench.start('column_profile')
+                profile_columns = {field_name: plan_columns[position] for position, field_name in profile_plan_positions}
+                for position, field_index in enumerate(profile_extra_indexes):
+                    profile_columns[profile_fields[field_index]] = batch.columns[plan_size + position]
+                profile.add_batch(profile_columns, len(fids))
+                
+                check_feature_bench.start('write_feature_result')
+                
+                if errors_only:
+                    # вузли створюються лише для об'єктів з помилками
+                    for row_index in sorted(batch_errors):
+                        feature_dict_result, container_features_attribute_errors = self.write_feature_result(fids[row_index], *batch_errors[row_index], errors_only = True)
+                        if len(container_features_attribute_errors['subitems']) == 0:
+                            # всі помилки об'єкта понад ліміт прикладів
+                            continue
+                        if self.streaming_sink:
+                            self.result_sink.write_feature(self.layer_props, feature_dict_result)
+                        else:
+                            features.append(feature_dict_result)
+                else:
+                    for row_index, fid in enumerate(fids):
+                        feature_check_results = batch_errors.get(row_index, no_errors)
+                        feature_dict_result, container_features_attribute_errors = self.write_feature_result(fid, *feature_check_results)
+                        if self.streaming_sink:
+                            self.result_sink.write_feature(self.layer_props, feature_dict_result)
+                        else:
+                            features.append(feature_dict_result)
+                
+                check_feature_bench.stop()
+                
+                if self.Task is not None:
+                    self.advance_progress(len(fids))
+            
+            if feature_cache is not None and not shard_result['canceled']:
+                feature_cache.delete_missing(fid_range)
+        finally:
+            if fid_range is not None:
+                layer.SetAttributeFilter(None)
+            if feature_cache is not None:
+                check_feature_bench.add_note(feature_cache.get_report())
+                feature_cache.close()
+        
+        # спосіб читання шару потрапляє в звіт Benchmark перевірки об'єктів
+        for note in reader.notes:
+            check_feature_bench.add_note(note)
+        if reader.used_arrow:
+            check_feature_bench.add_note(f"Атрибути шару {self.layer_props['layer_name']} прочитано через Arrow")
+        check_feature_bench.add_note(reader.get_ignored_report())
+        
+        return shard_result
+    
+    def run_features_shard(self, fid_range):
+        '''
+        Перевірка одного діапазону FID шару в окремому процесі (див. parallel_validation).
+        Результати діапазонів об'єднуються в write_features_check_result через self.feature_shards.
+        Якщо повертається None (назва шару не співставлена або діапазон не відфільтровано), шар перевіряється цілим.
+        '''
+        if self.layer_EDRA_valid_class.nameError:
+            # як і в run, об'єкти перевіряються лише якщо назву шару вдалося співставити зі структурою
+            layer_name_errors_check_result = self.layer_EDRA_valid_class.check_text_in_objects_list(self.layer_EDRA_valid_class.layer_exchange_name, 'layer')
+            if not layer_name_errors_check_result['any_similar_name']:
+                return None
+            self.layer_EDRA_valid_class = EDRA_validator(self.layer_EDRA_valid_class.layer, layer_name_errors_check_result['result_dict']['valid_name'], self.layer_EDRA_valid_class.structure_json, self.layer_EDRA_valid_class.domains_json, self.driver_name, self.domain_lookups)
         
-        #print(features_dict)
+        self.fields_check_results_list = self.layer_EDRA_valid_class.check_fields_type_and_names(self.layer_EDRA_valid_class.layerDefinition)
+        self.null_probe_fields = self.get_null_probe_fields()
+        return self.check_features_shard(fid_range)
+    
+    def get_duplicated_id_rows_pushdown(self):
+        '''
+        Об'єкти з ID, що повторюється, отримані SQL запитом (sql_pushdown).
+
+        :return: список (FID, значення ID), впорядкований за FID, або None, якщо запит неможливий
+            і дублікати потрібно шукати в IdUniquenessIndex
+        '''
+        if self.pushdown is None:
+            return None
+        id_field = self.layer_EDRA_valid_class.id_field
+        duplicated_rows = self.pushdown.get_duplicated_rows(id_field)
+        if duplicated_rows is None:
+            if self.pushdown.has_duplicates(id_field) is False:
+                return []
+            return None
+        return duplicated_rows
+    
+    def write_features_summary(self, features_count, failed_counts, check_id):
+        '''
+        Підсумок перевірок об'єктів шару для режиму RESULT_MODE_ERRORS_ONLY:
+        кількість об'єктів, що пройшли кожну перевірку.
+
+        :param failed_counts: кількість об'єктів з помилками для кожної перевірки
+        :param check_id: чи перевірялась унікальність ID
+        '''
+        container_features_summary = {}
+        container_features_summary['type'] = 'container'
+        container_features_summary['item_name'] = "Підсумок перевірок об'єктів шару"
+        container_features_summary['subitems'] = []
+        
+        checks_names = [
+            ('required', "заповненості обов'язкових полів (атрибутів)"),
+            ('domain', "відповідності значень полів (атрибутів) доменам"),
+            ('length', "відповідності довжини значень полів (атрибутів)")]
+        if check_id:
+            checks_names.append(('unique_id', "унікальності ID"))
+        
+        for check_name, check_title in checks_names:
+            passed_count = features_count - failed_counts[check_name]
+            container_features_summary['subitems'].append(self.create_inspection_dict(
+                inspection_type_name = f"Перевірка {check_title}",
+                item_name = f"{format_count(passed_count)} з {format_count(features_count)} об'єктів пройшли перевірку {check_title}",
+                item_tool_tip = f"Об'єкти без помилок не показуються",
+                criticity = 0 if passed_count == features_count else 1,
+                help_url = None
+            ))
+        
+        return container_features_summary
+
+    def write_column_profile_result(self):
+        '''
+        Профіль колонок шару (self.column_profile) для вікна результату: по одному рядку на поле.
+
+        :return: контейнер або None, якщо профіль не зібрано (прохід скасовано або об'єкти не перевірялись)
+        '''
+        if self.column_profile is None:
+            return None
+        container_column_profile = {}
+        container_column_profile['type'] = 'container'
+        container_column_profile['item_name'] = "Профіль полів шару"
+        container_column_profile['subitems'] = []
+
+        for field_profile in self.column_profile.fields.values():
+            profile_parts = [f"NULL {format_count(field_profile.null_count)}"]
+            if field_profile.count:
+                profile_parts[0] += f" ({100 * field_profile.null_count / field_profile.count:.1f}%)"
+            if field_profile.empty_count:
+                profile_parts.append(f"порожніх {format_count(field_profile.empty_count)}")
+            if field_profile.min_length is not None:
+                profile_parts.append(f"довжина {field_profile.min_length}–{field_profile.max_length}")
+            integer_like_ratio = field_profile.get_integer_like_ratio()
+            if integer_like_ratio is not None:
+                profile_parts.append(f"цілі числа {100 * integer_like_ratio:.1f}%")
+            profile_parts.append(f"унікальних ≈{format_count(field_profile.get_distinct_count())}")
+            container_column_profile['subitems'].append(self.create_inspection_dict(
+                inspection_type_name = "Профіль полів шару",
+                item_name = f"Поле «{field_profile.name}»: {', '.join(profile_parts)}",
+                item_tool_tip = f"Кількість унікальних значень наближена (HyperLogLog)",
+                criticity = 0,
+                help_url = None
+            ))
+
+        return container_column_profile
+
+    def get_is_layer_empty(self):
+        '''Чи немає в шарі об'єктів. Використовує профіль колонок з проходу write_features_check_result, якщо він був.'''
+        if self.column_profile is not None:
+            return self.column_profile.features_count == 0
+        return self.layer_EDRA_valid_class.get_is_layer_empty()
+
+    def write_layer_is_empty_result(self, layer_is_empty):
+        if layer_is_empty:
+            return self.create_inspection_dict(
+                    inspection_type_name = 'Перевірка на наявність об’єктів в шарі', #Підтягувати перевірку з файлу структури з помилками
+                    item_name = f"В шарі {self.layer_props['layer_name']} відсутні об\'єкти",
+                    item_tool_tip = f"В шарі {self.layer_props['layer_real_name']} відсутні об\'єкти",
+                    criticity = 2,
+                    help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
+                )
+        return self.create_inspection_dict(
+                inspection_type_name = 'Перевірка на наявність об’єктів в шарі', #Підтягувати перевірку з файлу структури з помилками
+                item_name = f"В шарі {self.layer_props['layer_name']} наявні об\'єкти",
+                item_tool_tip = f"В шарі {self.layer_props['layer_real_name']} наявні об\'єкти",
+                criticity = 0,
+                help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
+            )
+
+    def write_features_canceled_result(self, features_count):
+        '''Перевірка-попередження про скасовану перевірку об'єктів: результат містить лише частину об'єктів шару.'''
+        if self.features_total:
+            checked_title = f"{format_count(features_count)} з {format_count(self.features_total)}"
+        else:
+            checked_title = format_count(features_count)
+        return self.create_inspection_dict(
+            inspection_type_name = "Перевірка об'єктів шару",
+            item_name = f"Перевірку скасовано, перевірено {checked_title} об'єктів",
+            item_tool_tip = f"Результати містять лише об'єкти, перевірені до скасування",
+            criticity = 1,
+            help_url = None
+        )
+    
+    def write_features_check_result(self):
+        '''
+        Перевіряє всі об'єкти шару.
+
+        Якщо задано self.feature_shards (результати check_features_shard для діапазонів FID, впорядковані за FID),
+        об'єкти повторно не читаються, а результати діапазонів об'єднуються.
+        Перевірка унікальності ID виконується для всього шару після проходу.
+        В режимі RESULT_MODE_ERRORS_ONLY в результат потрапляють лише об'єкти з помилками,
+        а на початку контейнера додається підсумок з кількістю об'єктів, що пройшли кожну перевірку.
+        Помилки понад ліміт прикладів self.error_cap підсумовуються в контейнері write_error_overflow_result.
+        З потоковим приймачем (self.result_sink) вузли об'єктів записуються в нього, а не в контейнер;
+        результат перевірки унікальності ID записується окремим вузлом об'єкта.
+        '''
+        # features_dict_legacy = {}
+        self.main_features_check_bench = Benchmark()
+
+        duplicate_groups = {}
+        errors_only = self.result_mode == RESULT_MODE_ERRORS_ONLY
+
+        container_features = {}
+        container_features['type'] = 'container'
+        container_features['item_name'] = FEATURES_CONTAINER_NAME
+        container_features['subitems'] = []
         
+        self.main_features_check_bench.start("start_check_all_objects")
         
+        check_id = self.layer_EDRA_valid_class.id_field_index is not None
+        # хеші ID додаються в індекс під час проходу (або по діапазону з кожного процесу), а не збираються до його кінця
+        id_index = IdUniquenessIndex(self.id_memory_budget) if check_id else None
+        try:
+            shards = self.feature_shards
+            if shards is None:
+                shard_result = self.check_features_shard(id_index = id_index)
+                shards = [shard_result]
+            else:
+                # кожен процес обмежував приклади помилок лише свого діапазону, ліміт для шару застосовується тут
+                self.merge_error_counts(shards)
+                for shard_result in shards:
+                    if id_index is not None:
+                        id_index.add(np.frombuffer(shard_result['fids'], dtype = np.int64), np.frombuffer(shard_result['id_hashes'], dtype = np.uint64))
+                    if not self.global_id_check:
+                        shard_result['id_hashes'] = array('Q')
+            
+            if check_id:
+                self.main_features_check_bench.start('Перевірка GUID на унікальність')
+                # групи однакових ID від бази даних або з індексу хешів ID, по одній групі на значення ID
+                duplicate_groups = self.get_duplicate_groups(id_index)
+        finally:
+            if id_index is not None:
+                id_index.close()
+        
+        self.main_features_check_bench.start('merge_shards')
+        cap_shards_examples = self.feature_shards is not None
+        
+        column_profile = None
+        failed_counts = {'required': 0, 'domain': 0, 'length': 0, 'unique_id': 0}
+        features_count = 0
+        for shard_result in shards:
+            if not errors_only and not self.streaming_sink:
+                if cap_shards_examples:
+                    for feature_dict_result in shard_result['features']:
+                        self.cap_container_examples(feature_dict_result['subitems'][0])
+                container_features['subitems'].extend(shard_result['features'])
+            if column_profile is None:
+                column_profile = shard_result['profile']
+            else:
+                column_profile.merge(shard_result['profile'])
+            for check_name, failed_count in shard_result['failed_counts'].items():
+                failed_counts[check_name] += failed_count
+            features_count += len(shard_result['fids'])
+            self.main_features_check_bench.join(shard_result['bench'])
+        
+        self.main_features_check_bench.start('layer_indexes')
+        
+        # індекси для перевірок між шарами будуються лише за повністю перевіреним шаром
+        canceled = any(shard_result.get('canceled') for shard_result in shards)
+        if not canceled:
+            # неповний профіль не може відповісти, чи всі значення поля NULL
+            self.column_profile = column_profile
+        if check_id and self.global_id_check and not canceled:
+            self.layer_id_index = self.get_layer_id_index(shards)
+        
+        has_references = self.layer_EDRA_valid_class.reference_plan_positions or self.layer_EDRA_valid_class.referenced_plan_positions
+        if has_references and not canceled:
+            self.layer_reference_index = self.get_layer_reference_index(shards)
+        
+        if self.streaming_sink:
+            for shard_result in shards:
+                # вузли об'єктів, перевірених в інших процесах (parallel_validation)
+                for feature_dict_result in shard_result['features']:
+                    if cap_shards_examples and not self.cap_container_examples(feature_dict_result['subitems'][0]) and errors_only:
+                        continue
+                    self.result_sink.write_feature(self.layer_props, feature_dict_result)
+                if not check_id:
+                    continue
+                for fid in shard_result['fids']:
+                    duplicate_group = duplicate_groups.get(fid)
+                    if duplicate_group is not None:
+                        failed_counts['unique_id'] += 1
+                    elif errors_only:
+                        continue
+                    container_duplicated_guid = self.write_duplicated_id_result(fid, duplicate_group)
+                    if container_duplicated_guid is None:
+                        continue
+                    feature_dict_result, container_features_attribute_errors = self.write_feature_result(fid, [], [], {}, {}, errors_only = True)
+                    container_features_attribute_errors['subitems'].append(container_duplicated_guid)
+                    self.result_sink.write_feature(self.layer_props, feature_dict_result)
+            container_features['subitems'].append(self.result_sink.get_features_note())
+            if errors_only:
+                container_features['subitems'].insert(0, self.write_features_summary(features_count, failed_counts, check_id))
+        
+        elif errors_only:
+            for shard_result in shards:
+                error_features = {}
+                for feature_dict_result in shard_result['features']:
+                    if cap_shards_examples and not self.cap_container_examples(feature_dict_result['subitems'][0]):
+                        continue
+                    error_features[feature_dict_result['related_feature_id']] = feature_dict_result
+                for fid in shard_result['fids']:
+                    feature_dict_result = error_features.get(fid)
+                    if check_id:
+                        duplicate_group = duplicate_groups.get(fid)
+                        if duplicate_group is not None:
+                            failed_counts['unique_id'] += 1
+                            container_duplicated_guid = self.write_duplicated_id_result(fid, duplicate_group)
+                            if container_duplicated_guid is not None:
+                                if feature_dict_result is None:
+                                    feature_dict_result, container_features_attribute_errors = self.write_feature_result(fid, [], [], {}, {}, errors_only = True)
+                                feature_dict_result['subitems'][0]['subitems'].append(container_duplicated_guid)
+                    if feature_dict_result is not None:
+                        container_features['subitems'].append(feature_dict_result)
+            container_features['subitems'].insert(0, self.write_features_summary(features_count, failed_counts, check_id))
+        
+        elif check_id:
+            pending_id_checks = []
+            for shard_result in shards:
+                for feature_dict_result, fid in zip(shard_result['features'], shard_result['fids']):
+                    pending_id_checks.append((feature_dict_result['subitems'][0], fid))
+            
+            self.write_duplicated_id_results(pending_id_checks, duplicate_groups)
+            del pending_id_checks
+        
+        container_error_overflow = self.write_error_overflow_result()
+        if container_error_overflow is not None:
+            container_features['subitems'].append(container_error_overflow)
+        
+        if canceled:
+            container_features['subitems'].insert(0, self.write_features_canceled_result(features_count))
+        del duplicate_groups
+        del shards
         
         self.main_features_check_bench.stop()
         
-        self.main_features_check_bench.join(self.check_feature_bench)
-        
         print("Check features..... Done")
         print(self.main_features_check_bench.get_report())
         print("end")
@@ -1086,6 +1852,15 @@ class EDRA_exchange_layer_checker:
         self.write_result_dict_bench.start('check_fields_type_and_names')
         
         self.fields_check_results_list = self.layer_EDRA_valid_class.check_fields_type_and_names(self.layer_EDRA_valid_class.layerDefinition)
+        self.null_probe_fields = self.get_null_probe_fields()
+        
+        self.write_result_dict_bench.stop()
+        
+        # об'єкти перевіряються до перевірки типів полів, бо check_wrong_fields_types
+        # використовує зібрані під час того ж проходу ознаки NULL полів
+        self.write_result_dict_bench.start('write_features_check_result')
+        
+        features_check_results = self.write_features_check_result() #повертається список, перший об'єкт це легасі словник, другий це контейнер для нової структури
         
         self.write_result_dict_bench.stop()
         
@@ -1242,7 +2017,7 @@ class EDRA_exchange_layer_checker:
                     
                     for x in wrong_layer_fields_names_list[wrong_field_name]:
                         
-                        if [x] == "general":
+                        if x == "general":
                             insception_dict_field_error_name_general = None
                             insception_dict_field_error_name_general = self.create_inspection_dict(                    
                                 inspection_type_name = 'Перевірка назви поля (атрибута)', #Підтягувати перевірку з файлу структури з помилками
@@ -1251,20 +2026,21 @@ class EDRA_exchange_layer_checker:
                                 criticity = 2, 
                                 help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
                             )
+                            self.add_name_suggestions(insception_dict_field_error_name_general, 'field_name', wrong_field_name, self.layer_EDRA_valid_class.suggest_object_names(wrong_field_name, 'field'))
                             container_wrong_field_name_errors['subitems'].append(insception_dict_field_error_name_general)
                         
-                        if [x] == "used_alias":
+                        if x == "used_alias":
                             insception_dict_field_error_name_used_alias = None
                             insception_dict_field_error_name_used_alias = self.create_inspection_dict(                    
                                 inspection_type_name = 'Перевірка назви поля (атрибута)', #Підтягувати перевірку з файлу структури з помилками
-                                item_name = f"Замість назви поля (атрибута) використано псевдонім «{wrong_field_name}», вимагається «{wrong_layer_fields_names_list[wrong_field_name]['result_dict']['valid_name']}»", 
+                                item_name = f"Замість назви поля (атрибута) використано псевдонім «{wrong_field_name}», вимагається «{wrong_layer_fields_names_list[wrong_field_name]['valid_name']}»", 
                                 item_tool_tip = f"Замість назви поля (атрибута) використано псевдонім»", 
                                 criticity = 2, 
                                 help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
                             )
                             container_wrong_field_name_errors['subitems'].append(insception_dict_field_error_name_used_alias)
                         
-                        if [x] == "spaces_used":
+                        if x == "spaces_used":
                             insception_dict_field_error_name_spaces_used = None
                             insception_dict_field_error_name_spaces_used = self.create_inspection_dict(                    
                                 inspection_type_name = 'Перевірка назви поля (атрибута)', #Підтягувати перевірку з файлу структури з помилками
@@ -1275,7 +2051,7 @@ class EDRA_exchange_layer_checker:
                             )
                             container_wrong_field_name_errors['subitems'].append(insception_dict_field_error_name_spaces_used)
                         
-                        if [x] == "used_cyrillic":
+                        if x == "used_cyrillic":
                             insception_dict_field_error_name_used_cyrillic = None
                             insception_dict_field_error_name_used_cyrillic = self.create_inspection_dict(                    
                                 inspection_type_name = 'Перевірка назви поля (атрибута)', #Підтягувати перевірку з файлу структури з помилками
@@ -1285,6 +2061,16 @@ class EDRA_exchange_layer_checker:
                                 help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
                             )
                             container_wrong_field_name_errors['subitems'].append(insception_dict_field_error_name_used_cyrillic)
+                        
+                        if x == "capital_leters":
+                            insception_dict_field_error_name_capital_leters = self.create_inspection_dict(                    
+                                inspection_type_name = 'Перевірка назви поля (атрибута)', #Підтягувати перевірку з файлу структури з помилками
+                                item_name = f"В назві поля (атрибута) «{wrong_field_name}» наявні великі літери, вимагається «{wrong_layer_fields_names_list[wrong_field_name]['valid_name']}»", 
+                                item_tool_tip = f"В назві поля (атрибута) наявні великі літери", 
+                                criticity = 2, 
+                                help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
+                            )
+                            container_wrong_field_name_errors['subitems'].append(insception_dict_field_error_name_capital_leters)
                             
                     
                 elif len(wrong_layer_fields_names_list[wrong_field_name].keys()) == 0:
@@ -1337,13 +2123,12 @@ class EDRA_exchange_layer_checker:
         
         #### НЕ ЗАБУТИ РОЗКОМЕНТУВАТИ
         
-        self.write_result_dict_bench.start('write_features_check_result')
-        
-        features_check_results = self.write_features_check_result() #повертається список, перший об'єкт це легасі словник, другий це контейнер для нової структури
         self.check_result_dict['subitems'].append(features_check_results)
         del features_check_results
         
-        self.write_result_dict_bench.stop()
+        container_column_profile = self.write_column_profile_result()
+        if container_column_profile is not None:
+            self.check_result_dict['subitems'].append(container_column_profile)
         
         
         if self.main_features_check_bench is not None:
@@ -1371,30 +2156,10 @@ class EDRA_exchange_layer_checker:
         
         if self.layer_EDRA_valid_class.layer is not None:
             
-            self.parse_bench.start('check_layer_is_empty')
-            
-            insception_layer_is_empty = None
-            layer_is_empty =self.layer_EDRA_valid_class.get_is_layer_empty()
-            if layer_is_empty:    
-                insception_layer_is_empty = self.create_inspection_dict(                    
-                        inspection_type_name = 'Перевірка на наявність об’єктів в шарі', #Підтягувати перевірку з файлу структури з помилками
-                        item_name = f"В шарі {self.layer_props['layer_name']} відсутні об\'єкти", 
-                        item_tool_tip = f"В шарі {self.layer_props['layer_real_name']} відсутні об\'єкти", 
-                        criticity = 2, 
-                        help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
-                    )
-            else:
-                insception_layer_is_empty = self.create_inspection_dict(                    
-                        inspection_type_name = 'Перевірка на наявність об’єктів в шарі', #Підтягувати перевірку з файлу структури з помилками
-                        item_name = f"В шарі {self.layer_props['layer_name']} наявні об\'єкти", 
-                        item_tool_tip = f"В шарі {self.layer_props['layer_real_name']} наявні об\'єкти", 
-                        criticity = 0, 
-                        help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
-                    )
-        
-            self.check_result_dict['subitems'].append(insception_layer_is_empty)
+            # вузол перевірки наявності об'єктів заповнюється після перевірки об'єктів: кількість об'єктів береться з профілю колонок
+            layer_is_empty_position = len(self.check_result_dict['subitems'])
+            self.check_result_dict['subitems'].append(None)
             
-            self.parse_bench.stop()
             # self.check_result_legacy[self.layer_props['related_layer_id']] = {}
             # self.check_result_legacy[self.layer_props['related_layer_id']]["is_empty"] = layer_is_empty
             
@@ -1414,7 +2179,7 @@ class EDRA_exchange_layer_checker:
                     if len(layer_name_errors_check_result['result_dict'].keys()) > 0:
                         for x in layer_name_errors_check_result['result_dict']:
                             
-                            if [x] == "general":
+                            if x == "general":
                                 insception_dict_layer_error_name_general = None
                                 insception_dict_layer_error_name_general = self.create_inspection_dict(                    
                                     inspection_type_name = 'Перевірка імені шару', #Підтягувати перевірку з файлу структури з помилками
@@ -1426,7 +2191,7 @@ class EDRA_exchange_layer_checker:
                                 container_layer_error_name['subitems'].append(insception_dict_layer_error_name_general)
                                 del insception_dict_layer_error_name_general
                             
-                            if [x] == "used_alias":
+                            if x == "used_alias":
                                 insception_dict_layer_error_name_used_alias = None
                                 insception_dict_layer_error_name_used_alias = self.create_inspection_dict(                    
                                     inspection_type_name = 'Перевірка імені шару', #Підтягувати перевірку з файлу структури з помилками
@@ -1438,7 +2203,7 @@ class EDRA_exchange_layer_checker:
                                 container_layer_error_name['subitems'].append(insception_dict_layer_error_name_used_alias)
                                 del insception_dict_layer_error_name_used_alias
                             
-                            if [x] == "spaces_used":
+                            if x == "spaces_used":
                                 insception_dict_layer_error_name_spaces_used = None
                                 insception_dict_layer_error_name_spaces_used = self.create_inspection_dict(                    
                                     inspection_type_name = 'Перевірка імені шару', #Підтягувати перевірку з файлу структури з помилками
@@ -1450,7 +2215,7 @@ class EDRA_exchange_layer_checker:
                                 container_layer_error_name['subitems'].append(insception_dict_layer_error_name_spaces_used)
                                 del insception_dict_layer_error_name_spaces_used
                             
-                            if [x] == "used_cyrillic":
+                            if x == "used_cyrillic":
                                 insception_dict_layer_error_name_used_cyrillic = None
                                 insception_dict_layer_error_name_used_cyrillic = self.create_inspection_dict(                    
                                     inspection_type_name = 'Перевірка імені шару', #Підтягувати перевірку з файлу структури з помилками
@@ -1461,6 +2226,17 @@ class EDRA_exchange_layer_checker:
                                 )
                                 container_layer_error_name['subitems'].append(insception_dict_layer_error_name_used_cyrillic)
                                 del insception_dict_layer_error_name_used_cyrillic
+                            
+                            if x == "capital_leters":
+                                insception_dict_layer_error_name_capital_leters = self.create_inspection_dict(                    
+                                    inspection_type_name = 'Перевірка імені шару', #Підтягувати перевірку з файлу структури з помилками
+                                    item_name = f"В назві класу «{self.layer_props['layer_real_name']}» наявні великі літери, вимагається «{layer_name_errors_check_result['result_dict']['valid_name']}»", 
+                                    item_tool_tip = f"В назві класу наявні великі літери", 
+                                    criticity = 2, 
+                                    help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
+                                )
+                                container_layer_error_name['subitems'].append(insception_dict_layer_error_name_capital_leters)
+                                del insception_dict_layer_error_name_capital_leters
                                 
 
                     elif len(layer_name_errors_check_result['result_dict'].keys()) == 0:
@@ -1482,7 +2258,7 @@ class EDRA_exchange_layer_checker:
                     
                     
                     self.parse_bench.start('reinit_class')
-                    self.layer_EDRA_valid_class = EDRA_validator(self.layer_EDRA_valid_class.layer, layer_name_errors_check_result['result_dict']['valid_name'], self.layer_EDRA_valid_class.structure_json, self.layer_EDRA_valid_class.domains_json)
+                    self.layer_EDRA_valid_class = EDRA_validator(self.layer_EDRA_valid_class.layer, layer_name_errors_check_result['result_dict']['valid_name'], self.layer_EDRA_valid_class.structure_json, self.layer_EDRA_valid_class.domains_json, self.driver_name, self.domain_lookups)
                     # self.check_result_legacy[self.layer_props['related_layer_id']]['layer_name_errors'] = layer_name_errors_check_result['result_dict']
                     self.parse_bench.stop()
                     
@@ -1501,6 +2277,7 @@ class EDRA_exchange_layer_checker:
                         criticity = 2, 
                         help_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
                     )
+                    self.add_name_suggestions(insception_dict_layer_error_name_else, 'layer_name', self.layer_props['layer_real_name'], self.layer_EDRA_valid_class.suggest_object_names(self.layer_EDRA_valid_class.layer_exchange_name, 'layer'))
                     
                     self.check_result_dict['subitems'].append(insception_dict_layer_error_name_else)
                     del insception_dict_layer_error_name_else
@@ -1517,6 +2294,11 @@ class EDRA_exchange_layer_checker:
                 
                 self.parse_bench.stop()
             
+            self.parse_bench.start('check_layer_is_empty')
+            
+            self.check_result_dict['subitems'][layer_is_empty_position] = self.write_layer_is_empty_result(self.get_is_layer_empty())
+            
+            self.parse_bench.stop()
             
             
         
@@ -1547,6 +2329,10 @@ class EDRA_exchange_layer_checker:
         
         if hasattr(self, 'write_result_dict_bench') and self.write_result_dict_bench is not None:
             self.parse_bench.join(self.write_result_dict_bench)
+        # невиконані SQL запити (перевірки, що виконані в python замість бази даних) потрапляють в звіт
+        if self.pushdown is not None:
+            for note in self.pushdown.notes:
+                self.parse_bench.add_note(note)
         
 
         print(f"Завершення перевірки шару {self.layer_props['layer_name']}..... Done")
@@ -0,0 +1,261 @@
+import math
+import zlib
+from collections import Counter
+from operator import methodcaller
+
+import numpy as np
+
+from .domain_lookup import is_integer_text
+
+# Точність HyperLogLog: 2^12 регістрів (4 КБ на поле), похибка кількості унікальних значень близько 1.6%
+HLL_PRECISION = 12
+
+
+def mix_hashes(values: np.ndarray) -> np.ndarray:
+    '''Перемішування бітів масиву uint64 (фіналізатор splitmix64), щоб старші біти хешу були рівномірними для HyperLogLog.'''
+    # операції над масивами uint64 виконуються за модулем 2^64
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def hash_numbers(values) -> np.ndarray:
+    '''
+    64-бітні хеші чисел за їх двійковим представленням (int64 або float64) без перебору в python.
+
+    :param values: числовий numpy масив або список int чи float одного типу
+    :return: масив uint64 тієї ж довжини
+    '''
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        # -0.0 та 0.0 - одне значення
+        bits = (values.astype(np.float64) + 0.0).view(np.uint64)
+    else:
+        bits = values.astype(np.int64).view(np.uint64)
+    return mix_hashes(bits)
+
+
+def hash_texts(texts: list) -> np.ndarray:
+    '''
+    64-бітні хеші текстів: CRC32 байтів UTF-8 разом з довжиною, перемішані mix_hashes.
+    CRC32 рахується в C без створення об'єкта хешу на кожне значення (як blake2b в hash_id_values), а 32 біт
+    достатньо для HyperLogLog до сотень мільйонів різних значень. Хеш не залежить від процесу (на відміну від hash()),
+    тому регістри HyperLogLog різних процесів можна об'єднувати.
+
+    :param texts: список рядків
+    :return: масив uint64 тієї ж довжини
+    '''
+    encoded = [text.encode('utf-8', errors = 'surrogatepass') for text in texts]
+    checksums = np.fromiter(map(zlib.crc32, encoded), dtype = np.uint64, count = len(encoded))
+    lengths = np.fromiter(map(len, encoded), dtype = np.uint64, count = len(encoded))
+    return mix_hashes(checksums | (lengths << np.uint64(32)))
+
+
+def hash_profile_values(values: list) -> np.ndarray:
+    '''
+    64-бітні хеші різних не NULL значень поля для HyperLogLog: тексти - hash_texts, цілі та дійсні числа - hash_numbers,
+    інші значення (списки StringList, IntegerList) - hash_texts від repr.
+    Одне значення має однаковий хеш незалежно від способу читання (Arrow чи по об'єктах).
+
+    :return: масив uint64 (порядок хешів не відповідає порядку values)
+    '''
+    texts = []
+    integers = []
+    floats = []
+    for value in values:
+        value_type = type(value)
+        if value_type is str:
+            texts.append(value)
+        elif value_type is int and -(1 << 63) <= value < (1 << 63):
+            integers.append(value)
+        elif value_type is float:
+            floats.append(value)
+        else:
+            texts.append(repr(value))
+    return np.concatenate((
+        hash_texts(texts),
+        hash_numbers(np.array(integers, dtype = np.int64)),
+        hash_numbers(np.array(floats, dtype = np.float64))))
+
+
+class HyperLogLog:
+    '''
+    Наближена кількість унікальних значень (HyperLogLog) за 64-бітними хешами значень.
+    Регістри кількох HyperLogLog (діапазонів FID з різних процесів) об'єднуються поелементним максимумом.
+    '''
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype = np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        value_bits = 64 - self.precision
+        register_indexes = (hashes >> np.uint64(value_bits)).astype(np.int64)
+        # позиція першого одиничного біта решти хешу: значення менші за 2^52 точно представлені в float64
+        remainders = (hashes & np.uint64((1 << value_bits) - 1)).astype(np.float64)
+        ranks = (value_bits + 1 - np.frexp(remainders)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, register_indexes, ranks)
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out = self.registers)
+
+    def count(self) -> int:
+        registers_count = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / registers_count)
+        estimate = alpha * registers_count * registers_count / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zero_registers = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * registers_count and zero_registers > 0:
+            # для малої кількості значень точніший лінійний підрахунок
+            estimate = registers_count * math.log(registers_count / zero_registers)
+        return int(round(estimate))
+
+
+class FieldProfile:
+    '''
+    Профіль значень одного поля шару: кількість NULL та порожніх рядків, мінімальна та максимальна довжина
+    текстових значень, кількість значень, схожих на цілі числа, та наближена кількість унікальних значень.
+    '''
+    __slots__ = ('name', 'count', 'null_count', 'empty_count', 'min_length', 'max_length', 'integer_like_count', 'distinct')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.null_count = 0
+        self.empty_count = 0
+        self.min_length = None
+        self.max_length = None
+        self.integer_like_count = 0
+        self.distinct = HyperLogLog()
+
+    def add_column(self, column):
+        '''Додає значення колонки пакета (numpy масив або list, як в ColumnBatch).'''
+        if isinstance(column, np.ndarray) and column.dtype.kind in 'iuf':
+            # числові колонки Arrow без перебору значень в python
+            nulls = np.ma.getmaskarray(column) if isinstance(column, np.ma.MaskedArray) else np.zeros(len(column), dtype = bool)
+            data = np.ma.getdata(column)[~nulls]
+            self.count += len(column)
+            self.null_count += int(np.count_nonzero(nulls))
+            if column.dtype.kind == 'f':
+                self.integer_like_count += int(np.count_nonzero(np.isfinite(data) & (data == np.floor(data))))
+            else:
+                self.integer_like_count += len(data)
+            # повторні значення не змінюють регістри HyperLogLog, тому хешуються всі значення без np.unique
+            self.distinct.add_hashes(hash_numbers(data))
+            return
+
+        values = column.tolist() if hasattr(column, 'tolist') else column
+        self.count += len(values)
+        # статистики рахуються по різних значеннях пакета з їх кількістю, а не по кожному об'єкту
+        try:
+            value_counts = Counter(values)
+        except TypeError:
+            # значення-списки (StringList, IntegerList) порівнюються за текстом
+            value_counts = Counter(None if value is None else repr(value) for value in values)
+        self.null_count += value_counts.pop(None, 0)
+        self.empty_count += value_counts.get('', 0)
+        texts = []
+        texts_counts = []
+        other_values = []
+        for value, value_count in value_counts.items():
+            if type(value) is str:
+                texts.append(value)
+                texts_counts.append(value_count)
+            else:
+                other_values.append(value)
+                if isinstance(value, int) and not isinstance(value, bool):
+                    self.integer_like_count += value_count
+                elif isinstance(value, float) and value.is_integer():
+                    self.integer_like_count += value_count
+        if texts:
+            # довжини та ознаки цілих чисел текстів рахуються методами str через map, без виклику функції python на значення
+            lengths = np.fromiter(map(len, texts), dtype = np.int64, count = len(texts))
+            min_length = int(lengths.min())
+            max_length = int(lengths.max())
+            if self.min_length is None or min_length < self.min_length:
+                self.min_length = min_length
+            if self.max_length is None or max_length > self.max_length:
+                self.max_length = max_length
+            counts = np.array(texts_counts, dtype = np.int64)
+            integer_like = np.fromiter(map(str.isdigit, texts), dtype = bool, count = len(texts))
+            self.integer_like_count += int(counts[integer_like].sum())
+            # від'ємні цілі числа (з мінусом на початку) перевіряються is_integer_text окремо
+            for index in np.flatnonzero(np.fromiter(map(methodcaller('startswith', '-'), texts), dtype = bool, count = len(texts))).tolist():
+                if is_integer_text(texts[index]):
+                    self.integer_like_count += texts_counts[index]
+            self.distinct.add_hashes(hash_texts(texts))
+        self.distinct.add_hashes(hash_profile_values(other_values))
+
+    def merge(self, other: 'FieldProfile'):
+        self.count += other.count
+        self.null_count += other.null_count
+        self.empty_count += other.empty_count
+        if other.min_length is not None and (self.min_length is None or other.min_length < self.min_length):
+            self.min_length = other.min_length
+        if other.max_length is not None and (self.max_length is None or other.max_length > self.max_length):
+            self.max_length = other.max_length
+        self.integer_like_count += other.integer_like_count
+        self.distinct.merge(other.distinct)
+
+    def get_integer_like_ratio(self):
+        '''Частка значень, схожих на цілі числа, серед не NULL та не порожніх значень, або None.'''
+        filled_count = self.count - self.null_count - self.empty_count
+        if filled_count <= 0:
+            return None
+        return self.integer_like_count / filled_count
+
+    def get_distinct_count(self) -> int:
+        # наближена оцінка не може перевищувати кількість не NULL значень
+        return min(self.distinct.count(), self.count - self.null_count)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'count': self.count,
+            'null_count': self.null_count,
+            'empty_count': self.empty_count,
+            'min_length': self.min_length,
+            'max_length': self.max_length,
+            'integer_like_ratio': self.get_integer_like_ratio(),
+            'distinct_count': self.get_distinct_count()
+        }
+
+
+class LayerProfile:
+    '''
+    Профіль колонок шару, зібраний за один прохід перевірки об'єктів (check_features_shard).
+    Перевірки рівня шару (check_null_attribute, перевірка наявності об'єктів) беруть відповіді з профілю,
+    а не читають шар повторно. Профілі діапазонів FID об'єднуються через merge.
+
+    :param fields_names: назви полів профілю в порядку полів шару
+    '''
+    def __init__(self, fields_names: list):
+        self.features_count = 0
+        self.fields = {field_name: FieldProfile(field_name) for field_name in fields_names}
+
+    def add_batch(self, columns: dict, features_count: int):
+        '''
+        :param columns: словник {назва поля: колонка пакета}
+        :param features_count: кількість об'єктів пакета
+        '''
+        self.features_count += features_count
+        for field_name, column in columns.items():
+            self.fields[field_name].add_column(column)
+
+    def merge(self, other: 'LayerProfile'):
+        self.features_count += other.features_count
+        for field_name, field_profile in other.fields.items():
+            if field_name in self.fields:
+                self.fields[field_name].merge(field_profile)
+            else:
+                self.fields[field_name] = field_profile
+
+    def is_all_null(self, field_name: str):
+        '''Чи всі значення поля NULL, або None, якщо поля немає в профілі.'''
+        field_profile = self.fields.get(field_name)
+        if field_profile is None:
+            return None
+        return field_profile.null_count == field_profile.count
@@ -89,7 +89,9 @@ class Csv_to_json_structure_converter:
                                         "attribute_default_value": x['attribute_default_value'],
                                         "attribute_unique" : x['attribute_unique'],
                                         "domain" : x['domain'],
-                                        "attribute_is_id": x['attribute_is_id']
+                                        "attribute_is_id": x['attribute_is_id'],
+                                        # посилання на поле іншого шару у форматі "шар.поле" (необов'язкова колонка)
+                                        "attribute_reference": x.get('attribute_reference') or ''
                                         }
             return layers_structure_dict
         
@@ -0,0 +1,80 @@
+import numpy as np
+
+INT64_MIN = -2**63
+INT64_MAX = 2**63 - 1
+
+
+def is_integer_text(value) -> bool:
+    '''Перевіряє, чи рядок є цілим числом (з можливим мінусом на початку), як EDRA_validator.is_integer.'''
+    if not value or not isinstance(value, str):
+        return False
+    if value.startswith('-'):
+        return len(value) > 1 and value[1:].isdigit()
+    return value.isdigit()
+
+
+class DomainLookup:
+    '''
+    Скомпільований домен значень для перевірки атрибутів за O(1).
+
+    Має такі набори кодів:
+        - codes - коди для не текстових полів: цілі числа, якщо код без пробілів є цілим числом, інакше рядок як є,
+        - text_codes - коди для текстових полів, рядки як є,
+        - int_codes - всі коди, які можна привести до цілого числа (для діагностики критичності 1),
+        - stripped_codes - ті ж цілі коди у вигляді рядків без пробілів (для діагностики значень з пробілами),
+        - int_codes_array, str_codes_array - відсортовані numpy масиви цілих та не цілих кодів для векторних перевірок (np.isin).
+    '''
+    __slots__ = ('name', 'codes', 'text_codes', 'int_codes', 'stripped_codes', 'int_codes_array', 'str_codes_array')
+
+    def __init__(self, name: str, domain_codes: dict):
+        self.name = name
+
+        codes = set()
+        int_codes = set()
+        for code in domain_codes.keys():
+            stripped_code = code.replace(' ', '')
+            if is_integer_text(stripped_code):
+                int_codes.add(int(stripped_code))
+                codes.add(int(stripped_code))
+            else:
+                codes.add(code)
+
+        self.codes = frozenset(codes)
+        self.text_codes = frozenset(domain_codes.keys())
+        self.int_codes = frozenset(int_codes)
+        self.stripped_codes = frozenset(str(code) for code in int_codes)
+
+        self.int_codes_array = np.array(sorted(code for code in int_codes if INT64_MIN <= code <= INT64_MAX), dtype=np.int64)
+        self.str_codes_array = np.array(sorted(code for code in codes if isinstance(code, str)), dtype=str)
+
+    def match_as_int(self, value) -> bool:
+        '''Чи відповідає домену значення, приведене до цілого числа.'''
+        try:
+            return int(value) in self.int_codes
+        except ValueError:
+            return False
+
+    def match_ignoring_spaces(self, value: str) -> bool:
+        '''Чи відповідає домену текстове значення після видалення пробілів.'''
+        stripped_value = value.replace(' ', '')
+        if stripped_value in self.stripped_codes:
+            return True
+        return is_integer_text(stripped_value) and self.match_as_int(stripped_value)
+
+    def __len__(self):
+        return len(self.text_codes)
+
+    def __repr__(self):
+        return f"DomainLookup('{self.name}', {len(self.text_codes)} codes)"
+
+
+def compile_domain_lookups(domains_json: dict) -> dict:
+    '''
+    Компілює всі домени структури в DomainLookup.
+
+    :param domains_json: словник доменів з Csv_to_json_structure_converter.create_domain_json
+    :return: словник {назва домену: DomainLookup}
+    '''
+    if not domains_json:
+        return {}
+    return {name: DomainLookup(name, domain['codes']) for name, domain in domains_json.items()}
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+
+import numpy as np
+
+from .check_kernels import as_array, null_mask
+
+# Версія формату записів кешу: при зміні формату помилок (check_batch_values) або відбитків старі записи не використовуються
+FEATURE_CACHE_VERSION = 2
+
+# Об'єкти кешуються блоками FID (fid // CACHE_BLOCK_FIDS): один відбиток та один запис помилок на блок
+CACHE_BLOCK_FIDS = 32
+# Позначка NULL в тексті блоку колонки, відмінна від порожнього рядка
+NULL_MARK = '\x00'
+# Роздільник значень в тексті блоку колонки
+VALUE_SEPARATOR = '\x1f'
+
+
+def get_block_bounds(fids: np.ndarray) -> list:
+    '''
+    Межі блоків кешу в пакеті: послідовні рядки з однаковим fid // CACHE_BLOCK_FIDS.
+
+    :return: список (перший рядок, рядок після останнього)
+    '''
+    if len(fids) == 0:
+        return []
+    breaks = (np.flatnonzero(np.diff(fids // CACHE_BLOCK_FIDS)) + 1).tolist()
+    return list(zip([0] + breaks, breaks + [len(fids)]))
+
+
+def get_column_parts(column):
+    '''
+    Значення колонки у вигляді, придатному для хешування частинами:
+    числові колонки - масив значень та маска NULL, інші - список текстів (NULL - NULL_MARK).
+    '''
+    values = as_array(column)
+    nulls = null_mask(values)
+    data = np.ma.getdata(values)
+    if data.dtype != object:
+        return data, nulls
+    texts = data.copy()
+    texts[nulls] = NULL_MARK
+    texts = texts.tolist()
+    # типи значень без NULL (NULL_MARK - текст і не має впливати на вибір числового шляху)
+    values_types = set(map(type, data[~nulls].tolist()))
+    if values_types <= {str}:
+        return texts, None
+    # колонки цілих та дійсних чисел при читанні по об'єктах (списки python)
+    for number_type, dtype in ((int, np.int64), (float, np.float64)):
+        if values_types == {number_type}:
+            numbers = data.copy()
+            numbers[nulls] = 0
+            try:
+                return np.array(numbers.tolist(), dtype = dtype), nulls
+            except OverflowError:
+                break
+    # списки (StringList, IntegerList) та інші значення хешуються за текстом
+    return [value if isinstance(value, str) else repr(value) for value in texts], None
+
+
+def feature_fingerprints(columns, fids: np.ndarray) -> list:
+    '''
+    Відбитки блоків об'єктів пакета (get_block_bounds): 8 байт blake2b від FID та значень колонок блоку.
+    Кожна колонка блоку хешується одним викликом (текст блоку через join або буфер числового масиву),
+    а не по рядках. Відбиток не залежить від процесу (на відміну від hash()), тому його можна зберігати між запусками.
+
+    :param columns: колонки пакета (ColumnBatch.columns) в порядку плану перевірки
+    :param fids: FID рядків пакета (масив int64)
+    :return: список (перший рядок, рядок після останнього, відбиток bytes) в порядку рядків
+    '''
+    columns_parts = [get_column_parts(column) for column in columns]
+    fingerprints = []
+    for start, stop in get_block_bounds(fids):
+        block_hash = hashlib.blake2b(fids[start:stop].tobytes(), digest_size = 8)
+        for values, nulls in columns_parts:
+            if nulls is None:
+                block_hash.update(VALUE_SEPARATOR.join(values[start:stop]).encode('utf-8', errors = 'surrogatepass'))
+            else:
+                block_hash.update(values[start:stop].tobytes())
+                block_hash.update(nulls[start:stop].tobytes())
+            block_hash.update(b'\x1e')
+        fingerprints.append((start, stop, block_hash.digest()))
+    return fingerprints
+
+
+def get_plan_context(layer_exchange_name: str, fields_plan: list) -> str:
+    '''
+    Відбиток плану перевірки шару (FieldRule): назви, типи, обов'язковість, довжини та коди доменів полів.
+    Результат перевірки об'єкта залежить лише від значень полів та цього плану.
+    '''
+    plan = [FEATURE_CACHE_VERSION, layer_exchange_name]
+    for rule in fields_plan:
+        domain_codes = sorted(map(repr, rule.domain.codes)) if rule.domain is not None else None
+        plan.append([rule.name, rule.attribute_type, rule.required, rule.max_len, rule.is_id, domain_codes])
+    return hashlib.blake2b(json.dumps(plan, ensure_ascii = False).encode('utf-8'), digest_size = 16).hexdigest()
+
+
+class FeatureFingerprintCache:
+    '''
+    Кеш результатів перевірки атрибутів об'єктів шару між запусками (SQLite).
+
+    Для кожного блоку FID (feature_fingerprints) зберігається відбиток значень полів та помилки об'єктів блоку
+    у форматі EDRA_validator.check_batch_values. Якщо відбиток блоку не змінився, його об'єкти повторно не перевіряються.
+    Записи шару скидаються, якщо змінився план перевірки (get_plan_context).
+
+    :param path: шлях до файлу кешу
+    :param layer_key: ключ шару (шлях до файлу та назва шару)
+    :param context: відбиток плану перевірки шару
+    '''
+    def __init__(self, path: str, layer_key: str, context: str):
+        self.path = path
+        self.layer_key = layer_key
+        folder = os.path.dirname(path)
+        if folder != '':
+            os.makedirs(folder, exist_ok = True)
+        # кілька процесів (діапазони FID) можуть писати в один файл, тому чекаємо на блокування
+        self.connection = sqlite3.connect(path, timeout = 60)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS layers (layer_key TEXT PRIMARY KEY, context TEXT)')
+        # записи по об'єктах (FEATURE_CACHE_VERSION 1) замінені записами по блоках
+        self.connection.execute('DROP TABLE IF EXISTS features')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS blocks (layer_key TEXT, first_fid INTEGER, fingerprint BLOB, errors BLOB, PRIMARY KEY (layer_key, first_fid))')
+
+        row = self.connection.execute('SELECT context FROM layers WHERE layer_key = ?', (layer_key,)).fetchone()
+        if row is None or row[0] != context:
+            self.connection.execute('DELETE FROM blocks WHERE layer_key = ?', (layer_key,))
+            self.connection.execute('INSERT OR REPLACE INTO layers VALUES (?, ?)', (layer_key, context))
+        self.connection.commit()
+
+        self.reused_count = 0
+        self.checked_count = 0
+        # перші FID блоків, прочитаних в цьому проході (delete_missing)
+        self.seen_first_fids = set()
+
+    def get(self, first_fid: int, last_fid: int) -> dict:
+        '''Записи кешу для блоків, що починаються в діапазоні [first_fid, last_fid]: {перший FID: (відбиток, помилки в pickle або None)}.'''
+        rows = self.connection.execute(
+            'SELECT first_fid, fingerprint, errors FROM blocks WHERE layer_key = ? AND first_fid BETWEEN ? AND ?',
+            (self.layer_key, first_fid, last_fid))
+        return {first_fid: (fingerprint, errors) for first_fid, fingerprint, errors in rows}
+
+    def put(self, rows: list):
+        '''Записує (перший FID, відбиток, помилки блоку {зсув рядка в блоці: помилки}) для змінених та нових блоків.'''
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?)',
+            [(self.layer_key, first_fid, fingerprint, pickle.dumps(errors) if errors else None) for first_fid, fingerprint, errors in rows])
+
+    def delete_missing(self, fid_range = None):
+        '''Видаляє записи блоків, яких в цьому проході не було (в межах діапазону FID, якщо він заданий).'''
+        if fid_range is None:
+            rows = self.connection.execute('SELECT first_fid FROM blocks WHERE layer_key = ?', (self.layer_key,))
+        else:
+            rows = self.connection.execute(
+                'SELECT first_fid FROM blocks WHERE layer_key = ? AND first_fid >= ? AND first_fid < ?',
+                (self.layer_key, fid_range[0], fid_range[1]))
+        missing_first_fids = set(row[0] for row in rows).difference(self.seen_first_fids)
+        if missing_first_fids:
+            self.connection.executemany('DELETE FROM blocks WHERE layer_key = ? AND first_fid = ?', [(self.layer_key, first_fid) for first_fid in missing_first_fids])
+
+    def check_batch_values(self, validator, columns, fids: list) -> dict:
+        '''
+        Як EDRA_validator.check_batch_values, але перевіряє лише об'єкти блоків, відбиток яких змінився з попереднього запуску.
+
+        :param validator: EDRA_validator шару
+        :param columns: колонки пакета в порядку validator.fields_plan
+        :param fids: FID рядків пакета
+        :return: словник {індекс рядка: помилки} лише для рядків з помилками
+        '''
+        if len(fids) == 0:
+            return {}
+        fids_array = np.asarray(fids, dtype = np.int64)
+        blocks = feature_fingerprints(columns, fids_array)
+        cached = self.get(int(fids_array.min()), int(fids_array.max()))
+
+        batch_errors = {}
+        changed_blocks = []
+        for start, stop, fingerprint in blocks:
+            first_fid = fids[start]
+            self.seen_first_fids.add(first_fid)
+            cached_block = cached.get(first_fid)
+            if cached_block is None or cached_block[0] != fingerprint:
+                changed_blocks.append((start, stop, fingerprint))
+            elif cached_block[1] is not None:
+                for offset, row_errors in pickle.loads(cached_block[1]).items():
+                    batch_errors[start + offset] = row_errors
+
+        changed_indexes = [row_index for start, stop, fingerprint in changed_blocks for row_index in range(start, stop)]
+        self.reused_count += len(fids) - len(changed_indexes)
+        self.checked_count += len(changed_indexes)
+        if len(changed_indexes) == 0:
+            return batch_errors
+
+        if len(changed_indexes) == len(fids):
+            changed_errors = validator.check_batch_values(columns)
+        else:
+            changed_columns = [as_array(column)[changed_indexes] for column in columns]
+            changed_errors = {changed_indexes[index]: errors for index, errors in validator.check_batch_values(changed_columns).items()}
+        batch_errors.update(changed_errors)
+
+        rows = []
+        for start, stop, fingerprint in changed_blocks:
+            block_errors = {row_index - start: changed_errors[row_index] for row_index in range(start, stop) if row_index in changed_errors}
+            rows.append((fids[start], fingerprint, block_errors))
+        self.put(rows)
+        return batch_errors
+
+    def get_report(self) -> str:
+        return f'Кеш відбитків об\'єктів: перевірено {self.checked_count}, використано з кешу {self.reused_count}'
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,189 @@
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+
+from .parallel_validation import open_layer
+from .checker_class import DEFAULT_ERROR_CAP
+from .id_uniqueness import hash_id_values
+
+# Хеші NULL та порожнього значення ID: такі ID між шарами дублікатами не вважаються і в індекс не додаються
+EMPTY_ID_HASHES = hash_id_values([None, ''])
+
+
+def read_layer_id_values(layer_props: dict, id_field: str, fids: list) -> list:
+    '''
+    Значення ID вибраних об'єктів шару (повторне відкриття файлу шару).
+
+    :return: список (FID, значення ID) або порожній список, якщо шар не відкривається
+    '''
+    dataSource, layer, driver_name = open_layer(layer_props)
+    if layer is None:
+        return []
+    id_field_index = layer.GetLayerDefn().GetFieldIndex(id_field)
+    if id_field_index < 0:
+        return []
+    id_rows = []
+    for fid in fids:
+        feature = layer.GetFeature(fid)
+        if feature is not None:
+            id_rows.append((fid, feature.GetField(id_field_index)))
+    del layer
+    del dataSource
+    return id_rows
+
+
+class GlobalIdIndex:
+    '''
+    Індекс ID всіх шарів перевірки для пошуку ID, що повторюються в різних файлах та шарах.
+
+    Шари з однаковим полем ID (attribute_is_id структури) мають спільний простір ID. Кожен шар додає свій
+    частковий індекс (EDRA_exchange_layer_checker.get_layer_id_index: хеші значень ID та FID), зокрема і шари,
+    перевірені в процесах-виконавцях parallel_validation або взяті з кешу результатів.
+    Індекс зберігається в тимчасовій базі SQLite, тому не обмежений пам'яттю. Хеші, що зустрічаються в кількох шарах, перевіряються за справжніми значеннями ID
+    (read_layer_id_values), щоб збіг хешів різних значень не потрапив в результат.
+
+    :param cap: максимальна кількість значень ID, що повторюються, в результаті (решта лише рахується), 0 - без обмеження
+    :param temp_folder: папка тимчасового файлу бази, None - системна тимчасова папка
+    '''
+    def __init__(self, cap: int = DEFAULT_ERROR_CAP, temp_folder: str = None):
+        self.cap = cap
+        file_descriptor, self.path = tempfile.mkstemp(prefix = 'global_id_index_', suffix = '.sqlite', dir = temp_folder)
+        os.close(file_descriptor)
+        self.connection = sqlite3.connect(self.path)
+        # база тимчасова, тому журнал та синхронізація з диском не потрібні
+        self.connection.execute('PRAGMA journal_mode = OFF')
+        self.connection.execute('PRAGMA synchronous = OFF')
+        self.connection.execute('CREATE TABLE ids (field_number INTEGER, hash INTEGER, layer_number INTEGER, fid INTEGER)')
+        # {ID шару: (номер шару, поле ID)}
+        self.layers = {}
+        self.fields_numbers = {}
+
+    def add_layer(self, layer_id: str, layer_id_index: dict):
+        '''Додає частковий індекс шару (EDRA_exchange_layer_checker.get_layer_id_index).'''
+        if layer_id in self.layers:
+            return
+        id_field = layer_id_index['id_field']
+        field_number = self.fields_numbers.setdefault(id_field, len(self.fields_numbers))
+        layer_number = len(self.layers)
+        self.layers[layer_id] = (layer_number, id_field)
+        id_hashes = np.frombuffer(layer_id_index['id_hashes'], dtype = np.uint64)
+        fids = np.frombuffer(layer_id_index['fids'], dtype = np.int64)
+        filled = ~np.isin(id_hashes, EMPTY_ID_HASHES)
+        # SQLite зберігає цілі зі знаком, тому хеші uint64 записуються як int64
+        self.connection.executemany(
+            'INSERT INTO ids VALUES (?, ?, ?, ?)',
+            ((field_number, id_hash, layer_number, fid) for id_hash, fid in zip(id_hashes[filled].view(np.int64).tolist(), fids[filled].tolist())))
+        self.connection.commit()
+
+    def find_candidates(self) -> dict:
+        '''
+        :return: словник {ID шару: впорядкований список FID} об'єктів, хеш ID яких зустрічається в кількох шарах
+        '''
+        layers_ids = {layer_number: layer_id for layer_id, (layer_number, id_field) in self.layers.items()}
+        candidates = {}
+        rows = self.connection.execute(
+            'SELECT ids.layer_number, ids.fid FROM ids '
+            'JOIN (SELECT field_number, hash FROM ids GROUP BY field_number, hash HAVING COUNT(DISTINCT layer_number) > 1) AS repeated '
+            'USING (field_number, hash) ORDER BY ids.layer_number, ids.fid')
+        for layer_number, fid in rows:
+            candidates.setdefault(layers_ids[layer_number], []).append(fid)
+        return candidates
+
+    def find_collisions(self, layers: dict) -> list:
+        '''
+        ID, що повторюються в кількох шарах. NULL та порожні значення між шарами дублікатами не вважаються.
+
+        :param layers: словник шарів run_validator
+        :return: список (поле ID, значення ID, список (ID шару, FID)) в порядку першої появи
+        '''
+        groups = {}
+        for layer_id, fids in self.find_candidates().items():
+            id_field = self.layers[layer_id][1]
+            for fid, feature_id_value in read_layer_id_values(layers[layer_id], id_field, fids):
+                if feature_id_value is None or feature_id_value == '':
+                    continue
+                groups.setdefault((id_field, feature_id_value), []).append((layer_id, fid))
+        collisions = []
+        for (id_field, feature_id_value), features in groups.items():
+            if len(set(layer_id for layer_id, fid in features)) > 1:
+                collisions.append((id_field, feature_id_value, features))
+        return collisions
+
+    def write_result(self, layers: dict):
+        '''
+        Вузол результату перевірки унікальності ID між файлами та шарами.
+
+        :return: контейнер або None, якщо в індексі менше двох шарів
+        '''
+        if len(self.layers) < 2:
+            return None
+        container_global_id = {
+            'type': 'container',
+            'item_name': "Перевірка унікальності ID між файлами та шарами",
+            'subitems': []
+        }
+        collisions = self.find_collisions(layers)
+        if not collisions:
+            container_global_id['subitems'].append({
+                'type': 'inspection',
+                'inspetcion_type_name': "Перевірка унікальності ID між файлами та шарами",
+                'item_name': f"ID об'єктів {len(self.layers)} шарів не повторюються в інших шарах",
+                'criticity': 0
+            })
+            return container_global_id
+
+        for id_field, feature_id_value, features in collisions[:self.cap or None]:
+            layers_count = len(set(layer_id for layer_id, fid in features))
+            inspection = {
+                'type': 'inspection',
+                'inspetcion_type_name': "Перевірка унікальності ID між файлами та шарами",
+                'item_name': f"ID «{feature_id_value}» (поле {id_field}) повторюється в {len(features)} об'єктах {layers_count} шарів",
+                'criticity': 2,
+                'subitems': []
+            }
+            for layer_id, fid in features:
+                layer_props = layers[layer_id]
+                inspection['subitems'].append({
+                    'type': 'feature',
+                    'item_name': f"Об'єкт '{fid}' шару «{layer_props['layer_name']}» (файл «{os.path.basename(layer_props['path'])}»)",
+                    'related_file_path': layer_props['path'],
+                    'related_layer_id': layer_id,
+                    'related_feature_id': fid,
+                    'criticity': 2
+                })
+            container_global_id['subitems'].append(inspection)
+        if self.cap and len(collisions) > self.cap:
+            container_global_id['subitems'].append({
+                'type': 'inspection',
+                'inspetcion_type_name': "Перевірка унікальності ID між файлами та шарами",
+                'item_name': f"Ще {len(collisions) - self.cap} значень ID повторюються в кількох шарах",
+                'criticity': 2
+            })
+        return container_global_id
+
+    def close(self):
+        '''Закриває та видаляє тимчасову базу.'''
+        self.connection.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def create_global_id_index(options: dict):
+    '''
+    Створює індекс ID між файлами за налаштуваннями run_validator:
+        - global_id_check - шукати ID, що повторюються в різних файлах та шарах (дефолтне значення True),
+        - error_cap - максимальна кількість таких ID в результаті.
+
+    :return: GlobalIdIndex або None
+    '''
+    if options is not None and not options.get('global_id_check', True):
+        return None
+    try:
+        return GlobalIdIndex(options.get('error_cap', DEFAULT_ERROR_CAP) if options is not None else DEFAULT_ERROR_CAP)
+    except (OSError, sqlite3.Error) as e:
+        print(f'Індекс ID між файлами недоступний: "{e}"')
+        return None
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Бюджет пам'яті індексу ID за замовчуванням, МБ
+DEFAULT_ID_MEMORY_BUDGET = 256
+
+# Запис індексу: 64-бітний хеш значення ID та FID об'єкта (16 байт на об'єкт)
+ID_RECORD_DTYPE = np.dtype([('hash', '<u8'), ('fid', '<i8')])
+# Кількість старших біт хешу, за якими записи діляться на файли при записі на диск (256 файлів)
+SPILL_PARTITION_BITS = 8
+
+
+def hash_id_values(values) -> np.ndarray:
+    '''
+    64-бітні хеші значень ID (blake2b від repr значення).
+    Хеш не залежить від процесу (на відміну від hash()), тому хеші з різних процесів parallel_validation порівнювані.
+    NULL (None) має власний хеш, тому NULL значення, як і раніше, вважаються однаковими.
+
+    :param values: список значень ID (python значення, як після tolist() колонки пакета)
+    :return: масив uint64 тієї ж довжини
+    '''
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(repr(value).encode('utf-8'), digest_size = 8).digest(), 'little') for value in values),
+        dtype = np.uint64, count = len(values))
+
+
+class IdUniquenessIndex:
+    '''
+    Індекс пошуку повторюваних ID шару з обмеженим використанням пам'яті.
+
+    Замість словника значень ID зберігаються лише пари (хеш, FID) в масивах numpy. Після додавання всіх
+    об'єктів записи сортуються за хешем, а FID з однаковими сусідніми хешами повертаються як кандидати.
+    Збіг хешів не означає збігу значень, тому кандидати перевіряються за справжніми значеннями окремо
+    (EDRA_exchange_layer_checker.get_duplicate_groups).
+
+    Якщо записи перевищують memory_budget, вони записуються на диск в SPILL_PARTITION_BITS-розділи за старшими
+    бітами хешу (зовнішнє сортування): однакові хеші завжди потрапляють в один розділ, і розділи
+    сортуються в пам'яті по одному.
+
+    :param memory_budget: бюджет пам'яті, байт
+    :param temp_folder: папка тимчасових файлів, None - системна тимчасова папка
+    '''
+    def __init__(self, memory_budget: int, temp_folder: str = None):
+        self.memory_budget = memory_budget
+        self.temp_folder = temp_folder
+        self.chunks = []
+        self.chunks_size = 0
+        self.spill_folder = None
+        self.records_count = 0
+
+    def add(self, fids, hashes):
+        '''
+        :param fids: FID об'єктів (масив int64 або послідовність)
+        :param hashes: хеші значень ID в тому ж порядку (hash_id_values)
+        '''
+        records = np.empty(len(fids), dtype = ID_RECORD_DTYPE)
+        records['hash'] = hashes
+        records['fid'] = fids
+        self.chunks.append(records)
+        self.chunks_size += records.nbytes
+        self.records_count += len(records)
+        # сортування потребує ще приблизно стільки ж пам'яті (копія записів та порядок сортування)
+        if self.chunks_size * 2 > self.memory_budget:
+            self.spill()
+
+    def get_partition_path(self, partition: int) -> str:
+        return os.path.join(self.spill_folder, f'{partition:03d}.bin')
+
+    def spill(self):
+        '''Дописує накопичені записи у файли розділів та звільняє пам'ять.'''
+        if self.spill_folder is None:
+            self.spill_folder = tempfile.mkdtemp(prefix = 'id_uniqueness_', dir = self.temp_folder)
+        partitions_count = 1 << SPILL_PARTITION_BITS
+        for records in self.chunks:
+            partitions = (records['hash'] >> np.uint64(64 - SPILL_PARTITION_BITS)).astype(np.int64)
+            order = np.argsort(partitions, kind = 'stable')
+            records = records[order]
+            bounds = np.searchsorted(partitions[order], np.arange(partitions_count + 1))
+            for partition in np.nonzero(np.diff(bounds))[0]:
+                with open(self.get_partition_path(partition), 'ab') as file:
+                    records[bounds[partition]:bounds[partition + 1]].tofile(file)
+        self.chunks = []
+        self.chunks_size = 0
+
+    def iter_parts(self):
+        '''Частини записів, всередині яких потрібно шукати однакові хеші.'''
+        if self.spill_folder is None:
+            if self.chunks:
+                yield np.concatenate(self.chunks)
+            return
+        self.spill()
+        for partition in range(1 << SPILL_PARTITION_BITS):
+            path = self.get_partition_path(partition)
+            if os.path.exists(path):
+                yield np.fromfile(path, dtype = ID_RECORD_DTYPE)
+
+    def find_candidate_fids(self) -> np.ndarray:
+        '''
+        :return: впорядкований масив FID об'єктів, хеш ID яких повторюється (можливі дублікати)
+        '''
+        candidates = []
+        for records in self.iter_parts():
+            hashes = records['hash']
+            order = np.argsort(hashes, kind = 'stable')
+            hashes = hashes[order]
+            repeated = hashes[1:] == hashes[:-1]
+            mask = np.zeros(len(hashes), dtype = bool)
+            mask[1:] |= repeated
+            mask[:-1] |= repeated
+            candidates.append(records['fid'][order[mask]])
+        if not candidates:
+            return np.empty(0, dtype = np.int64)
+        return np.sort(np.concatenate(candidates))
+
+    def get_report(self) -> str:
+        spilled = ', з записом на диск' if self.spill_folder is not None else ''
+        return f'Індекс ID: {self.records_count} об\'єктів, {self.records_count * ID_RECORD_DTYPE.itemsize / 1024 / 1024:.1f} МБ{spilled}'
+
+    def close(self):
+        '''Видаляє тимчасові файли.'''
+        self.chunks = []
+        if self.spill_folder is not None:
+            shutil.rmtree(self.spill_folder, ignore_errors = True)
+            self.spill_folder = None
@@ -0,0 +1,200 @@
+from collections import namedtuple
+
+# Компактні записи перевірок об'єктів.
+# Замість словника з вже сформованими текстами (create_inspection_dict) запис зберігає лише код перевірки,
+# критичність, FID, індекс поля та параметри, а український текст формується з шаблону INSPECTION_TEMPLATES
+# тоді, коли його показує InspectionItem (або записує потоковий приймач result_sinks).
+
+INSPECTION_HELP_URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D' #Rickroll
+
+# Коди перевірок об'єктів
+INSPECTION_REQUIRED_EMPTY = 1
+INSPECTION_REQUIRED_NULL = 2
+INSPECTION_REQUIRED_OK = 3
+INSPECTION_DOMAIN_ERROR = 4
+INSPECTION_DOMAIN_OK = 5
+INSPECTION_LENGTH_ERROR = 6
+INSPECTION_LENGTH_OK = 7
+INSPECTION_ID_DUPLICATED = 8
+INSPECTION_ID_DUPLICATED_MANY = 9
+INSPECTION_ID_UNIQUE = 10
+
+# Кількість FID інших об'єктів групи дублікатів ID, що показуються в тексті перевірки
+DUPLICATE_SAMPLE_SIZE = 5
+
+InspectionTemplate = namedtuple('InspectionTemplate', ['inspection_type_name', 'item_name', 'item_tooltip'])
+
+# Шаблони текстів: {field} - назва поля, {fid} - FID об'єкта, інші - параметри запису (InspectionRecord.get_params)
+INSPECTION_TEMPLATES = {
+    INSPECTION_REQUIRED_EMPTY: InspectionTemplate(
+        "Перевірка на заповненість полів (атрибутів) об'єкту",
+        "Обов'язковий атрибут «{field}» не заповнений (is empty)",
+        "Обов'язковий атрибут «{field}» не заповнений (is empty)"),
+    INSPECTION_REQUIRED_NULL: InspectionTemplate(
+        "Перевірка на заповненість полів (атрибутів) об'єкту",
+        "Обов'язковий атрибут «{field}» не заповнений (is null)",
+        "Обов'язковий атрибут «{field}» не заповнений (is null)"),
+    INSPECTION_REQUIRED_OK: InspectionTemplate(
+        "Перевірка на заповненість обов'язкових полів (атрибутів) об'єкту",
+        "Всі обов'язкові поля (атрибути) класу заповнені",
+        "Всі обов'язкові поля (атрибути) класу заповнені"),
+    INSPECTION_DOMAIN_ERROR: InspectionTemplate(
+        "Перевірка на відповідність значень полів (атрибутів) об'єкту доменам",
+        "Атрибут: '{field}' має значення '{0}', що не відповідає домену (див. опис поля). {1}",
+        "Значення атрибуту '{field}' не відповідає домену. {1}"),
+    INSPECTION_DOMAIN_OK: InspectionTemplate(
+        "Перевірка на відповідність значень полів (атрибутів) об'єкту доменам",
+        "Всі значення полів відповідають доменам",
+        "Всі значення полів відповідають доменам"),
+    INSPECTION_LENGTH_ERROR: InspectionTemplate(
+        "Перевірка на відповідність довжини значення атрибуту",
+        "Атрибут: '{field}' має довжину {0}, а треба не більше {1}",
+        "Атрибут: '{field}' має довжину більше дозволеної структурою"),
+    INSPECTION_LENGTH_OK: InspectionTemplate(
+        "Перевірка на відповідність довжини значення атрибуту",
+        "Всі значення атрибутів не перевищують допустиму довжину",
+        "Всі значення атрибутів не перевищують допустиму довжину"),
+    INSPECTION_ID_DUPLICATED: InspectionTemplate(
+        "Перевірка на унікальність ID",
+        "Об'єкт ({fid}) має {0} дублюючих елементів, ID: {1}.",
+        "Об'єкт має не унікальний ідентифікатор"),
+    INSPECTION_ID_DUPLICATED_MANY: InspectionTemplate(
+        "Перевірка на унікальність ID",
+        "Об'єкт ({fid}) має {0} дублюючих елементів, ID: {1}, інші.",
+        "Об'єкт має не унікальний ідентифікатор"),
+    INSPECTION_ID_UNIQUE: InspectionTemplate(
+        "Перевірка на унікальність ID",
+        "Ідентифікатор об'єкта унікальний",
+        "Ідентифікатор об'єкта унікальний"),
+}
+
+
+class DuplicateGroup:
+    '''
+    Група об'єктів шару з однаковим значенням ID.
+
+    Група створюється один раз на значення ID, що повторюється, і зберігає точну кількість об'єктів
+    та перші за FID DUPLICATE_SAMPLE_SIZE + 1 FID. Записи перевірки унікальності всіх об'єктів групи
+    посилаються на неї (InspectionRecord.params), а список інших FID формується лише при показі тексту.
+
+    :param id_value: значення ID
+    :param count: кількість об'єктів з цим ID
+    :param sample_fids: перші FID об'єктів групи
+    '''
+    __slots__ = ('id_value', 'count', 'sample_fids')
+
+    def __init__(self, id_value, count: int = 0, sample_fids: list = None):
+        self.id_value = id_value
+        self.count = count
+        self.sample_fids = sample_fids if sample_fids is not None else []
+
+    def add(self, fid: int):
+        self.count += 1
+        if len(self.sample_fids) <= DUPLICATE_SAMPLE_SIZE:
+            self.sample_fids.append(fid)
+
+    @property
+    def duplicates_count(self) -> int:
+        '''Кількість дублікатів для кожного об'єкта групи (без нього самого).'''
+        return self.count - 1
+
+    def get_other_fids(self, fid: int) -> list:
+        '''Не більше DUPLICATE_SAMPLE_SIZE FID інших об'єктів групи.'''
+        return [other_fid for other_fid in self.sample_fids if other_fid != fid][:DUPLICATE_SAMPLE_SIZE]
+
+    def get_params(self, fid: int) -> tuple:
+        '''Параметри шаблонів INSPECTION_ID_DUPLICATED/INSPECTION_ID_DUPLICATED_MANY для об'єкта групи.'''
+        return (self.duplicates_count, [self.get_other_fids(fid)])
+
+    def __repr__(self):
+        return f'DuplicateGroup({self.id_value!r}, count={self.count})'
+
+
+class InspectionRecord:
+    '''
+    Запис перевірки об'єкта з ледачим формуванням тексту.
+
+    Для сумісності з вузлами-словниками дерева результатів підтримує читання через get() та [],
+    тому CustomItemModel, result_sinks та інші споживачі працюють з ним як з вузлом 'inspection'.
+
+    :param code: код перевірки (INSPECTION_*)
+    :param criticity: критичність 0/1/2
+    :param feature_id: FID об'єкта
+    :param field_index: індекс назви поля в field_names або None
+    :param params: параметри шаблону тексту або група дублікатів ID (DuplicateGroup)
+    :param field_names: спільний для шару список назв полів (не копіюється в кожен запис)
+    '''
+    __slots__ = ('code', 'criticity', 'feature_id', 'field_index', 'params', 'field_names')
+
+    def __init__(self, code: int, criticity: int, feature_id = None, field_index: int = None, params: tuple = (), field_names: list = None):
+        self.code = code
+        self.criticity = criticity
+        self.feature_id = feature_id
+        self.field_index = field_index
+        self.params = params
+        self.field_names = field_names
+
+    @property
+    def template(self) -> InspectionTemplate:
+        return INSPECTION_TEMPLATES[self.code]
+
+    @property
+    def field_name(self):
+        if self.field_index is None:
+            return None
+        return self.field_names[self.field_index]
+
+    def get_params(self) -> tuple:
+        if isinstance(self.params, DuplicateGroup):
+            return self.params.get_params(self.feature_id)
+        return self.params
+
+    def render(self, text: str) -> str:
+        return text.format(*self.get_params(), field = self.field_name, fid = self.feature_id)
+
+    def item_name(self) -> str:
+        '''Текст перевірки для дерева результатів.'''
+        return self.render(self.template.item_name)
+
+    def item_tooltip(self) -> str:
+        '''Текст підказки перевірки.'''
+        return self.render(self.template.item_tooltip)
+
+    def get(self, key: str, default = None):
+        if key == 'type':
+            return 'inspection'
+        if key == 'item_name':
+            return self.item_name()
+        if key == 'item_tooltip':
+            return self.item_tooltip()
+        if key == 'inspetcion_type_name':
+            return self.template.inspection_type_name
+        if key == 'criticity':
+            return self.criticity
+        if key == 'help_url':
+            return INSPECTION_HELP_URL
+        if key == 'related_feature_id':
+            return self.feature_id
+        return default
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str):
+        return self.get(key) is not None
+
+    def to_dict(self) -> dict:
+        '''Словник перевірки в форматі create_inspection_dict.'''
+        return {
+            'type': 'inspection',
+            'inspetcion_type_name': self.template.inspection_type_name,
+            'item_name': self.item_name(),
+            'criticity': self.criticity,
+            'help_url': INSPECTION_HELP_URL
+        }
+
+    def __repr__(self):
+        return f'InspectionRecord({self.code}, criticity={self.criticity}, feature_id={self.feature_id})'
@@ -0,0 +1,185 @@
+# Кириличні літери, схожі на латинські, та їх латинські відповідники
+CYRILLIC_TO_LATIN_MAP = {
+    'А': 'A', 'В': 'B', 'С': 'C', 'Е': 'E', 'Н': 'H', 'І': 'I', 'Ј': 'J', 'К': 'K',
+    'М': 'M', 'О': 'O', 'Р': 'P', 'Ѕ': 'S', 'Т': 'T', 'Х': 'X', 'У': 'Y', 'а': 'a',
+    'с': 'c', 'е': 'e', 'і': 'i', 'ј': 'j', 'о': 'o', 'р': 'p', 'ѕ': 's', 'х': 'x',
+    'у': 'y'
+}
+CYRILLIC_TO_LATIN_TABLE = str.maketrans(CYRILLIC_TO_LATIN_MAP)
+CYRILLIC_LETTERS = frozenset(CYRILLIC_TO_LATIN_MAP.keys())
+
+# Максимальна відстань редагування для підказок назв та їх кількість
+MAX_SUGGESTION_DISTANCE = 3
+MAX_SUGGESTIONS = 3
+
+
+def normalize_name(text: str) -> str:
+    '''Нормалізована назва для порівняння з назвами структури: нижній регістр, кирилиця в латиницю, без пробілів.'''
+    return text.lower().translate(CYRILLIC_TO_LATIN_TABLE).replace(' ', '')
+
+
+def is_canonical_name(text: str) -> bool:
+    '''Чи може назва структури збігтися з нормалізованою назвою (без великих літер, кирилиці та пробілів).'''
+    return not any(char.isupper() for char in text) and CYRILLIC_LETTERS.isdisjoint(text) and ' ' not in text
+
+
+def get_name_flags(text: str) -> dict:
+    '''Помилки назви, що збігається з назвою структури після нормалізації.'''
+    name_flags = {}
+    if any(char.isupper() for char in text):
+        name_flags['capital_leters'] = True
+    if not CYRILLIC_LETTERS.isdisjoint(text):
+        name_flags['used_cyrillic'] = True
+    if ' ' in text:
+        name_flags['spaces_used'] = True
+    return name_flags
+
+
+def levenshtein_distance(first: str, second: str) -> int:
+    '''Відстань редагування (вставка, видалення, заміна символу) між двома рядками.'''
+    if len(first) < len(second):
+        first, second = second, first
+    previous_row = list(range(len(second) + 1))
+    for first_index, first_char in enumerate(first, 1):
+        current_row = [first_index]
+        for second_index, second_char in enumerate(second, 1):
+            current_row.append(min(
+                previous_row[second_index] + 1,
+                current_row[second_index - 1] + 1,
+                previous_row[second_index - 1] + (first_char != second_char)))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+class BKTree:
+    '''
+    Дерево Буркхарда-Келлера для пошуку схожих рядків за відстанню редагування.
+    Пошук відкидає гілки, відстань яких не може бути в межах max_distance (нерівність трикутника),
+    тому порівнюється лише невелика частина назв структури.
+    '''
+    def __init__(self):
+        # вузол: [рядок, значення, {відстань: дочірній вузол}]
+        self.root = None
+
+    def add(self, word: str, value):
+        if self.root is None:
+            self.root = [word, [value], {}]
+            return
+        node = self.root
+        while True:
+            distance = levenshtein_distance(word, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [word, [value], {}]
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> list:
+        '''
+        :return: список (відстань, значення) для рядків на відстані не більше max_distance
+        '''
+        found = []
+        if self.root is None:
+            return found
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            distance = levenshtein_distance(word, node[0])
+            if distance <= max_distance:
+                found.extend((distance, value) for value in node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    nodes.append(child)
+        return found
+
+
+class NameIndex:
+    '''
+    Індекс назв шарів або полів структури для EDRA_validator.check_text_in_objects_list.
+
+    Назва нормалізується один раз (normalize_name) і шукається в словниках назв та українських псевдонімів.
+    Назва структури підходить, якщо вона збігається з нормалізованою назвою (get_name_flags - помилки назви),
+    псевдонім - якщо з ним збігається нормалізована назва (used_alias).
+    Якщо підходять кілька назв структури, обирається перша в порядку структури.
+    Для назв, яких немає в структурі, suggest шукає схожі назви та псевдоніми в BKTree.
+
+    :param objects_json: словник шарів структури або полів шару
+    :param alias_key: ключ українського псевдоніма (layer_name_ua або attribute_name_ua)
+    '''
+    def __init__(self, objects_json: dict, alias_key: str):
+        self.names = set(objects_json.keys())
+        # (нормалізована назва або псевдонім, позиція, назва структури) для підказок
+        self.suggestion_terms = []
+        self.suggestion_tree = None
+        # {назва структури: позиція}, лише для назв, з якими може збігтися нормалізована назва
+        self.canonical_positions = {}
+        # {псевдонім: [(позиція, назва структури), ...]}
+        self.alias_positions = {}
+        for position, (required_text, object_props) in enumerate(objects_json.items()):
+            self.suggestion_terms.append((normalize_name(required_text), position, required_text))
+            if isinstance(object_props[alias_key], str) and object_props[alias_key] != '':
+                self.suggestion_terms.append((normalize_name(object_props[alias_key]), position, required_text))
+            if not is_canonical_name(required_text):
+                continue
+            self.canonical_positions[required_text] = position
+            alias = object_props[alias_key]
+            if not isinstance(alias, str):
+                continue
+            if alias not in self.alias_positions:
+                self.alias_positions[alias] = []
+            self.alias_positions[alias].append((position, required_text))
+
+    def lookup(self, current_text: str) -> dict:
+        '''
+        :return: результат у форматі check_text_in_objects_list: {'any_similar_name': bool, 'result_dict': dict}
+        '''
+        if not isinstance(current_text, str):
+            raise TypeError
+        if current_text in self.names:
+            return {'any_similar_name': True, "result_dict": {}}
+
+        normalized_text = normalize_name(current_text)
+        found_position = None
+        found_dict = None
+
+        position = self.canonical_positions.get(normalized_text)
+        if position is not None:
+            name_flags = get_name_flags(current_text)
+            if name_flags:
+                name_flags['valid_name'] = normalized_text
+                found_position, found_dict = position, name_flags
+
+        for position, required_text in self.alias_positions.get(normalized_text, ()):
+            # назва, що збіглася і з назвою структури, перевіряється вище
+            if required_text == normalized_text:
+                continue
+            if found_position is None or position < found_position:
+                found_position, found_dict = position, {'used_alias': required_text, 'valid_name': required_text}
+            break
+
+        if found_dict is not None:
+            return {'any_similar_name': True, "result_dict": found_dict}
+        return {'any_similar_name': False, "result_dict": {"general": True}}
+
+    def suggest(self, current_text: str, max_suggestions: int = MAX_SUGGESTIONS) -> list:
+        '''
+        Схожі назви структури для назви, якої немає в структурі ("можливо, мається на увазі").
+        Порівнюються нормалізовані назви та псевдоніми; дерево будується при першому виклику.
+
+        :return: список назв структури, від найближчої
+        '''
+        if self.suggestion_tree is None:
+            self.suggestion_tree = BKTree()
+            for term, position, required_text in self.suggestion_terms:
+                self.suggestion_tree.add(term, (position, required_text))
+
+        normalized_text = normalize_name(current_text)
+        max_distance = min(MAX_SUGGESTION_DISTANCE, max(1, len(normalized_text) // 3))
+        found = {}
+        for distance, (position, required_text) in self.suggestion_tree.search(normalized_text, max_distance):
+            if required_text not in found or (distance, position) < found[required_text]:
+                found[required_text] = (distance, position)
+        return [required_text for required_text, _ in sorted(found.items(), key = lambda item: item[1])][:max_suggestions]
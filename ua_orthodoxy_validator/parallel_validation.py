@@ -0,0 +1,429 @@
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor, wait
+
+from osgeo import ogr
+
+from .structure_registry import load_structure
+from .checker_class import EDRA_exchange_layer_checker
+from .batch_reader import get_fid_ranges
+
+# Статуси результату перевірки одного шару
+LAYER_JOB_OK = 'ok'
+LAYER_JOB_FILE_ERROR = 'file_error'
+LAYER_JOB_LAYER_ERROR = 'layer_error'
+
+# Драйвери зі швидким довільним доступом, шари яких можна ділити на діапазони FID
+SHARDED_DRIVERS = ['GPKG', 'OpenFileGDB']
+# Кількість об'єктів в одному діапазоні FID за замовчуванням
+DEFAULT_SHARD_SIZE = 500000
+# Як часто (секунд) паралельна перевірка оновлює прогрес задачі та перевіряє її скасування
+PROGRESS_INTERVAL = 0.5
+# Скільки секунд після скасування чекати на часткові результати шарів, що вже перевіряються в процесах
+CANCELED_JOBS_TIMEOUT = 30
+
+# Структура та домени, скомпільовані один раз в кожному процесі-виконавці (init_worker)
+worker_structure = {}
+
+
+def get_workers_count(options: dict = None) -> int:
+    '''
+    Кількість процесів для перевірки шарів: options['workers'] або кількість ядер процесора.
+    Значення 1 (і менше) вмикає послідовну перевірку в поточному процесі.
+    '''
+    workers = None
+    if options is not None:
+        workers = options.get('workers')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def get_shard_size(options: dict = None) -> int:
+    '''Кількість об'єктів в одному діапазоні FID: options['shard_size'] або DEFAULT_SHARD_SIZE. 0 вимикає поділ шарів.'''
+    if options is None or options.get('shard_size') is None:
+        return DEFAULT_SHARD_SIZE
+    return int(options['shard_size'])
+
+
+def get_python_executable() -> str:
+    '''
+    Шлях до інтерпретатора python для процесів-виконавців.
+    Всередині QGIS sys.executable вказує на саму програму QGIS, тому шукаємо python поруч з бібліотеками.
+    '''
+    executable_name = os.path.basename(sys.executable).lower()
+    if executable_name.startswith('python'):
+        return sys.executable
+
+    if sys.platform == 'win32':
+        candidates = [os.path.join(sys.exec_prefix, 'python.exe'), os.path.join(sys.exec_prefix, 'pythonw.exe')]
+    else:
+        version = f'{sys.version_info.major}.{sys.version_info.minor}'
+        candidates = [os.path.join(sys.exec_prefix, 'bin', f'python{version}'), os.path.join(sys.exec_prefix, 'bin', 'python3')]
+
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return sys.executable
+
+
+def get_structure_cache_folder(options: dict = None) -> str:
+    '''Папка кешу скомпільованих структур (structure_registry): options['structure_cache'] або None.'''
+    if options is None:
+        return None
+    return options.get('structure_cache')
+
+
+def open_layer(layer_props: dict):
+    '''
+    Відкриває файл шару власним ogr.Open.
+
+    :return: (джерело даних, шар, назва драйвера); шар None, якщо його не знайдено; джерело None, якщо файл не відкривається
+    '''
+    dataSource = ogr.Open(layer_props['path'], 0)
+    if dataSource is None:
+        return None, None, None
+
+    driver_name = dataSource.GetDriver().GetName()
+    if driver_name in ['OpenFileGDB', 'GPKG']:
+        layer = dataSource.GetLayerByName(layer_props['layer_name'])
+    else:
+        layer = dataSource.GetLayer()
+    return dataSource, layer, driver_name
+
+
+def create_layer_checker(layer_id: str, layer_props: dict, layer, driver_name: str, structure: dict, domains: dict, domain_lookups: dict, task = None, data_source = None, options: dict = None, result_sink = None):
+    return EDRA_exchange_layer_checker(
+        layer = layer,
+        layer_exchange_name = layer_props['layer_real_name'],
+        structure_json = structure,
+        domains_json = domains,
+        layer_props = layer_props,
+        layer_id = layer_id,
+        task = task,
+        driver_name = driver_name,
+        domain_lookups = domain_lookups,
+        data_source = data_source,
+        options = options,
+        result_sink = result_sink)
+
+
+def validate_layer(layer_id: str, layer_props: dict, structure: dict, domains: dict, domain_lookups: dict, task = None, feature_shards: list = None, options: dict = None, result_sink = None) -> dict:
+    '''
+    Відкриває файл шару власним ogr.Open та перевіряє шар.
+
+    :param feature_shards: результати перевірки діапазонів FID шару (run_shard_job), якщо об'єкти вже перевірені частинами
+    :param options: налаштування перевірки run_validator (input_list[2])
+    :param result_sink: приймач результатів (result_sinks), в процеси-виконавці не передається
+    :return: словник з ключами:
+        - status - LAYER_JOB_OK, LAYER_JOB_FILE_ERROR (файл не відкривається) або LAYER_JOB_LAYER_ERROR (шар не знайдено),
+        - result - результат EDRA_exchange_layer_checker.run() (лише для LAYER_JOB_OK),
+        - id_index - частковий індекс ID шару для global_id_index (EDRA_exchange_layer_checker.get_layer_id_index) або None,
+        - reference_index - ключі та посилання шару для reference_integrity (EDRA_exchange_layer_checker.get_layer_reference_index) або None
+    '''
+    dataSource, layer, driver_name = open_layer(layer_props)
+    if dataSource is None:
+        return {'status': LAYER_JOB_FILE_ERROR}
+    if layer is None:
+        return {'status': LAYER_JOB_LAYER_ERROR}
+
+    validate_checker = create_layer_checker(layer_id, layer_props, layer, driver_name, structure, domains, domain_lookups, task, dataSource, options, result_sink)
+    validate_checker.feature_shards = feature_shards
+
+    validate_result = validate_checker.run()
+    layer_id_index = validate_checker.layer_id_index
+    layer_reference_index = validate_checker.layer_reference_index
+
+    del validate_checker
+    del layer
+    del dataSource
+
+    return {'status': LAYER_JOB_OK, 'result': validate_result, 'id_index': layer_id_index, 'reference_index': layer_reference_index}
+
+
+def plan_layer_shards(layer_props: dict, shard_size: int):
+    '''
+    Діапазони FID для поділу великого шару між процесами та кількість об'єктів шару для прогресу перевірки.
+
+    :return: (список діапазонів (batch_reader.get_fid_ranges) або None, якщо шар перевіряється цілим;
+        кількість об'єктів шару або None, якщо її не можна отримати без читання шару)
+    '''
+    dataSource, layer, driver_name = open_layer(layer_props)
+    if layer is None:
+        return None, None
+    # без force драйвер не рахує об'єкти, якщо для цього потрібно прочитати весь шар (повертає -1)
+    features_count = layer.GetFeatureCount(0)
+    if features_count < 0:
+        features_count = None
+    fid_ranges = None
+    if shard_size > 0 and driver_name in SHARDED_DRIVERS:
+        fid_ranges = get_fid_ranges(layer, shard_size)
+    del layer
+    del dataSource
+    return fid_ranges, features_count
+
+
+class WorkerTask:
+    '''
+    Замінник QgsTask для EDRA_exchange_layer_checker в процесі-виконавці.
+    Скасування - спільна подія всіх процесів пулу, прогрес записується в комірку job_index спільного масиву
+    (iter_layers_results_parallel об'єднує їх в прогрес задачі QGIS).
+    '''
+    def __init__(self, job_index: int):
+        self.job_index = job_index
+
+    def isCanceled(self) -> bool:
+        return worker_structure['cancel_event'].is_set()
+
+    def setProgress(self, progress: float):
+        worker_structure['jobs_progress'][self.job_index] = progress
+
+
+def init_worker(structure_folder: str, options: dict = None, cancel_event = None, jobs_progress = None):
+    '''
+    Ініціалізація процесу-виконавця: структура читається один раз на процес, а не на кожен шар.
+
+    :param cancel_event: multiprocessing.Event скасування перевірки (WorkerTask)
+    :param jobs_progress: спільний масив прогресу перевірок в процесах (WorkerTask)
+    '''
+    worker_structure.update(load_structure(structure_folder, get_structure_cache_folder(options)))
+    worker_structure['options'] = options
+    worker_structure['cancel_event'] = cancel_event
+    worker_structure['jobs_progress'] = jobs_progress
+
+
+def run_layer_job(layer_id: str, layer_props: dict, job_index: int) -> dict:
+    '''Перевірка одного шару в процесі-виконавці.'''
+    return validate_layer(
+        layer_id,
+        layer_props,
+        worker_structure['structure'],
+        worker_structure['domains'],
+        worker_structure['domain_lookups'],
+        task = WorkerTask(job_index),
+        options = worker_structure['options'])
+
+
+def run_shard_job(layer_id: str, layer_props: dict, fid_range, job_index: int) -> dict:
+    '''Перевірка об'єктів одного діапазону FID шару в процесі-виконавці.'''
+    dataSource, layer, driver_name = open_layer(layer_props)
+    validate_checker = create_layer_checker(
+        layer_id,
+        layer_props,
+        layer,
+        driver_name,
+        worker_structure['structure'],
+        worker_structure['domains'],
+        worker_structure['domain_lookups'],
+        task = WorkerTask(job_index),
+        options = worker_structure['options'])
+    shard_result = validate_checker.run_features_shard(fid_range)
+    del validate_checker
+    del layer
+    del dataSource
+    return shard_result
+
+
+def iter_layers_results(layers: dict, structure_folder: str, workers: int = 1, task = None, structure: dict = None, shard_size: int = DEFAULT_SHARD_SIZE, options: dict = None, result_sink = None, result_cache = None):
+    '''
+    Перевіряє шари і повертає результати в порядку словника layers, незалежно від порядку завершення перевірок.
+
+    :param layers: словник шарів run_validator
+    :param structure_folder: шлях до папки структури
+    :param workers: кількість процесів; 1 - послідовна перевірка в поточному процесі
+    :param task: QgsTask для прогресу та скасування (в процеси-виконавці не передається)
+    :param structure: вже прочитана структура (load_structure) для послідовної перевірки
+    :param shard_size: кількість об'єктів в діапазоні FID, на які діляться великі шари при паралельній перевірці
+    :param options: налаштування перевірки run_validator, що передаються в EDRA_exchange_layer_checker
+    :param result_sink: приймач результатів для шарів, що перевіряються в поточному процесі;
+        вузли об'єктів шарів з процесів-виконавців переносить в приймач run_validator (ResultSink.write_layer_features)
+    :param result_cache: кеш результатів шарів (result_cache.LayerResultCache); шари з кешу не відкриваються і не перевіряються
+    :return: генератор пар (ID шару, результат validate_layer)
+    '''
+    # потокові приймачі забирають результати об'єктів з результату шару, тому такі результати не кешуються
+    if result_cache is None or (result_sink is not None and result_sink.streaming):
+        yield from iter_checked_layers_results(layers, structure_folder, workers, task, structure, shard_size, options, result_sink)
+        return
+
+    cached_results = {}
+    for layer_id, layer_props in layers.items():
+        layer_result = result_cache.get(layer_props)
+        if layer_result is not None:
+            cached_results[layer_id] = layer_result
+    if cached_results:
+        print(f'Результати {len(cached_results)} з {len(layers)} шарів взято з кешу')
+
+    checked_layers = {layer_id: layer_props for layer_id, layer_props in layers.items() if layer_id not in cached_results}
+    checked_results = iter_checked_layers_results(checked_layers, structure_folder, workers, task, structure, shard_size, options, result_sink)
+    for layer_id, layer_props in layers.items():
+        if layer_id in cached_results:
+            yield layer_id, cached_results[layer_id]
+            continue
+
+        # результати iter_checked_layers_results йдуть в порядку checked_layers;
+        # після скасування шари без результату пропускаються, тому шар результату береться з нього самого
+        checked = next(checked_results, None)
+        if checked is None:
+            return
+        # результат скасованої перевірки неповний і в кеш не записується
+        if task is None or not task.isCanceled():
+            result_cache.put(layers[checked[0]], checked[1])
+        yield checked
+
+
+def iter_checked_layers_results(layers: dict, structure_folder: str, workers: int = 1, task = None, structure: dict = None, shard_size: int = DEFAULT_SHARD_SIZE, options: dict = None, result_sink = None):
+    '''Перевіряє шари (без кешу результатів), параметри як в iter_layers_results.'''
+    done_layers = set()
+    if workers > 1:
+        layers_shards = {layer_id: plan_layer_shards(layer_props, shard_size) for layer_id, layer_props in layers.items()}
+        jobs_count = sum(len(fid_ranges) if fid_ranges else 1 for fid_ranges, features_count in layers_shards.values())
+        if jobs_count > 1:
+            try:
+                for layer_id, layer_result in iter_layers_results_parallel(layers, layers_shards, structure_folder, min(workers, jobs_count), task, options, result_sink, shard_size):
+                    done_layers.add(layer_id)
+                    yield layer_id, layer_result
+                return
+            except (OSError, BrokenExecutor) as e:
+                print(f'Паралельна перевірка недоступна: "{e}", шари перевіряються послідовно')
+
+    if structure is None:
+        structure = load_structure(structure_folder, get_structure_cache_folder(options))
+
+    for layer_id, layer_props in layers.items():
+        if layer_id in done_layers:
+            continue
+        if task is not None and task.isCanceled():
+            return
+        yield layer_id, validate_layer(layer_id, layer_props, structure['structure'], structure['domains'], structure['domain_lookups'], task, options = options, result_sink = result_sink)
+
+
+def get_jobs_progress(jobs_progress, jobs_weights: list) -> float:
+    '''Прогрес паралельної перевірки: прогрес перевірок в процесах (WorkerTask), зважений кількістю їх об'єктів.'''
+    total_weight = sum(jobs_weights)
+    done_weight = sum(weight * min(100.0, progress) for weight, progress in zip(jobs_weights, jobs_progress))
+    return done_weight / total_weight
+
+
+def wait_jobs(jobs_futures: list, task, jobs_progress, jobs_weights: list) -> bool:
+    '''
+    Чекає на завершення перевірок в процесах, оновлюючи прогрес задачі кожні PROGRESS_INTERVAL секунд.
+
+    :param jobs_futures: пари (індекс перевірки в jobs_progress, Future)
+    :return: False, якщо задачу скасовано до завершення перевірок
+    '''
+    pending_futures = {future for job_index, future in jobs_futures}
+    while pending_futures:
+        done_futures, pending_futures = wait(pending_futures, timeout = PROGRESS_INTERVAL)
+        if task is None:
+            continue
+        if task.isCanceled():
+            return False
+        task.setProgress(get_jobs_progress(jobs_progress, jobs_weights))
+    return True
+
+
+def wait_canceled_jobs(futures: list):
+    '''
+    Чекає (не довше CANCELED_JOBS_TIMEOUT секунд) на часткові результати перевірок, що вже виконуються в процесах після скасування.
+    Скасування Future з черги не будить concurrent.futures.wait, тому очікування перевіряє стан частинами по PROGRESS_INTERVAL.
+    '''
+    deadline = time.monotonic() + CANCELED_JOBS_TIMEOUT
+    running_futures = [future for future in futures if not future.done()]
+    while running_futures and time.monotonic() < deadline:
+        wait(running_futures, timeout = PROGRESS_INTERVAL)
+        running_futures = [future for future in running_futures if not future.done()]
+
+
+def iter_layers_results_parallel(layers: dict, layers_shards: dict, structure_folder: str, workers: int, task = None, options: dict = None, result_sink = None, shard_size: int = DEFAULT_SHARD_SIZE):
+    '''
+    Паралельна перевірка шарів. Великі шари GPKG/OpenFileGDB діляться на діапазони FID (run_shard_job),
+    результати діапазонів об'єднуються в поточному процесі разом з перевіркою унікальності ID для всього шару,
+    тому результат збігається з послідовною перевіркою.
+
+    Прогрес задачі - частка перевірених об'єктів всіх шарів, яку процеси записують в спільний масив (WorkerTask).
+    Скасування задачі перевіряється під час очікування: процеси-виконавці отримують його через спільну подію
+    і повертають результати вже перевірених об'єктів, перевірки в черзі скасовуються.
+
+    :param layers_shards: словник {ID шару: (діапазони FID або None, кількість об'єктів або None)} (plan_layer_shards)
+    :param shard_size: вага шару з невідомою кількістю об'єктів в прогресі
+    '''
+    context = multiprocessing.get_context('spawn')
+    context.set_executable(get_python_executable())
+
+    print(f'Паралельна перевірка {len(layers)} шарів в {workers} процесах')
+
+    structure = None
+
+    # прогрес кожної перевірки в процесі (0-100) та її вага - кількість об'єктів
+    jobs_weights = []
+    for fid_ranges, features_count in layers_shards.values():
+        if features_count is None:
+            features_count = shard_size
+        # перший та останній діапазони FID відкриті, тому об'єкти шару діляться між діапазонами порівну (як в get_fid_ranges)
+        jobs_count = len(fid_ranges) if fid_ranges else 1
+        jobs_weights.extend([max(1, features_count) / jobs_count] * jobs_count)
+    jobs_progress = context.Array('d', len(jobs_weights), lock = False)
+    cancel_event = context.Event()
+
+    executor = ProcessPoolExecutor(max_workers = workers, mp_context = context, initializer = init_worker, initargs = (structure_folder, options, cancel_event, jobs_progress))
+    canceled = False
+    completed = False
+    try:
+        # {ID шару: (чи поділено шар на діапазони FID, пари (індекс перевірки, Future))}
+        layers_futures = {}
+        for layer_id, layer_props in layers.items():
+            fid_ranges = layers_shards[layer_id][0]
+            job_index = sum(len(jobs_futures) for sharded, jobs_futures in layers_futures.values())
+            if fid_ranges:
+                jobs_futures = [(job_index + shard_index, executor.submit(run_shard_job, layer_id, layer_props, fid_range, job_index + shard_index)) for shard_index, fid_range in enumerate(fid_ranges)]
+                layers_futures[layer_id] = (True, jobs_futures)
+            else:
+                layers_futures[layer_id] = (False, [(job_index, executor.submit(run_layer_job, layer_id, layer_props, job_index))])
+
+        for layer_id, (sharded, jobs_futures) in layers_futures.items():
+            if not canceled and not wait_jobs(jobs_futures, task, jobs_progress, jobs_weights):
+                canceled = True
+                # перевірки в черзі не починаються, а процеси зупиняються після поточного пакета об'єктів
+                cancel_event.set()
+                executor.shutdown(wait = False, cancel_futures = True)
+                wait_canceled_jobs([future for sharded_layer, layer_jobs in layers_futures.values() for job_index, future in layer_jobs])
+
+            jobs_results = []
+            for job_index, future in jobs_futures:
+                if not future.done() or future.cancelled():
+                    jobs_results.append(None)
+                    continue
+                jobs_progress[job_index] = 100.0
+                jobs_results.append(future.result())
+
+            if not sharded:
+                if jobs_results[0] is not None:
+                    yield layer_id, jobs_results[0]
+            else:
+                feature_shards = jobs_results
+                if canceled:
+                    # результат скасованого шару - вже перевірені діапазони, позначені як неповні
+                    feature_shards = [shard_result for shard_result in jobs_results if shard_result is not None]
+                    if len(feature_shards) == 0:
+                        continue
+                    if len(feature_shards) < len(jobs_results):
+                        feature_shards[-1]['canceled'] = True
+                elif None in feature_shards:
+                    feature_shards = None
+                if structure is None:
+                    structure = load_structure(structure_folder, get_structure_cache_folder(options))
+                layer_result = validate_layer(layer_id, layers[layer_id], structure['structure'], structure['domains'], structure['domain_lookups'], feature_shards = feature_shards, options = options, result_sink = result_sink)
+                yield layer_id, layer_result
+
+            if task is not None and not canceled:
+                task.setProgress(get_jobs_progress(jobs_progress, jobs_weights))
+        completed = True
+    finally:
+        if completed and not canceled:
+            executor.shutdown()
+        else:
+            # перевірку скасовано, перервано винятком або закриттям генератора - процеси не чекають завершення своїх перевірок
+            cancel_event.set()
+            executor.shutdown(wait = False, cancel_futures = True)
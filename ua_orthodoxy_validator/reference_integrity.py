@@ -0,0 +1,142 @@
+import numpy as np
+
+from .global_id_index import read_layer_id_values
+from .checker_class import DEFAULT_ERROR_CAP
+
+INSPECTION_REFERENCE_NAME = "Перевірка посилань між шарами"
+
+
+class ReferentialIntegrityIndex:
+    '''
+    Перевірка посилань між шарами поставки (колонка attribute_reference структури,
+    наприклад buildings_polygon.str_id -> streets.str_id).
+
+    Кожен шар додає ключі (унікальні хеші значень полів, на які посилаються інші шари) та посилання
+    (FID та хеші значень полів-посилань), зібрані під час перевірки об'єктів шару
+    (EDRA_exchange_layer_checker.get_layer_reference_index), зокрема і з процесів-виконавців parallel_validation.
+    Після всіх шарів множина ключів кожного шару-цілі будується один раз (впорядкований масив унікальних хешів),
+    а посилання кожного шару перевіряються одним проходом пошуком в цьому масиві (hash join).
+
+    :param cap: максимальна кількість об'єктів з посиланнями на відсутні значення в результаті одного поля, 0 - без обмеження
+    '''
+    def __init__(self, cap: int = DEFAULT_ERROR_CAP):
+        self.cap = cap
+        # {(шар структури, поле): [масиви хешів ключів шарів]}
+        self.keys = {}
+        # [(ID шару, поле, (шар, поле) цілі, FID, хеші)]
+        self.references = []
+
+    def add_layer(self, layer_id: str, layer_reference_index: dict):
+        '''Додає ключі та посилання шару (EDRA_exchange_layer_checker.get_layer_reference_index).'''
+        for field_name, key_hashes in layer_reference_index['keys'].items():
+            self.keys.setdefault((layer_reference_index['layer'], field_name), []).append(np.frombuffer(key_hashes, dtype = np.uint64))
+        for field_name, reference in layer_reference_index['references'].items():
+            self.references.append((
+                layer_id,
+                field_name,
+                tuple(reference['target']),
+                np.frombuffer(reference['fids'], dtype = np.int64),
+                np.frombuffer(reference['hashes'], dtype = np.uint64)))
+
+    def get_key_sets(self) -> dict:
+        '''
+        :return: словник {(шар, поле): впорядкований масив унікальних хешів ключів всіх шарів поставки}
+        '''
+        return {target: np.unique(np.concatenate(key_hashes)) for target, key_hashes in self.keys.items()}
+
+    @staticmethod
+    def find_dangling(fids: np.ndarray, hashes: np.ndarray, key_set: np.ndarray) -> np.ndarray:
+        '''
+        :return: FID об'єктів, значення посилання яких немає серед ключів
+        '''
+        if len(key_set) == 0:
+            return fids
+        positions = np.minimum(np.searchsorted(key_set, hashes), len(key_set) - 1)
+        return fids[key_set[positions] != hashes]
+
+    def write_result(self, layers: dict):
+        '''
+        Вузол результату перевірки посилань між шарами.
+
+        :param layers: словник шарів run_validator
+        :return: контейнер або None, якщо в шарах перевірки немає полів-посилань
+        '''
+        if not self.references:
+            return None
+        container_references = {
+            'type': 'container',
+            'item_name': INSPECTION_REFERENCE_NAME,
+            'subitems': []
+        }
+        key_sets = self.get_key_sets()
+        for layer_id, field_name, target, fids, hashes in self.references:
+            layer_props = layers[layer_id]
+            target_name = '.'.join(target)
+            layer_title = f"Поле «{field_name}» шару «{layer_props['layer_name']}»"
+            key_set = key_sets.get(target)
+            if key_set is None:
+                container_references['subitems'].append({
+                    'type': 'inspection',
+                    'inspetcion_type_name': INSPECTION_REFERENCE_NAME,
+                    'item_name': f"{layer_title}: посилання на {target_name} не перевірено, в перевірці немає шару «{target[0]}» з полем «{target[1]}»",
+                    'related_file_path': layer_props['path'],
+                    'related_layer_id': layer_id,
+                    'criticity': 1
+                })
+                continue
+
+            dangling_fids = self.find_dangling(fids, hashes, key_set)
+            if len(dangling_fids) == 0:
+                container_references['subitems'].append({
+                    'type': 'inspection',
+                    'inspetcion_type_name': INSPECTION_REFERENCE_NAME,
+                    'item_name': f"{layer_title}: всі {len(fids)} посилань на {target_name} знайдено",
+                    'related_file_path': layer_props['path'],
+                    'related_layer_id': layer_id,
+                    'criticity': 0
+                })
+                continue
+
+            inspection = {
+                'type': 'inspection',
+                'inspetcion_type_name': INSPECTION_REFERENCE_NAME,
+                'item_name': f"{layer_title}: {len(dangling_fids)} об'єктів посилаються на відсутні значення {target_name}",
+                'related_file_path': layer_props['path'],
+                'related_layer_id': layer_id,
+                'criticity': 2,
+                'subitems': []
+            }
+            example_fids = dangling_fids[:self.cap or None].tolist()
+            for fid, value in read_layer_id_values(layer_props, field_name, example_fids):
+                inspection['subitems'].append({
+                    'type': 'feature',
+                    'item_name': f"Об'єкт '{fid}': значення «{value}» відсутнє в {target_name}",
+                    'related_file_path': layer_props['path'],
+                    'related_layer_id': layer_id,
+                    'related_feature_id': fid,
+                    'criticity': 2
+                })
+            if len(dangling_fids) > len(example_fids):
+                inspection['subitems'].append({
+                    'type': 'inspection',
+                    'inspetcion_type_name': INSPECTION_REFERENCE_NAME,
+                    'item_name': f"Ще {len(dangling_fids) - len(example_fids)} об'єктів з цією помилкою",
+                    'criticity': 2
+                })
+            container_references['subitems'].append(inspection)
+        return container_references
+
+
+def create_reference_index(options: dict):
+    '''
+    Створює перевірку посилань між шарами за налаштуваннями run_validator:
+        - reference_check - перевіряти посилання полів на інші шари (дефолтне значення True),
+        - error_cap - максимальна кількість прикладів для одного поля.
+
+    :return: ReferentialIntegrityIndex або None
+    '''
+    if options is None:
+        return ReferentialIntegrityIndex()
+    if not options.get('reference_check', True):
+        return None
+    return ReferentialIntegrityIndex(options.get('error_cap', DEFAULT_ERROR_CAP))
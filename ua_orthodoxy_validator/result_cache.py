@@ -0,0 +1,205 @@
+import configparser
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+
+from .structure_registry import get_structure_signature
+
+# Версія формату записів кешу: при зміні формату результату (EDRA_exchange_layer_checker.run) старі записи не використовуються
+RESULT_CACHE_VERSION = 7
+# Розмір кешу за замовчуванням, МБ
+DEFAULT_RESULT_CACHE_SIZE = 256
+
+# Налаштування run_validator, від яких залежить результат перевірки шару
+# (global_id_check та reference_check - чи є в результаті індекси ID та посилань для перевірок між шарами)
+RESULT_OPTIONS_KEYS = ['result_mode', 'error_cap', 'column_profile', 'global_id_check', 'reference_check']
+
+
+def get_plugin_version() -> str:
+    '''Версія плагіна з metadata.txt.'''
+    metadata = configparser.ConfigParser(interpolation = None)
+    try:
+        metadata.read(os.path.join(os.path.dirname(__file__), 'metadata.txt'), encoding = 'utf-8')
+        return metadata.get('general', 'version')
+    except (configparser.Error, OSError):
+        return ''
+
+
+# Файли поруч з файлом бази, що містять ще не перенесені в неї зміни (GeoPackage/SQLite).
+# -shm не враховується: це лише індекс -wal, який оновлюють і читачі бази, тому кеш не спрацьовував би ніколи
+DATABASE_SIDECAR_SUFFIXES = ['-wal', '-journal']
+
+
+def get_sidecar_paths(path: str) -> list:
+    '''
+    Файли, від яких залежить вміст шару, крім самого файлу шару:
+    файли з тією ж назвою та іншим розширенням (.dbf, .shx, .cpg, .prj шейп-файлу) та -wal/-journal бази.
+    '''
+    folder, name = os.path.split(path)
+    stem = os.path.splitext(name)[0]
+    sidecar_paths = [path + suffix for suffix in DATABASE_SIDECAR_SUFFIXES if os.path.isfile(path + suffix)]
+    with os.scandir(folder or '.') as entries:
+        for entry in entries:
+            # x.gpkg-wal та x.gpkg-shm мають ту ж назву без розширення, що й x.gpkg, але враховуються лише DATABASE_SIDECAR_SUFFIXES
+            if not entry.name.startswith(name) and os.path.splitext(entry.name)[0].lower() == stem.lower() and entry.is_file():
+                sidecar_paths.append(entry.path)
+    return sorted(sidecar_paths)
+
+
+def get_file_identity(path: str):
+    '''
+    Розмір та час зміни файлу шару в наносекундах разом з розміром та часом зміни супутніх файлів (get_sidecar_paths):
+    зміна атрибутів шейп-файлу змінює лише .dbf, а запис в GeoPackage може залишитись лише в -wal.
+    Для папок (OpenFileGDB) - сумарний розмір та найпізніший час зміни файлів папки.
+
+    :return: [розмір, час зміни, [[назва супутнього файлу, розмір, час зміни], ...]] або None, якщо файл недоступний
+    '''
+    try:
+        stat = os.stat(path)
+        if not os.path.isdir(path):
+            sidecars = []
+            for sidecar_path in get_sidecar_paths(path):
+                sidecar_stat = os.stat(sidecar_path)
+                sidecars.append([os.path.basename(sidecar_path), sidecar_stat.st_size, sidecar_stat.st_mtime_ns])
+            return [stat.st_size, stat.st_mtime_ns, sidecars]
+        size = 0
+        mtime = stat.st_mtime_ns
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    entry_stat = entry.stat()
+                    size += entry_stat.st_size
+                    mtime = max(mtime, entry_stat.st_mtime_ns)
+        return [size, mtime, []]
+    except OSError:
+        return None
+
+
+class LayerResultCache:
+    '''
+    Кеш результатів перевірки шарів між запусками (SQLite).
+
+    Ключ - шлях, розмір та час зміни файлу та супутніх файлів, назва шару, відбиток вмісту CSV структури та доменів, список СК,
+    версія плагіна та налаштування, від яких залежить результат. Значення - результат validate_layer в pickle (zlib).
+    Розмір кешу обмежений max_size байт, при перевищенні видаляються записи, що найдовше не використовувались (LRU).
+
+    :param path: шлях до файлу кешу
+    :param structure_folder: папка структури перевірки
+    :param options: налаштування run_validator
+    :param max_size: максимальний розмір кешу, байт
+    :param bypass: не брати результати з кешу (шари перевіряються і результати в кеші оновлюються)
+    '''
+    def __init__(self, path: str, structure_folder: str, options: dict, max_size: int, bypass: bool = False):
+        self.path = path
+        self.max_size = max_size
+        self.bypass = bypass
+        self.context = [
+            RESULT_CACHE_VERSION,
+            get_plugin_version(),
+            # зміна структури чи доменів без зміни версії в metadata.csv теж скидає результати
+            get_structure_signature(structure_folder),
+            {key: options.get(key) for key in RESULT_OPTIONS_KEYS}
+        ]
+        folder = os.path.dirname(path)
+        if folder != '':
+            os.makedirs(folder, exist_ok = True)
+        with self.connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result BLOB, size INTEGER, last_used REAL)')
+
+    @contextmanager
+    def connect(self):
+        # окреме з'єднання на кожну операцію: підзадачі QgsTask звертаються до кешу з різних потоків
+        connection = sqlite3.connect(self.path, timeout = 60)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get_key(self, layer_props: dict):
+        '''Ключ шару в кеші або None, якщо файл шару недоступний.'''
+        file_identity = get_file_identity(layer_props['path'])
+        if file_identity is None:
+            return None
+        key = [
+            os.path.abspath(layer_props['path']),
+            file_identity,
+            layer_props['layer_name'],
+            layer_props['layer_real_name'],
+            layer_props.get('required_crs_list'),
+            layer_props.get('exchange_format'),
+            self.context
+        ]
+        return hashlib.blake2b(json.dumps(key, ensure_ascii = False).encode('utf-8'), digest_size = 16).hexdigest()
+
+    def get(self, layer_props: dict):
+        '''
+        :return: результат validate_layer з кешу або None
+        '''
+        if self.bypass:
+            return None
+        key = self.get_key(layer_props)
+        if key is None:
+            return None
+        try:
+            with self.connect() as connection:
+                row = connection.execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                connection.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+            return pickle.loads(zlib.decompress(row[0]))
+        except (sqlite3.Error, zlib.error, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            print(f'Помилка читання кешу результатів: "{e}"')
+            return None
+
+    def put(self, layer_props: dict, layer_result: dict):
+        '''Записує результат validate_layer та видаляє найстаріші записи понад max_size.'''
+        key = self.get_key(layer_props)
+        if key is None:
+            return
+        data = zlib.compress(pickle.dumps(layer_result, protocol = pickle.HIGHEST_PROTOCOL), 1)
+        if len(data) > self.max_size:
+            print(f"Результат шару «{layer_props['layer_name']}» більший за розмір кешу і не зберігається")
+            return
+        try:
+            with self.connect() as connection:
+                connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)', (key, data, len(data), time.time()))
+                self.evict(connection)
+        except sqlite3.Error as e:
+            print(f'Помилка запису кешу результатів: "{e}"')
+
+    def evict(self, connection: sqlite3.Connection):
+        total_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        old_keys = []
+        for key, size in connection.execute('SELECT key, size FROM results ORDER BY last_used'):
+            if total_size <= self.max_size:
+                break
+            old_keys.append((key,))
+            total_size -= size
+        connection.executemany('DELETE FROM results WHERE key = ?', old_keys)
+
+
+def create_result_cache(options: dict, structure_folder: str):
+    '''
+    Створює кеш результатів шарів за налаштуваннями run_validator:
+        - result_cache - шлях до файлу кешу, None - без кешу,
+        - result_cache_size - розмір кешу в МБ (DEFAULT_RESULT_CACHE_SIZE),
+        - result_cache_bypass - перевірити шари заново, не беручи результати з кешу.
+
+    :return: LayerResultCache або None
+    '''
+    if options is None or options.get('result_cache') is None:
+        return None
+    max_size = int(options.get('result_cache_size', DEFAULT_RESULT_CACHE_SIZE) * 1024 * 1024)
+    try:
+        return LayerResultCache(options['result_cache'], structure_folder, options, max_size, options.get('result_cache_bypass', False))
+    except (sqlite3.Error, OSError) as e:
+        print(f'Кеш результатів недоступний: "{e}"')
+        return None
@@ -0,0 +1,200 @@
+import abc
+import json
+import os
+import sqlite3
+
+# Назва контейнера з результатами перевірки об'єктів шару (EDRA_exchange_layer_checker.write_features_check_result)
+FEATURES_CONTAINER_NAME = "Об'єкти шару"
+
+RESULT_SINK_DICT = 'dict'
+RESULT_SINK_NDJSON = 'ndjson'
+RESULT_SINK_SQLITE = 'sqlite'
+
+
+def iter_inspection_records(node: dict, context: dict, containers: tuple = ()):
+    '''
+    Розгортає вузол дерева результатів в плоскі записи перевірок (inspection).
+
+    :param node: вузол дерева результатів (файл, шар, контейнер, об'єкт або перевірка)
+    :param context: поля запису, успадковані від батьківських вузлів (file_path, layer_id, layer_name, feature_id)
+    :param containers: назви батьківських контейнерів
+    :return: генератор словників-записів
+    '''
+    node_type = node.get('type')
+    if node_type == 'inspection':
+        record = dict(context)
+        record['container'] = containers[-1] if containers else None
+        record['inspection_type'] = node.get('inspetcion_type_name', record['container'])
+        record['criticity'] = node.get('criticity', 0)
+        record['item_name'] = node.get('item_name')
+        record['help_url'] = node.get('help_url')
+        yield record
+        return
+
+    if node_type == 'file':
+        context = dict(context, file_path = node.get('related_file_path'))
+    elif node_type == 'layer':
+        context = dict(context, layer_id = node.get('related_layer_id'), layer_name = node.get('layer_real_name'))
+    elif node_type == 'feature':
+        context = dict(context, feature_id = node.get('related_feature_id'))
+    elif node_type == 'container':
+        containers = containers + (node.get('item_name'),)
+
+    for child in node.get('subitems', []):
+        if child is not None:
+            yield from iter_inspection_records(child, context, containers)
+
+
+class ResultSink(abc.ABC):
+    '''
+    Приймач результатів перевірки.
+
+    Базова реалізація збирає список вузлів файлів, як і раніше (run_validator повертає список вузлів файлів).
+    Потокові приймачі (streaming = True) записують результати об'єктів одразу під час перевірки,
+    а в дереві залишаються лише результати рівня файлів та шарів.
+    '''
+    streaming = False
+
+    def __init__(self):
+        self.output = []
+
+    @abc.abstractmethod
+    def write_feature(self, layer_props: dict, feature_node: dict):
+        '''Записує вузол результату одного об'єкта шару.'''
+
+    def write_layer_features(self, layer_props: dict, layer_node: dict):
+        '''
+        Переносить вузли об'єктів з дерева шару в приймач (для шарів, перевірених в інших процесах).
+        Для не потокових приймачів дерево не змінюється.
+        '''
+        if not self.streaming or layer_node is None:
+            return
+        layer_props = dict(layer_props, related_layer_id = layer_node.get('related_layer_id'))
+        for container in layer_node.get('subitems', []):
+            if container is None or container.get('item_name') != FEATURES_CONTAINER_NAME:
+                continue
+            features_nodes = [node for node in container['subitems'] if node.get('type') == 'feature']
+            if len(features_nodes) == 0:
+                continue
+            for feature_node in features_nodes:
+                self.write_feature(layer_props, feature_node)
+            container['subitems'] = [node for node in container['subitems'] if node.get('type') != 'feature']
+            container['subitems'].append(self.get_features_note())
+
+    def get_features_note(self) -> dict:
+        '''Перевірка-примітка для контейнера об'єктів шару, результати якого записано в приймач.'''
+        return {
+            'type': 'inspection',
+            'inspetcion_type_name': "Результати перевірки об'єктів",
+            'item_name': f"Результати перевірки об'єктів записано в «{self.path}»",
+            'criticity': 0
+        }
+
+    def write_file(self, file_node: dict):
+        '''Записує вузол файлу (з результатами рівня файлу та шарів).'''
+        self.output.append(file_node)
+
+    def close(self) -> list:
+        '''Завершує запис. Повертає список вузлів файлів для ResultWindow.'''
+        return self.output
+
+
+class DictResultSink(ResultSink):
+    '''Вкладений словник в пам'яті: вузли об'єктів залишаються в контейнерах шарів.'''
+    streaming = False
+
+    def write_feature(self, layer_props: dict, feature_node: dict):
+        # вузол об'єкта вже є в контейнері шару, який потрапить в результат через write_file
+        pass
+
+
+class StreamingResultSink(ResultSink):
+    '''Потоковий приймач: вузли розгортаються в плоскі записи перевірок (iter_inspection_records) і записуються одразу.'''
+    streaming = True
+
+    @abc.abstractmethod
+    def write_records(self, records):
+        '''Записує плоскі записи перевірок (iter_inspection_records).'''
+
+    def write_feature(self, layer_props: dict, feature_node: dict):
+        context = {'file_path': layer_props['path'], 'layer_id': layer_props.get('related_layer_id'), 'layer_name': layer_props['layer_real_name']}
+        self.write_records(iter_inspection_records(feature_node, context, (FEATURES_CONTAINER_NAME,)))
+
+    def write_file(self, file_node: dict):
+        super().write_file(file_node)
+        self.write_records(iter_inspection_records(file_node, {'file_path': file_node.get('related_file_path')}))
+
+
+class NdjsonResultSink(StreamingResultSink):
+    '''Записує кожну перевірку окремим рядком JSON (NDJSON) в файл.'''
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.file = open(path, 'w', encoding = 'utf-8')
+
+    def write_records(self, records):
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii = False))
+            self.file.write('\n')
+
+    def close(self) -> list:
+        self.file.close()
+        return self.output
+
+
+class SqliteResultSink(StreamingResultSink):
+    '''
+    Записує перевірки в таблицю SQLite inspections з індексами за шаром, критичністю та типом перевірки.
+    Записи додаються пакетами по commit_size.
+    '''
+    columns = ['file_path', 'layer_id', 'layer_name', 'feature_id', 'container', 'inspection_type', 'criticity', 'item_name', 'help_url']
+
+    def __init__(self, path: str, commit_size: int = 10000):
+        super().__init__()
+        self.path = path
+        self.commit_size = commit_size
+        self.pending_rows = []
+        if os.path.exists(path):
+            os.remove(path)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(f"CREATE TABLE inspections ({', '.join(self.columns)})")
+
+    def write_records(self, records):
+        for record in records:
+            self.pending_rows.append(tuple(record.get(column) for column in self.columns))
+            if len(self.pending_rows) >= self.commit_size:
+                self.flush()
+
+    def flush(self):
+        if len(self.pending_rows) == 0:
+            return
+        self.connection.executemany(f"INSERT INTO inspections VALUES ({', '.join('?' for _ in self.columns)})", self.pending_rows)
+        self.connection.commit()
+        self.pending_rows = []
+
+    def close(self) -> list:
+        self.flush()
+        # індекси створюються після запису, щоб не сповільнювати вставку
+        self.connection.execute('CREATE INDEX inspections_layer_idx ON inspections (layer_id)')
+        self.connection.execute('CREATE INDEX inspections_criticity_idx ON inspections (criticity)')
+        self.connection.execute('CREATE INDEX inspections_type_idx ON inspections (inspection_type)')
+        self.connection.commit()
+        self.connection.close()
+        return self.output
+
+
+def create_result_sink(options: dict = None) -> ResultSink:
+    '''
+    Створює приймач результатів за налаштуваннями run_validator:
+        - result_sink - RESULT_SINK_DICT (дефолтне значення), RESULT_SINK_NDJSON або RESULT_SINK_SQLITE,
+        - result_path - шлях до файлу для потокових приймачів.
+    '''
+    if options is None:
+        options = {}
+    sink_type = options.get('result_sink', RESULT_SINK_DICT)
+    if sink_type == RESULT_SINK_NDJSON:
+        return NdjsonResultSink(options['result_path'])
+    if sink_type == RESULT_SINK_SQLITE:
+        return SqliteResultSink(options['result_path'])
+    return DictResultSink()
@@ -21,6 +21,7 @@ from qgis.core import (
 from qgis.utils import iface
 
 from .benchmark import Benchmark
+from .inspection_records import InspectionRecord
 
 from datetime import date
 
@@ -118,6 +119,8 @@ class InspectionItem(QStandardItem):
         - назва типу перевірки (INSPECTION_TYPE_NAME),
         - критичність помилки (CRITICITY).
     
+    Для записів InspectionRecord текст та підказка не зберігаються в елементі,
+    а формуються з шаблону, коли модель запитує DisplayRole/ToolTipRole (див. data).
     '''
     DEFALUT_LEN = 50
     
@@ -154,18 +157,8 @@ class InspectionItem(QStandardItem):
                 parent.set_color(criticity)
                 parent.set_parent_color(criticity)
 
-    def __init__(self, IDict: dict):
-        '''Конструктор класу InspectionItem.'''
-        self.colorIndex = 0
-
-        item_name = IDict.get('item_name')
-        
-        if type(item_name) is list and len(item_name) > 0:
-            item_name = IDict.get('inspection_type_name', item_name[0]) + ':'
-
-        if item_name is None:
-            raise AttributeError("Немає значення 'item_name' у даних елемента.")
-        
+    def wrap_item_name(self, item_name: str) -> str:
+        '''Переносить довгу назву елемента на новий рядок по пробілу.'''
         if len(item_name) > self.DEFALUT_LEN:
             idx = item_name.rfind(' ', 0, self.DEFALUT_LEN)
             if idx != -1:
@@ -174,16 +167,40 @@ class InspectionItem(QStandardItem):
                 idx = item_name.lfind(' ', 0, self.DEFALUT_LEN)
                 if idx != -1:
                     item_name = item_name[0:idx] + '\n' + item_name[idx+1:]
+        return item_name
 
-        super().__init__(item_name)  # Викликаємо конструктор батьківського класу
-        self.set_color(IDict.get('criticity', 0))
-        
-        item_type = IDict.get('type')
-        if item_type is None:
-            raise AttributeError("Немає значення 'type' у даних елемента.")
-        self.setData(item_name, Qt.DisplayRole)
-        self.setData(item_type, self.TYPE)  # Зберігаємо тип елемента
-        self.setData(IDict.get('item_tooltip'), Qt.ToolTipRole)
+    def __init__(self, IDict: Union[dict, InspectionRecord]):
+        '''Конструктор класу InspectionItem.'''
+        self.colorIndex = 0
+        self.record = None
+        self.corrections = []
+
+        if isinstance(IDict, InspectionRecord):
+            # текст формується з шаблону лише при відображенні (data)
+            self.record = IDict
+            super().__init__()
+            self.set_color(IDict.criticity)
+            self.setData('inspection', self.TYPE)
+        else:
+            item_name = IDict.get('item_name')
+            
+            if type(item_name) is list and len(item_name) > 0:
+                item_name = IDict.get('inspection_type_name', item_name[0]) + ':'
+
+            if item_name is None:
+                raise AttributeError("Немає значення 'item_name' у даних елемента.")
+            
+            item_name = self.wrap_item_name(item_name)
+
+            super().__init__(item_name)  # Викликаємо конструктор батьківського класу
+            self.set_color(IDict.get('criticity', 0))
+            
+            item_type = IDict.get('type')
+            if item_type is None:
+                raise AttributeError("Немає значення 'type' у даних елемента.")
+            self.setData(item_name, Qt.DisplayRole)
+            self.setData(item_type, self.TYPE)  # Зберігаємо тип елемента
+            self.setData(IDict.get('item_tooltip'), Qt.ToolTipRole)
 
         self.setData(IDict.get('help_url', 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygURcmlja3JvbGwgMTAgaG91cnM%3D'), self.HELP_URL)
 
@@ -201,6 +218,10 @@ class InspectionItem(QStandardItem):
 
         self.setData(IDict.get('criticity', 0), self.CRITICITY)
 
+        # підказки виправлень (наприклад, схожі назви полів структури)
+        for correction in IDict.get('corrections', []):
+            self.addCorrection(correction['correction_type'], correction['current_value'], correction['correct_value'])
+
         self.setEditable(False)# Забороняємо редагування елементів
 
         #self.set_parent_color(IDict.get('criticity', 0))
@@ -230,9 +251,18 @@ class InspectionItem(QStandardItem):
         }
         self.corrections.append(correction)
 
+    def data(self, role=Qt.UserRole):
+        """Дані елемента для зазначеної ролі; текст записів InspectionRecord формується тут."""
+        if self.record is not None:
+            if role == Qt.DisplayRole:
+                return self.wrap_item_name(self.record.item_name())
+            if role == Qt.ToolTipRole:
+                return self.record.item_tooltip()
+        return super().data(role)
+
     def getData(self, role=Qt.UserRole):
         """Отримує дані елемента для зазначеної ролі."""
-        return super().data(role)
+        return self.data(role)
 
     def setData(self, value, role=Qt.UserRole):
         """Встановлює дані елемента для зазначеної ролі."""
@@ -306,8 +336,12 @@ class CustomItemModel(QStandardItemModel):
         self.parse_bench.stop()
 
         self.parse_bench.start('parsing 1')
-        children = IDict.get('subitems',[])
-        name = IDict.get('item_name')
+        if isinstance(IDict, InspectionRecord):
+            children = []
+            name = None
+        else:
+            children = IDict.get('subitems',[])
+            name = IDict.get('item_name')
         self.parse_bench.stop()
 
         if len(children) > 0:
@@ -0,0 +1,98 @@
+from osgeo import ogr
+
+# Драйвери, для яких запити виконує сама база даних (SQLite), з індексами та агрегатами
+SQLITE_DRIVERS = ['GPKG', 'SQLite']
+
+
+def quote_identifier(name: str) -> str:
+    '''Назва таблиці або поля в подвійних лапках для SQL запиту.'''
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqlPushdown:
+    '''
+    Агрегатні перевірки шару через DataSource.ExecuteSQL замість проходу по об'єктах в python.
+
+    Для GPKG запити виконуються в діалекті SQLite (GROUP BY, HAVING, індекси), для інших драйверів - в OGRSQL,
+    де доступні лише COUNT та COUNT(DISTINCT). Кожен метод повертає None, якщо запит не вдалося виконати,
+    тоді перевірка виконується в python як раніше, а причина записується в notes (звіт Benchmark перевірки шару).
+    '''
+    def __init__(self, data_source, layer: ogr.Layer, driver_name: str):
+        self.data_source = data_source
+        self.layer = layer
+        self.driver_name = driver_name
+        self.dialect = 'SQLITE' if driver_name in SQLITE_DRIVERS else 'OGRSQL'
+        self.table_name = quote_identifier(layer.GetName())
+        if self.dialect == 'SQLITE':
+            self.fid_column = quote_identifier(layer.GetFIDColumn() or 'rowid')
+        else:
+            self.fid_column = 'FID'
+        # примітки про невиконані запити для звіту Benchmark (EDRA_exchange_layer_checker.run)
+        self.notes = []
+
+    def execute(self, sql: str):
+        '''
+        Виконує запит.
+
+        :return: список рядків результату (кортежі значень полів) або None, якщо запит не виконано
+        '''
+        try:
+            result_layer = self.data_source.ExecuteSQL(sql, dialect = self.dialect)
+        except Exception as e:
+            self.notes.append(f'SQL запит до шару {self.layer.GetName()} не виконано, перевірка виконується в python: "{sql}", "{e}"')
+            return None
+        if result_layer is None:
+            self.notes.append(f'SQL запит до шару {self.layer.GetName()} не повернув результату, перевірка виконується в python: "{sql}"')
+            return None
+        try:
+            rows = []
+            field_count = result_layer.GetLayerDefn().GetFieldCount()
+            for feature in result_layer:
+                rows.append(tuple(feature.GetField(i) for i in range(field_count)))
+            return rows
+        finally:
+            self.data_source.ReleaseResultSet(result_layer)
+
+    def execute_scalar(self, sql: str):
+        rows = self.execute(sql)
+        if not rows:
+            return None
+        return rows[0][0]
+
+    def has_not_null_values(self, field_name: str):
+        '''Чи має поле хоча б одне не NULL значення.'''
+        count = self.execute_scalar(f'SELECT COUNT(*) FROM {self.table_name} WHERE {quote_identifier(field_name)} IS NOT NULL')
+        if count is None:
+            return None
+        return count > 0
+
+    def has_duplicates(self, field_name: str):
+        '''
+        Чи є в полі значення, що повторюються (NULL, як і в python перевірці, вважаються однаковими).
+        Працює і в OGRSQL через COUNT(DISTINCT).
+        '''
+        field = quote_identifier(field_name)
+        rows = self.execute(f'SELECT COUNT({field}), COUNT(DISTINCT {field}) FROM {self.table_name} WHERE {field} IS NOT NULL')
+        null_count = self.execute_scalar(f'SELECT COUNT(*) FROM {self.table_name} WHERE {field} IS NULL')
+        if not rows or null_count is None:
+            return None
+        values_count, distinct_count = rows[0]
+        if values_count is None or distinct_count is None:
+            return None
+        return values_count != distinct_count or null_count > 1
+
+    def get_duplicated_rows(self, field_name: str):
+        '''
+        Об'єкти зі значенням поля, що повторюється (лише SQLite: GROUP BY ... HAVING COUNT(*) > 1).
+        NULL значення, як і в python перевірці, вважаються однаковими.
+
+        :return: список (FID, значення), впорядкований за FID, або None
+        '''
+        if self.dialect != 'SQLITE':
+            return None
+        field = quote_identifier(field_name)
+        return self.execute(
+            f'SELECT {self.fid_column}, {field} FROM {self.table_name} '
+            f'WHERE {field} IN (SELECT {field} FROM {self.table_name} GROUP BY {field} HAVING COUNT(*) > 1) '
+            f'OR ({field} IS NULL AND (SELECT COUNT(*) FROM {self.table_name} WHERE {field} IS NULL) > 1) '
+            f'ORDER BY {self.fid_column}')
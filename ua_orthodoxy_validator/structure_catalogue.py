@@ -0,0 +1,114 @@
+import json
+import os
+
+from .csv_to_json_structure_converter import Csv_to_json_structure_converter
+
+# Версія формату маніфесту: при зміні формату маніфест будується заново
+STRUCTURE_MANIFEST_VERSION = 1
+METADATA_CSV_FILENAME = 'metadata.csv'
+
+
+class StructureCatalogue:
+    '''
+    Каталог структур плагіна для вікна налаштувань перевірки.
+
+    При відкритті вікна будується лише легкий індекс {коротка назва: {версія: запис}}, де запис містить
+    path, structure_name та structure_date. Індекс береться з маніфесту (json), metadata.csv читається лише
+    для нових папок версій або якщо metadata.csv змінився. Системи координат та формат (get_details)
+    читаються тоді, коли версію обрано у випадаючому списку.
+
+    :param structures_folder: папка структур (stuctures/<структура>/<версія>)
+    :param manifest_path: шлях до файлу маніфесту, None - без маніфесту
+    '''
+    def __init__(self, structures_folder: str, manifest_path: str = None):
+        self.structures_folder = structures_folder
+        self.manifest_path = manifest_path
+        self.versions = {}
+        self.details = {}
+        self.scan()
+
+    def read_manifest(self) -> dict:
+        if self.manifest_path is None:
+            return {}
+        try:
+            with open(self.manifest_path, encoding = 'utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != STRUCTURE_MANIFEST_VERSION:
+            return {}
+        return manifest.get('folders', {})
+
+    def write_manifest(self, folders: dict):
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok = True)
+            with open(self.manifest_path, 'w', encoding = 'utf-8') as file:
+                json.dump({'version': STRUCTURE_MANIFEST_VERSION, 'folders': folders}, file, ensure_ascii = False, indent = 4)
+        except OSError as e:
+            print(f'Не вдалось зберегти маніфест структур: "{e}"')
+
+    def iter_version_folders(self):
+        '''Папки версій структур (два рівні вкладеності, без повторного обходу підпапок).'''
+        for structure_entry in sorted(os.scandir(self.structures_folder), key = lambda entry: entry.name):
+            if not structure_entry.is_dir():
+                continue
+            for version_entry in sorted(os.scandir(structure_entry.path), key = lambda entry: entry.name):
+                if version_entry.is_dir():
+                    yield version_entry.path
+
+    def scan(self):
+        '''Будує індекс версій структур, оновлюючи маніфест для нових та змінених папок.'''
+        manifest_folders = self.read_manifest()
+        folders = {}
+        for version_path in self.iter_version_folders():
+            try:
+                stat = os.stat(os.path.join(version_path, METADATA_CSV_FILENAME))
+            except OSError:
+                continue
+            metadata_stamp = [stat.st_size, stat.st_mtime_ns]
+
+            entry = manifest_folders.get(version_path)
+            if entry is None or entry['metadata_stamp'] != metadata_stamp:
+                metadata = Csv_to_json_structure_converter(version_path).create_metadata_json()
+                if metadata is None:
+                    continue
+                entry = {
+                    'metadata_stamp': metadata_stamp,
+                    'short_structure_name': metadata['short_structure_name'],
+                    'structure_version': metadata['structure_version'],
+                    'structure_name': metadata['structure_name'],
+                    'structure_date': metadata['structure_date']
+                }
+            folders[version_path] = entry
+
+            if entry['short_structure_name'] not in self.versions:
+                self.versions[entry['short_structure_name']] = {}
+            self.versions[entry['short_structure_name']][entry['structure_version']] = {
+                'path': version_path,
+                'structure_name': entry['structure_name'],
+                'structure_date': entry['structure_date']
+            }
+
+        if self.manifest_path is not None and folders != manifest_folders:
+            self.write_manifest(folders)
+
+    def get_details(self, short_structure_name: str, structure_version: str) -> dict:
+        '''
+        Повні метадані версії структури (читаються при першому зверненні).
+
+        :return: словник з ключами path, structure_name, structure_date, author, description, format, crs
+        '''
+        version = self.versions[short_structure_name][structure_version]
+        if version['path'] not in self.details:
+            converter = Csv_to_json_structure_converter(version['path'])
+            metadata = converter.create_metadata_json()
+            self.details[version['path']] = {
+                'path': version['path'],
+                'structure_name': metadata['structure_name'],
+                'structure_date': metadata['structure_date'],
+                'author': metadata['author'],
+                'description': metadata['description'],
+                'format': metadata['format'],
+                'crs': converter.create_crs_json() or {}
+            }
+        return self.details[version['path']]
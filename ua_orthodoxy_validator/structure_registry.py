@@ -0,0 +1,110 @@
+import hashlib
+import os
+import pickle
+import threading
+
+from .csv_to_json_structure_converter import Csv_to_json_structure_converter
+from .domain_lookup import compile_domain_lookups
+
+# Версія формату скомпільованої структури: при зміні compile_structure старі файли кешу не використовуються
+STRUCTURE_CACHE_VERSION = 2
+# Файли структури, від яких залежить скомпільована структура
+STRUCTURE_FILES = ['structure.csv', 'domain.csv']
+
+# Скомпільовані структури поточного процесу: {шлях до папки структури: (розміри та час зміни файлів, структура)}
+structures_registry = {}
+structures_registry_lock = threading.Lock()
+
+
+def get_structure_stat(structure_folder: str) -> tuple:
+    '''Розміри та час зміни файлів структури для швидкої перевірки реєстру поточного процесу.'''
+    files_stat = []
+    for file_name in STRUCTURE_FILES:
+        stat = os.stat(os.path.join(structure_folder, file_name))
+        files_stat.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(files_stat)
+
+
+def get_structure_signature(structure_folder: str) -> str:
+    '''Відбиток вмісту файлів структури та доменів (blake2b). Змінюється при будь-якій зміні CSV.'''
+    signature = hashlib.blake2b(str(STRUCTURE_CACHE_VERSION).encode('utf-8'), digest_size = 16)
+    for file_name in STRUCTURE_FILES:
+        with open(os.path.join(structure_folder, file_name), 'rb') as file:
+            signature.update(file.read())
+    return signature.hexdigest()
+
+
+def compile_structure(structure_folder: str) -> dict:
+    '''Читає структуру та домени з CSV і компілює домени для перевірки.'''
+    converter = Csv_to_json_structure_converter(structure_folder)
+    structure = converter.create_structure_json()
+    domains = converter.create_domain_json()
+    return {
+        'structure': structure,
+        'domains': domains,
+        'domain_lookups': compile_domain_lookups(domains)
+    }
+
+
+def get_compiled_structure_path(structure_folder: str, cache_folder: str) -> str:
+    folder_hash = hashlib.blake2b(os.path.abspath(structure_folder).encode('utf-8'), digest_size = 8).hexdigest()
+    return os.path.join(cache_folder, f'structure_{folder_hash}.pickle')
+
+
+def read_compiled_structure(path: str, signature: str):
+    '''
+    :return: скомпільована структура з файлу кешу або None, якщо файлу немає чи CSV змінились
+    '''
+    try:
+        with open(path, 'rb') as file:
+            cached_signature, structure = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        return None
+    if cached_signature != signature:
+        return None
+    return structure
+
+
+def write_compiled_structure(path: str, signature: str, structure: dict):
+    '''Записує скомпільовану структуру через тимчасовий файл, щоб інші процеси не прочитали її частково.'''
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        with open(temp_path, 'wb') as file:
+            pickle.dump((signature, structure), file, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f'Не вдалось зберегти скомпільовану структуру: "{e}"')
+
+
+def load_structure(structure_folder: str, cache_folder: str = None) -> dict:
+    '''
+    Скомпільована структура та домени перевірки.
+
+    Кожна папка структури компілюється не більше одного разу в процесі. Якщо задано cache_folder,
+    скомпільована структура також зберігається на диск і в наступних сесіях читається з pickle,
+    поки не зміниться вміст CSV структури (get_structure_signature).
+
+    :param structure_folder: шлях до папки структури
+    :param cache_folder: папка кешу скомпільованих структур, None - без кешу на диску
+    :return: словник з ключами structure, domains, domain_lookups
+    '''
+    folder_key = os.path.abspath(structure_folder)
+    files_stat = get_structure_stat(structure_folder)
+    with structures_registry_lock:
+        registered = structures_registry.get(folder_key)
+        if registered is not None and registered[0] == files_stat:
+            return registered[1]
+
+        structure = None
+        if cache_folder is not None:
+            signature = get_structure_signature(structure_folder)
+            compiled_path = get_compiled_structure_path(structure_folder, cache_folder)
+            structure = read_compiled_structure(compiled_path, signature)
+        if structure is None:
+            structure = compile_structure(structure_folder)
+            if cache_folder is not None:
+                write_compiled_structure(compiled_path, signature, structure)
+
+        structures_registry[folder_key] = (files_stat, structure)
+        return structure
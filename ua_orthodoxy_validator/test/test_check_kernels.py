@@ -0,0 +1,113 @@
+# coding=utf-8
+"""Векторні перевірки атрибутів (check_kernels) проти поелементних перевірок EDRA_validator.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import random
+import unittest
+
+import numpy as np
+
+from .. import check_kernels
+from ..checker_class import EDRA_validator, FieldRule
+from ..domain_lookup import DomainLookup
+
+
+DOMAIN = DomainLookup('test_domain', {'1': 'Один', '2': 'Два', '15': 'П\'ятнадцять', '1 000': 'Тисяча', 'A1': 'Код з літерою', 'дорога': 'Текстовий код'})
+
+
+def create_validator(fields_plan):
+    '''EDRA_validator лише з планом перевірки полів, без шару.'''
+    validator = EDRA_validator.__new__(EDRA_validator)
+    validator.fields_plan = fields_plan
+    return validator
+
+
+def to_masked_column(values, dtype):
+    '''Колонка як з Arrow: numpy масив з маскою NULL значень.'''
+    data = [value if value is not None else dtype(0) if dtype is not object else '' for value in values]
+    mask = [value is None for value in values]
+    return np.ma.masked_array(np.array(data, dtype = dtype), mask = mask)
+
+
+class CheckKernelsTest(unittest.TestCase):
+    """Test check_kernels against EDRA_validator.check_feature_values."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.random = random.Random(7)
+
+    def assert_same_as_scalar(self, fields_plan, columns, rows):
+        validator = create_validator(fields_plan)
+        expected = {}
+        for row_index, row in enumerate(rows):
+            row_errors = validator.check_feature_values(row)
+            if any(row_errors):
+                expected[row_index] = row_errors
+        self.assertTrue(expected)
+        self.assertEqual(validator.check_batch_values(columns), expected)
+
+    def random_text(self):
+        code = self.random.choice(sorted(DOMAIN.text_codes))
+        return self.random.choice([
+            code, ' ' + code, code + ' x', '-' + code, '0' + code, code.replace(' ', ''),
+            '', 'abc', '²', '-', 'довге значення ' * self.random.randint(1, 30), None])
+
+    def random_integer(self):
+        if self.random.random() < 0.1:
+            return None
+        return self.random.choice([1, 2, 15, 1000, 0, -1, 3, 999999])
+
+    def test_text_columns(self):
+        """Текстові колонки (читання по об'єктах та Arrow) з усіма видами помилок."""
+        fields_plan = [
+            FieldRule(0, 'code_integer', 'integer', True, None, DOMAIN, False),
+            FieldRule(1, 'code_text', 'text', False, None, DOMAIN, False),
+            FieldRule(2, 'name', 'text', True, 20, None, False),
+        ]
+        rows = [tuple(self.random_text() for _ in fields_plan) for _ in range(500)]
+        list_columns = [list(column) for column in zip(*rows)]
+        self.assert_same_as_scalar(fields_plan, list_columns, rows)
+        masked_columns = [to_masked_column(column, object) for column in list_columns]
+        self.assert_same_as_scalar(fields_plan, masked_columns, rows)
+
+    def test_numeric_columns(self):
+        """Цілі та дійсні колонки з NULL значеннями."""
+        fields_plan = [
+            FieldRule(0, 'code', 'integer', True, None, DOMAIN, False),
+            FieldRule(1, 'code_real', 'integer', False, None, DOMAIN, False),
+        ]
+        integers = [self.random_integer() for _ in range(500)]
+        reals = [float(value) if value is not None else None for value in reversed(integers)]
+        rows = list(zip(integers, reals))
+        self.assert_same_as_scalar(fields_plan, [integers, reals], rows)
+        self.assert_same_as_scalar(fields_plan, [to_masked_column(integers, np.int64), to_masked_column(reals, np.float64)], rows)
+
+    def test_domain_criticity(self):
+        """Критичність та примітки domain_criticity для окремих значень."""
+        values = ['1', '1000', '1 000', 'A1', 'A 1', '7', None, 15]
+        criticity, notes = check_kernels.domain_criticity(values, DOMAIN, 'integer')
+        self.assertEqual(criticity.tolist(), [1, 1, 1, 0, 2, 2, 0, 0])
+        self.assertEqual(notes.tolist(), [
+            check_kernels.DOMAIN_NOTE_TYPE_MISMATCH, check_kernels.DOMAIN_NOTE_TYPE_MISMATCH, check_kernels.DOMAIN_NOTE_SPACES,
+            check_kernels.DOMAIN_NOTE_NONE, check_kernels.DOMAIN_NOTE_NOT_IN_DOMAIN, check_kernels.DOMAIN_NOTE_NOT_IN_DOMAIN,
+            check_kernels.DOMAIN_NOTE_NONE, check_kernels.DOMAIN_NOTE_NONE])
+
+    def test_text_length_exceeded(self):
+        """Довжина рахується в символах, NULL не перевіряється."""
+        exceeded, lengths = check_kernels.text_length_exceeded(['дорога', 'ab', None, 'x' * 300], 5)
+        self.assertEqual(exceeded.tolist(), [True, False, False, True])
+        self.assertEqual(lengths[[0, 1, 3]].tolist(), [6, 2, 300])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# coding=utf-8
+"""Профіль колонок шару (FieldProfile, HyperLogLog).
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import unittest
+
+import numpy as np
+
+from ..column_profile import FieldProfile, HyperLogLog, LayerProfile, hash_numbers, hash_profile_values, hash_texts
+
+# Допустима відносна похибка оцінки HyperLogLog (стандартна похибка близько 1.6% для HLL_PRECISION 12)
+HLL_TOLERANCE = 0.05
+
+
+class HyperLogLogTest(unittest.TestCase):
+    """Test HyperLogLog estimates."""
+
+    def assert_estimate(self, estimate, exact):
+        self.assertLessEqual(abs(estimate - exact), max(2, HLL_TOLERANCE * exact), f'{estimate} != {exact}')
+
+    def test_small_and_large_counts(self):
+        for exact in (0, 1, 10, 1000, 5000, 100000):
+            hll = HyperLogLog()
+            hll.add_hashes(hash_texts([f'значення {number}' for number in range(exact)]))
+            self.assert_estimate(hll.count(), exact)
+
+    def test_repeated_values(self):
+        """Повторні значення не змінюють оцінку."""
+        hll = HyperLogLog()
+        hashes = hash_numbers(np.arange(3000))
+        hll.add_hashes(hashes)
+        first_count = hll.count()
+        hll.add_hashes(hashes[::-1])
+        self.assertEqual(hll.count(), first_count)
+        self.assert_estimate(first_count, 3000)
+
+    def test_merge(self):
+        """Об'єднання регістрів дає оцінку об'єднання множин."""
+        first = HyperLogLog()
+        second = HyperLogLog()
+        first.add_hashes(hash_numbers(np.arange(0, 20000)))
+        second.add_hashes(hash_numbers(np.arange(10000, 30000)))
+        first.merge(second)
+        self.assert_estimate(first.count(), 30000)
+
+    def test_same_hash_for_both_reading_modes(self):
+        """Значення, прочитані через Arrow (numpy) та по об'єктах (python), мають однакові хеші."""
+        self.assertEqual(hash_numbers(np.array([-3], dtype = np.int32)).tolist(), hash_profile_values([-3]).tolist())
+        self.assertEqual(hash_numbers(np.array([2.5])).tolist(), hash_profile_values([2.5]).tolist())
+        self.assertEqual(hash_numbers(np.array([-0.0])).tolist(), hash_numbers(np.array([0.0])).tolist())
+
+
+class FieldProfileTest(unittest.TestCase):
+    """Test FieldProfile counters."""
+
+    def test_text_column(self):
+        profile = FieldProfile('name')
+        profile.add_column(['12', '-4', '', None, 'дорога', '12', 'x1', None])
+        self.assertEqual(profile.count, 8)
+        self.assertEqual(profile.null_count, 2)
+        self.assertEqual(profile.empty_count, 1)
+        self.assertEqual((profile.min_length, profile.max_length), (0, 6))
+        self.assertEqual(profile.integer_like_count, 3)
+        self.assertEqual(profile.get_distinct_count(), 5)
+
+    def test_numeric_column(self):
+        profile = FieldProfile('area')
+        profile.add_column(np.ma.masked_array(np.array([1.0, 2.5, 3.0, 0.0]), mask = [False, False, False, True]))
+        self.assertEqual((profile.count, profile.null_count), (4, 1))
+        self.assertEqual(profile.integer_like_count, 2)
+        self.assertEqual(profile.get_distinct_count(), 3)
+
+    def test_layer_profile_merge(self):
+        """Профілі діапазонів FID об'єднуються в профіль шару."""
+        first = LayerProfile(['code'])
+        second = LayerProfile(['code'])
+        first.add_batch({'code': [None, None]}, 2)
+        self.assertTrue(first.is_all_null('code'))
+        second.add_batch({'code': ['1', None]}, 2)
+        first.merge(second)
+        self.assertEqual(first.features_count, 4)
+        self.assertFalse(first.is_all_null('code'))
+        self.assertIsNone(first.is_all_null('other'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+# coding=utf-8
+"""Кеш результатів перевірки атрибутів об'єктів між запусками (FeatureFingerprintCache).
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ..checker_class import FieldRule
+from ..feature_cache import CACHE_BLOCK_FIDS, NULL_MARK, FeatureFingerprintCache, get_block_bounds, get_column_parts, get_plan_context
+from .test_check_kernels import DOMAIN, create_validator
+
+
+FIELDS_PLAN = [
+    FieldRule(0, 'code', 'integer', True, None, DOMAIN, False),
+    FieldRule(1, 'name', 'text', True, 10, None, False),
+]
+
+
+class FeatureCacheFunctionsTest(unittest.TestCase):
+    """Test block bounds, column parts and plan context."""
+
+    def test_block_bounds(self):
+        fids = np.array([0, 1, CACHE_BLOCK_FIDS - 1, CACHE_BLOCK_FIDS, CACHE_BLOCK_FIDS * 3, CACHE_BLOCK_FIDS * 3 + 2], dtype = np.int64)
+        self.assertEqual(get_block_bounds(fids), [(0, 3), (3, 4), (4, 6)])
+        self.assertEqual(get_block_bounds(np.array([], dtype = np.int64)), [])
+
+    def test_column_parts(self):
+        """Числові колонки - масив з маскою NULL, текстові та змішані - тексти."""
+        values, nulls = get_column_parts([1, None, 3])
+        self.assertEqual(values.dtype, np.int64)
+        self.assertEqual(values.tolist(), [1, 0, 3])
+        self.assertEqual(nulls.tolist(), [False, True, False])
+        self.assertEqual(get_column_parts(['a', None, ''])[0], ['a', NULL_MARK, ''])
+        self.assertEqual(get_column_parts(['1', 1, None]), (['1', '1', NULL_MARK], None))
+        self.assertIsNone(get_column_parts([1, 2.5, None])[1])
+
+    def test_plan_context(self):
+        """План перевірки з іншою довжиною поля має інший відбиток."""
+        changed_plan = [FIELDS_PLAN[0], FieldRule(1, 'name', 'text', True, 20, None, False)]
+        self.assertEqual(get_plan_context('roads', FIELDS_PLAN), get_plan_context('roads', list(FIELDS_PLAN)))
+        self.assertNotEqual(get_plan_context('roads', FIELDS_PLAN), get_plan_context('roads', changed_plan))
+        self.assertNotEqual(get_plan_context('roads', FIELDS_PLAN), get_plan_context('streets', FIELDS_PLAN))
+
+
+class FeatureFingerprintCacheTest(unittest.TestCase):
+    """Test FeatureFingerprintCache against EDRA_validator.check_batch_values."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.random = random.Random(5)
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'cache', 'feature_cache.sqlite')
+        self.context = get_plan_context('roads', FIELDS_PLAN)
+        self.validator = create_validator(FIELDS_PLAN)
+        self.fids = list(range(300))
+        self.columns = [
+            [self.random.choice(['1', '2', '15', '7', None]) for _ in self.fids],
+            [self.random.choice(['дорога', 'дуже довга назва', '', None]) for _ in self.fids]]
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.folder)
+
+    def check(self, context = None):
+        '''Перевірка пакета з новим кешем, як в наступному запуску.'''
+        cache = FeatureFingerprintCache(self.path, 'roads.shp|roads', context or self.context)
+        with mock.patch.object(self.validator, 'check_batch_values', wraps = self.validator.check_batch_values) as check_batch_values:
+            batch_errors = cache.check_batch_values(self.validator, self.columns, self.fids)
+        cache.delete_missing()
+        cache.close()
+        self.assertEqual(batch_errors, self.validator.check_batch_values(self.columns))
+        return cache, check_batch_values
+
+    def test_reuse(self):
+        """Незмінені блоки беруться з кешу, перевіряються лише блоки зі зміненими значеннями."""
+        cache, check_batch_values = self.check()
+        self.assertEqual((cache.checked_count, cache.reused_count), (300, 0))
+        cache, check_batch_values = self.check()
+        self.assertEqual((cache.checked_count, cache.reused_count), (0, 300))
+        check_batch_values.assert_not_called()
+        self.columns[1][40] = 'дуже довга назва'
+        self.columns[0][41] = None
+        cache, check_batch_values = self.check()
+        self.assertEqual((cache.checked_count, cache.reused_count), (CACHE_BLOCK_FIDS, 300 - CACHE_BLOCK_FIDS))
+
+    def test_context_reset(self):
+        """Інший план перевірки скидає записи шару."""
+        self.check()
+        cache, check_batch_values = self.check(get_plan_context('roads', FIELDS_PLAN[:1]))
+        self.assertEqual((cache.checked_count, cache.reused_count), (300, 0))
+
+    def test_delete_missing(self):
+        """Записи блоків, яких немає в новому проході (видалені об'єкти), видаляються."""
+        self.check()
+        self.fids = self.fids[:100]
+        self.columns = [column[:100] for column in self.columns]
+        self.check()
+        cache = FeatureFingerprintCache(self.path, 'roads.shp|roads', self.context)
+        self.assertEqual(sorted(cache.get(0, 1000)), [0, 32, 64, 96])
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
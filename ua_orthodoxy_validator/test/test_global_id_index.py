@@ -0,0 +1,97 @@
+# coding=utf-8
+"""Пошук ID, що повторюються в різних файлах та шарах (GlobalIdIndex).
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import os
+import unittest
+from array import array
+from unittest import mock
+
+from .. import global_id_index
+from ..global_id_index import GlobalIdIndex
+from ..id_uniqueness import hash_id_values
+
+
+class GlobalIdIndexTest(unittest.TestCase):
+    """Test GlobalIdIndex candidates and collisions."""
+
+    def setUp(self):
+        """Runs before each test."""
+        # значення ID об'єктів шарів з FID 0..n-1
+        self.values = {
+            'roads_a': ['r1', 'r2', 'r2', None, '', 'x'],
+            'roads_b': ['r3', 'r1', None, '', 'r3'],
+            'streets': ['r1', 's1'],
+        }
+        self.id_fields = {'roads_a': 'guid', 'roads_b': 'guid', 'streets': 'str_id'}
+        self.layers = {layer_id: {'layer_name': layer_id, 'path': f'/data/{layer_id}.gpkg'} for layer_id in self.values}
+        self.index = GlobalIdIndex(cap = 0)
+        self.read_patch = mock.patch.object(global_id_index, 'read_layer_id_values', side_effect = self.read_layer_id_values)
+        self.read_patch.start()
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.read_patch.stop()
+        self.index.close()
+
+    def read_layer_id_values(self, layer_props, id_field, fids):
+        values = self.values[layer_props['layer_name']]
+        return [(fid, values[fid]) for fid in fids]
+
+    def add_layer(self, layer_id, id_hashes = None):
+        values = self.values[layer_id]
+        if id_hashes is None:
+            id_hashes = hash_id_values(values)
+        self.index.add_layer(layer_id, {
+            'id_field': self.id_fields[layer_id],
+            'fids': array('q', range(len(values))),
+            'id_hashes': array('Q', id_hashes.tobytes())})
+
+    def test_collisions(self):
+        """ID повторюється лише між шарами з тим самим полем ID; NULL, порожні та повтори в межах шару не враховуються."""
+        for layer_id in self.values:
+            self.add_layer(layer_id)
+        self.assertEqual(self.index.find_candidates(), {'roads_a': [0], 'roads_b': [1]})
+        self.assertEqual(self.index.find_collisions(self.layers), [('guid', 'r1', [('roads_a', 0), ('roads_b', 1)])])
+        container_global_id = self.index.write_result(self.layers)
+        self.assertEqual(len(container_global_id['subitems']), 1)
+        self.assertEqual([feature['related_feature_id'] for feature in container_global_id['subitems'][0]['subitems']], [0, 1])
+
+    def test_hash_collision(self):
+        """Однаковий хеш різних значень ID не потрапляє в результат."""
+        self.add_layer('roads_a')
+        # хеш 'r3' шару roads_b замінено хешем 'x' шару roads_a
+        id_hashes = hash_id_values(self.values['roads_b'])
+        id_hashes[0] = hash_id_values(['x'])[0]
+        self.add_layer('roads_b', id_hashes)
+        self.assertEqual(self.index.find_candidates(), {'roads_a': [0, 5], 'roads_b': [0, 1]})
+        self.assertEqual([value for id_field, value, features in self.index.find_collisions(self.layers)], ['r1'])
+
+    def test_single_layer(self):
+        """З одним шаром перевірка між шарами не виконується; повторне додавання шару ігнорується."""
+        self.add_layer('roads_a')
+        self.add_layer('roads_a')
+        self.assertIsNone(self.index.write_result(self.layers))
+        self.assertEqual(self.index.find_candidates(), {})
+
+    def test_close(self):
+        """Тимчасова база видаляється при закритті."""
+        path = self.index.path
+        self.assertTrue(os.path.isfile(path))
+        self.index.close()
+        self.assertFalse(os.path.isfile(path))
+        self.index = GlobalIdIndex()
+
+
+if __name__ == "__main__":
+    unittest.main()
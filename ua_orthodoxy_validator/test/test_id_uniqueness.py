@@ -0,0 +1,74 @@
+# coding=utf-8
+"""Пошук повторюваних ID шару (IdUniquenessIndex) в пам'яті та з записом на диск.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import os
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from ..id_uniqueness import IdUniquenessIndex, hash_id_values
+
+
+class IdUniquenessIndexTest(unittest.TestCase):
+    """Test IdUniquenessIndex candidate search."""
+
+    def setUp(self):
+        """Runs before each test."""
+        random_generator = np.random.default_rng(3)
+        self.values = [int(value) for value in random_generator.integers(0, 20000, 30000)] + [None, None, 'a', 'a', 'b']
+        self.fids = np.arange(len(self.values), dtype = np.int64)
+        self.hashes = hash_id_values(self.values)
+        values_counts = Counter(self.values)
+        self.expected_fids = [fid for fid, value in enumerate(self.values) if values_counts[value] > 1]
+
+    def find_candidates(self, memory_budget):
+        id_index = IdUniquenessIndex(memory_budget)
+        try:
+            # хеші додаються пакетами, як під час перевірки об'єктів
+            for start in range(0, len(self.values), 4000):
+                id_index.add(self.fids[start:start + 4000], self.hashes[start:start + 4000])
+            return id_index.find_candidate_fids().tolist(), id_index.spill_folder
+        finally:
+            id_index.close()
+
+    def test_in_memory(self):
+        """Без перевищення бюджету записи не пишуться на диск."""
+        candidate_fids, spill_folder = self.find_candidates(1 << 30)
+        self.assertIsNone(spill_folder)
+        self.assertEqual(candidate_fids, self.expected_fids)
+
+    def test_spill(self):
+        """З малим бюджетом записи сортуються на диску з тим самим результатом, тимчасові файли видаляються."""
+        candidate_fids, spill_folder = self.find_candidates(64 * 1024)
+        self.assertIsNotNone(spill_folder)
+        self.assertFalse(os.path.exists(spill_folder))
+        self.assertEqual(candidate_fids, self.expected_fids)
+
+    def test_hash_collision(self):
+        """Однакові хеші різних значень повертаються як кандидати для перевірки за значеннями."""
+        id_index = IdUniquenessIndex(1 << 20)
+        id_index.add(np.array([1, 2, 3]), np.array([5, 5, 7], dtype = np.uint64))
+        self.assertEqual(id_index.find_candidate_fids().tolist(), [1, 2])
+        id_index.close()
+
+    def test_hash_id_values(self):
+        """Хеш залежить від типу значення, NULL має власний хеш."""
+        hashes = hash_id_values([1, '1', None, None, 1.0])
+        self.assertEqual(len(set(hashes.tolist())), 4)
+        self.assertEqual(hashes[2], hashes[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
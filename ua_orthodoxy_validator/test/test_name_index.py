@@ -0,0 +1,103 @@
+# coding=utf-8
+"""Пошук схожих назв структури (BKTree, NameIndex.suggest).
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import random
+import unittest
+
+from ..name_index import BKTree, NameIndex, levenshtein_distance
+
+
+class BKTreeTest(unittest.TestCase):
+    """Test BKTree search against a full scan."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.random = random.Random(11)
+        self.words = sorted(set(''.join(self.random.choice('abcde_') for _ in range(self.random.randint(1, 12))) for _ in range(400)))
+        self.tree = BKTree()
+        for word_index, word in enumerate(self.words):
+            self.tree.add(word, word_index)
+
+    def test_levenshtein_distance(self):
+        self.assertEqual(levenshtein_distance('kitten', 'sitting'), 3)
+        self.assertEqual(levenshtein_distance('', 'abc'), 3)
+        self.assertEqual(levenshtein_distance('streets', 'streets'), 0)
+
+    def test_search_matches_full_scan(self):
+        """Дерево знаходить ті ж слова, що й перебір всіх слів."""
+        for _ in range(100):
+            query = ''.join(self.random.choice('abcdef_') for _ in range(self.random.randint(0, 12)))
+            for max_distance in (0, 1, 2, 3):
+                expected = sorted((levenshtein_distance(query, word), word_index) for word_index, word in enumerate(self.words) if levenshtein_distance(query, word) <= max_distance)
+                self.assertEqual(sorted(self.tree.search(query, max_distance)), expected)
+
+    def test_duplicate_words(self):
+        """Однакові слова зберігають всі свої значення."""
+        tree = BKTree()
+        tree.add('roads', 1)
+        tree.add('roads', 2)
+        self.assertEqual(sorted(tree.search('road', 1)), [(1, 1), (1, 2)])
+        self.assertEqual(BKTree().search('road', 1), [])
+
+
+class NameIndexSuggestTest(unittest.TestCase):
+    """Test NameIndex.suggest."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.name_index = NameIndex({
+            'streets': {'layer_name_ua': 'Вулиці'},
+            'buildings_polygon': {'layer_name_ua': 'Будівлі'},
+            'street_parts': {'layer_name_ua': ''},
+        }, 'layer_name_ua')
+
+    def test_suggest(self):
+        """Найближчі назви першими, псевдоніми теж порівнюються, далекі назви не пропонуються."""
+        self.assertEqual(self.name_index.suggest('streetz'), ['streets'])
+        self.assertEqual(self.name_index.suggest('Street parts'), ['street_parts'])
+        self.assertEqual(self.name_index.suggest('Вулиця'), ['streets'])
+        self.assertEqual(self.name_index.suggest('rivers'), [])
+
+
+class NameIndexLookupTest(unittest.TestCase):
+    """Test NameIndex.lookup."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.name_index = NameIndex({
+            'streets': {'layer_name_ua': 'vulytsi'},
+            'roads': {'layer_name_ua': None},
+            'Buildings': {'layer_name_ua': 'budivli'},
+        }, 'layer_name_ua')
+
+    def test_exact_name(self):
+        self.assertEqual(self.name_index.lookup('streets'), {'any_similar_name': True, 'result_dict': {}})
+        self.assertEqual(self.name_index.lookup('Buildings'), {'any_similar_name': True, 'result_dict': {}})
+        with self.assertRaises(TypeError):
+            self.name_index.lookup(None)
+
+    def test_name_flags(self):
+        """Назва, що збігається з назвою структури після нормалізації, з помилками назви."""
+        self.assertEqual(self.name_index.lookup('Ro ads')['result_dict'], {'capital_leters': True, 'spaces_used': True, 'valid_name': 'roads'})
+        self.assertEqual(self.name_index.lookup('rоads')['result_dict'], {'used_cyrillic': True, 'valid_name': 'roads'})
+
+    def test_alias(self):
+        """Псевдонім підходить лише для назв структури без великих літер, кирилиці та пробілів."""
+        self.assertEqual(self.name_index.lookup('Vulytsi')['result_dict'], {'used_alias': 'streets', 'valid_name': 'streets'})
+        self.assertEqual(self.name_index.lookup('budivli'), {'any_similar_name': False, 'result_dict': {'general': True}})
+        self.assertEqual(self.name_index.lookup('rivers'), {'any_similar_name': False, 'result_dict': {'general': True}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# coding=utf-8
+"""Перевірка посилань між шарами (ReferentialIntegrityIndex) та тексти значень посилань (get_reference_texts).
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import unittest
+from array import array
+from unittest import mock
+
+import numpy as np
+
+from ..checker_class import get_reference_texts
+from ..id_uniqueness import hash_id_values
+from .. import reference_integrity
+from ..reference_integrity import ReferentialIntegrityIndex
+
+
+def create_keys_index(layer_name, field_name, values):
+    '''Ключі шару, як у EDRA_exchange_layer_checker.get_layer_reference_index.'''
+    positions, texts = get_reference_texts(values)
+    key_hashes = np.unique(hash_id_values(texts))
+    return {'layer': layer_name, 'keys': {field_name: array('Q', key_hashes.tobytes())}, 'references': {}}
+
+
+def create_references_index(layer_name, field_name, target, values):
+    '''Посилання шару з FID 0..len(values)-1, як у EDRA_exchange_layer_checker.get_layer_reference_index.'''
+    positions, texts = get_reference_texts(values)
+    return {'layer': layer_name, 'keys': {}, 'references': {field_name: {
+        'target': target,
+        'fids': array('q', positions),
+        'hashes': array('Q', hash_id_values(texts).tobytes())}}}
+
+
+class ReferentialIntegrityIndexTest(unittest.TestCase):
+    """Test ReferentialIntegrityIndex hash join."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.layers = {
+            'streets': {'layer_name': 'streets', 'path': '/data/streets.shp'},
+            'buildings': {'layer_name': 'buildings_polygon', 'path': '/data/buildings.shp'}}
+
+    def test_reference_texts(self):
+        """NULL та порожні значення пропускаються, дійсні числа з цілим значенням записуються як цілі."""
+        positions, texts = get_reference_texts([None, '', 'a', 5.0, 5, 2.5, 0, ' '])
+        self.assertEqual(positions, [2, 3, 4, 5, 6, 7])
+        self.assertEqual(texts, ['a', '5', '5', '2.5', '0', ' '])
+
+    def test_find_dangling(self):
+        """Посилання, значень яких немає серед ключів, в тому числі з порожнім набором ключів."""
+        key_set = np.unique(hash_id_values(['1', '3', '5']))
+        fids = np.arange(6, dtype = np.int64)
+        hashes = hash_id_values(['0', '1', '2', '3', '5', '6'])
+        self.assertEqual(ReferentialIntegrityIndex.find_dangling(fids, hashes, key_set).tolist(), [0, 2, 5])
+        self.assertEqual(ReferentialIntegrityIndex.find_dangling(fids, hashes, key_set[:0]).tolist(), fids.tolist())
+
+    def test_write_result(self):
+        """Порожні та NULL посилання не вважаються відсутніми, 5.0 посилається на ключ 5 іншого шару."""
+        reference_index = ReferentialIntegrityIndex()
+        reference_index.add_layer('streets', create_keys_index('streets', 'str_id', ['s1', 5, None, '']))
+        reference_index.add_layer('buildings', create_references_index('buildings_polygon', 'str_id', ('streets', 'str_id'), ['s1', '', None, 5.0, 's9']))
+        with mock.patch.object(reference_integrity, 'read_layer_id_values', return_value = [(4, 's9')]) as read_values:
+            container_references = reference_index.write_result(self.layers)
+        read_values.assert_called_once_with(self.layers['buildings'], 'str_id', [4])
+        inspection = container_references['subitems'][0]
+        self.assertEqual(inspection['criticity'], 2)
+        self.assertIn("1 об'єктів посилаються на відсутні значення streets.str_id", inspection['item_name'])
+        self.assertEqual([feature['related_feature_id'] for feature in inspection['subitems']], [4])
+
+    def test_missing_target_layer(self):
+        """Посилання на шар, якого немає в перевірці, не перевіряються; без полів-посилань результату немає."""
+        reference_index = ReferentialIntegrityIndex()
+        self.assertIsNone(reference_index.write_result(self.layers))
+        reference_index.add_layer('buildings', create_references_index('buildings_polygon', 'str_id', ('streets', 'str_id'), ['s1']))
+        inspection = reference_index.write_result(self.layers)['subitems'][0]
+        self.assertEqual(inspection['criticity'], 1)
+        self.assertIn('не перевірено', inspection['item_name'])
+
+
+if __name__ == "__main__":
+    unittest.main()
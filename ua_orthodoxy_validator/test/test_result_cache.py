@@ -0,0 +1,97 @@
+# coding=utf-8
+"""Кеш результатів перевірки шарів між запусками (LayerResultCache).
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..result_cache import create_result_cache, get_file_identity
+
+STRUCTURE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'stuctures', 'EDRA', '1')
+
+
+class LayerResultCacheTest(unittest.TestCase):
+    """Test LayerResultCache keys and eviction."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.folder = tempfile.mkdtemp()
+        self.structure_folder = os.path.join(self.folder, 'structure')
+        shutil.copytree(STRUCTURE_FOLDER, self.structure_folder)
+        self.layer_path = os.path.join(self.folder, 'roads.shp')
+        self.write_file(self.layer_path, 'shp')
+        self.write_file(os.path.join(self.folder, 'roads.dbf'), 'dbf')
+        self.layer_props = {
+            'layer_name': 'roads',
+            'layer_real_name': 'roads',
+            'path': self.layer_path,
+            'required_crs_list': ['EPSG:4326'],
+            'exchange_format': '.shp'}
+        self.options = {'result_cache': os.path.join(self.folder, 'cache', 'result_cache.sqlite')}
+        self.layer_result = {'status': 'ok', 'result': {'item_name': 'roads'}, 'id_index': None, 'reference_index': None}
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.folder)
+
+    def write_file(self, path, text):
+        with open(path, 'a') as file:
+            file.write(text)
+
+    def create_cache(self, **options):
+        return create_result_cache(dict(self.options, **options), self.structure_folder)
+
+    def test_put_get(self):
+        """Результат незміненого шару береться з кешу, інші шари - ні."""
+        self.create_cache().put(self.layer_props, self.layer_result)
+        self.assertEqual(self.create_cache().get(self.layer_props), self.layer_result)
+        self.assertIsNone(self.create_cache().get(dict(self.layer_props, layer_name = 'streets')))
+        self.assertIsNone(create_result_cache({}, self.structure_folder))
+
+    def test_changed_files(self):
+        """Зміна файлу шару або супутнього файлу (.dbf) скидає результат."""
+        self.create_cache().put(self.layer_props, self.layer_result)
+        self.write_file(os.path.join(self.folder, 'roads.dbf'), 'changed')
+        self.assertIsNone(self.create_cache().get(self.layer_props))
+        self.assertEqual(get_file_identity(os.path.join(self.folder, 'missing.shp')), None)
+
+    def test_changed_structure(self):
+        """Зміна доменів без зміни версії структури скидає результат."""
+        self.create_cache().put(self.layer_props, self.layer_result)
+        self.write_file(os.path.join(self.structure_folder, 'domain.csv'), '\n')
+        self.assertIsNone(self.create_cache().get(self.layer_props))
+
+    def test_result_options(self):
+        """Налаштування, від яких залежить результат шару, входять в ключ; result_cache_bypass не бере результат з кешу."""
+        self.create_cache(global_id_check = False).put(self.layer_props, self.layer_result)
+        self.assertEqual(self.create_cache(global_id_check = False).get(self.layer_props), self.layer_result)
+        self.assertIsNone(self.create_cache(global_id_check = True).get(self.layer_props))
+        self.assertIsNone(self.create_cache(global_id_check = False, reference_check = False).get(self.layer_props))
+        self.assertIsNone(self.create_cache(global_id_check = False, result_mode = 'errors_only').get(self.layer_props))
+        self.assertIsNone(self.create_cache(global_id_check = False, result_cache_bypass = True).get(self.layer_props))
+
+    def test_evict(self):
+        """Понад розмір кешу видаляються записи, що найдовше не використовувались."""
+        cache = self.create_cache(result_cache_size = 0.001)
+        layers_props = [dict(self.layer_props, layer_name = f'layer_{index}') for index in range(3)]
+        large_result = dict(self.layer_result, result = {'item_name': os.urandom(400).hex()})
+        for layer_props in layers_props:
+            cache.put(layer_props, large_result)
+        self.assertIsNone(cache.get(layers_props[0]))
+        self.assertEqual(cache.get(layers_props[2]), large_result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# coding=utf-8
+"""Агрегатні перевірки шару SQL запитами (SqlPushdown) на базі SQLite.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import sqlite3
+import unittest
+
+from ..sql_pushdown import SqlPushdown, quote_identifier
+
+
+class ResultLayer:
+    '''Результат ExecuteSQL: об'єкти з GetField та визначення шару з GetFieldCount.'''
+    def __init__(self, cursor):
+        self.field_count = len(cursor.description)
+        self.rows = cursor.fetchall()
+
+    def GetLayerDefn(self):
+        return self
+
+    def GetFieldCount(self):
+        return self.field_count
+
+    def __iter__(self):
+        return iter(ResultFeature(row) for row in self.rows)
+
+
+class ResultFeature:
+    def __init__(self, row):
+        self.row = row
+
+    def GetField(self, index):
+        return self.row[index]
+
+
+class SqliteDataSource:
+    '''Джерело даних, ExecuteSQL якого виконує запит в SQLite, як драйвер GPKG в діалекті SQLITE.'''
+    def __init__(self, connection):
+        self.connection = connection
+        self.open_results = 0
+
+    def ExecuteSQL(self, sql, dialect = None):
+        result_layer = ResultLayer(self.connection.execute(sql))
+        self.open_results += 1
+        return result_layer
+
+    def ReleaseResultSet(self, result_layer):
+        self.open_results -= 1
+
+
+class Layer:
+    def GetName(self):
+        return 'roads "main"'
+
+    def GetFIDColumn(self):
+        return 'fid'
+
+
+class SqlPushdownTest(unittest.TestCase):
+    """Test SqlPushdown queries against SQLite."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.execute('CREATE TABLE "roads ""main""" (fid INTEGER PRIMARY KEY, guid TEXT, code TEXT, empty TEXT)')
+        self.connection.executemany('INSERT INTO "roads ""main""" VALUES (?, ?, ?, ?)', [
+            (1, 'a', 'x', None), (2, 'b', 'y', None), (3, 'a', 'z', None), (4, None, 'w', None), (5, 'c', 'v', None)])
+        self.data_source = SqliteDataSource(self.connection)
+        self.pushdown = SqlPushdown(self.data_source, Layer(), 'GPKG')
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.connection.close()
+
+    def test_quote_identifier(self):
+        self.assertEqual(quote_identifier('roads "main"'), '"roads ""main"""')
+        self.assertEqual(self.pushdown.dialect, 'SQLITE')
+        self.assertEqual(SqlPushdown(self.data_source, Layer(), 'ESRI Shapefile').fid_column, 'FID')
+
+    def test_duplicates(self):
+        """Значення, що повторюються, з FID, впорядкованими за FID; один NULL дублікатом не є."""
+        self.assertTrue(self.pushdown.has_duplicates('guid'))
+        self.assertEqual(self.pushdown.get_duplicated_rows('guid'), [(1, 'a'), (3, 'a')])
+        self.assertFalse(self.pushdown.has_duplicates('code'))
+        self.assertEqual(self.pushdown.get_duplicated_rows('code'), [])
+        self.connection.execute('INSERT INTO "roads ""main""" VALUES (6, NULL, \'u\', NULL)')
+        self.assertEqual(self.pushdown.get_duplicated_rows('guid'), [(1, 'a'), (3, 'a'), (4, None), (6, None)])
+        self.assertEqual(self.data_source.open_results, 0)
+
+    def test_not_null_values(self):
+        self.assertTrue(self.pushdown.has_not_null_values('code'))
+        self.assertFalse(self.pushdown.has_not_null_values('empty'))
+
+    def test_failed_query(self):
+        """Невиконаний запит повертає None і записується в примітки для звіту Benchmark."""
+        self.connection.execute('DROP TABLE "roads ""main"""')
+        self.assertIsNone(self.pushdown.has_not_null_values('code'))
+        self.assertIsNone(self.pushdown.get_duplicated_rows('guid'))
+        self.assertEqual(len(self.pushdown.notes), 2)
+        self.assertIn('roads "main"', self.pushdown.notes[0])
+        self.assertIsNone(SqlPushdown(self.data_source, Layer(), 'ESRI Shapefile').get_duplicated_rows('guid'))
+
+
+if __name__ == "__main__":
+    unittest.main()
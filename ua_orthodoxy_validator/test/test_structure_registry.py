@@ -0,0 +1,94 @@
+# coding=utf-8
+"""Реєстр та кеш скомпільованих структур (load_structure).
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = ' '
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2024, Bohdan2505, brych92'
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from .. import structure_registry
+from ..structure_registry import get_compiled_structure_path, get_structure_signature, load_structure, read_compiled_structure, write_compiled_structure
+
+STRUCTURE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'stuctures', 'EDRA', '1')
+
+
+class StructureRegistryTest(unittest.TestCase):
+    """Test load_structure registry and compiled structure cache."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.folder = tempfile.mkdtemp()
+        self.structure_folder = os.path.join(self.folder, 'structure')
+        shutil.copytree(STRUCTURE_FOLDER, self.structure_folder)
+        self.cache_folder = os.path.join(self.folder, 'cache')
+        self.registry_patch = mock.patch.dict(structure_registry.structures_registry, clear = True)
+        self.registry_patch.start()
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.registry_patch.stop()
+        shutil.rmtree(self.folder)
+
+    def change_domains(self):
+        with open(os.path.join(self.structure_folder, 'domain.csv'), 'a') as file:
+            file.write('\n')
+
+    def test_signature(self):
+        """Відбиток залежить від вмісту CSV, а не від шляху до папки."""
+        signature = get_structure_signature(self.structure_folder)
+        self.assertEqual(signature, get_structure_signature(STRUCTURE_FOLDER))
+        self.change_domains()
+        self.assertNotEqual(get_structure_signature(self.structure_folder), signature)
+
+    def test_registry(self):
+        """Папка компілюється один раз в процесі, після зміни CSV - повторно."""
+        with mock.patch.object(structure_registry, 'compile_structure', wraps = structure_registry.compile_structure) as compile_structure:
+            structure = load_structure(self.structure_folder)
+            self.assertIs(load_structure(self.structure_folder), structure)
+            self.assertEqual(compile_structure.call_count, 1)
+            self.change_domains()
+            self.assertIsNot(load_structure(self.structure_folder), structure)
+            self.assertEqual(compile_structure.call_count, 2)
+        self.assertEqual(set(structure.keys()), {'structure', 'domains', 'domain_lookups'})
+
+    def test_compiled_cache(self):
+        """Скомпільована структура читається з pickle в новій сесії, поки не змінились CSV."""
+        structure = load_structure(self.structure_folder, self.cache_folder)
+        self.assertTrue(os.path.isfile(get_compiled_structure_path(self.structure_folder, self.cache_folder)))
+        structure_registry.structures_registry.clear()
+        with mock.patch.object(structure_registry, 'compile_structure', wraps = structure_registry.compile_structure) as compile_structure:
+            cached_structure = load_structure(self.structure_folder, self.cache_folder)
+            self.assertEqual(cached_structure['structure'], structure['structure'])
+            self.assertEqual(cached_structure['domains'], structure['domains'])
+            self.assertEqual(cached_structure['domain_lookups'].keys(), structure['domain_lookups'].keys())
+            self.assertEqual(compile_structure.call_count, 0)
+            self.change_domains()
+            load_structure(self.structure_folder, self.cache_folder)
+            self.assertEqual(compile_structure.call_count, 1)
+
+    def test_read_compiled_structure(self):
+        """Файл з іншим відбитком, пошкоджений або відсутній файл не використовуються."""
+        path = os.path.join(self.cache_folder, 'structure.pickle')
+        self.assertIsNone(read_compiled_structure(path, 'signature'))
+        write_compiled_structure(path, 'signature', {'structure': {}})
+        self.assertEqual(read_compiled_structure(path, 'signature'), {'structure': {}})
+        self.assertIsNone(read_compiled_structure(path, 'other'))
+        with open(path, 'wb') as file:
+            file.write(b'broken')
+        self.assertIsNone(read_compiled_structure(path, 'signature'))
+
+
+if __name__ == "__main__":
+    unittest.main()